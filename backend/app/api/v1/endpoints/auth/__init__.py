@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import bcrypt
 from datetime import datetime, timedelta
 
 from jose import jwt
@@ -10,6 +10,9 @@ from jose import jwt
 from app.db.session import get_db
 from app.models.users.user_model import User
 from app.core.config import settings
+from app.services.auth.password_service import PasswordService, PasswordServiceSaturado
+from app.services.auth.limitador_login_service import LimitadorLoginService
+from app.core.principal import VerificadorTokens, TokenExpirado, TokenInvalido, UsuarioNoEncontrado, claims_principal
 
 router = APIRouter()
 
@@ -18,20 +21,45 @@ class LoginRequest(BaseModel):
     password: str
 
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def login(request: LoginRequest, http_request: Request, db: Session = Depends(get_db)):
+    # Límite por IP y por email antes de tocar la BD o bcrypt
+    ip = http_request.client.host if http_request.client else None
+    espera, reserva = LimitadorLoginService.reservar_intento(request.email, ip)
+    if espera:
+        return JSONResponse(
+            status_code=429,
+            content={"message": "Demasiados intentos de inicio de sesión, intenta más tarde"},
+            headers={"Retry-After": str(espera)}
+        )
+
+    # Async: bcrypt corre en el pool de procesos y la consulta en el threadpool,
+    # así un pico de logins no bloquea el resto de endpoints
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == request.email).first())
     if not user:
         return JSONResponse(status_code=401, content={"message": "El email ingresado no está registrado"})
-    
-    input_pw = request.password.encode('utf-8')
-    stored_pw = user.password.encode('utf-8')
 
-    if not bcrypt.checkpw(input_pw, stored_pw):
+    try:
+        valida, nuevo_hash = await PasswordService.verificar_y_actualizar_async(request.password, user.password)
+    except PasswordServiceSaturado:
+        LimitadorLoginService.anular_intento(request.email, reserva)
+        return JSONResponse(
+            status_code=503,
+            content={"message": "Servicio ocupado, intenta de nuevo en unos segundos"},
+            headers={"Retry-After": "1"}
+        )
+
+    if not valida:
         return JSONResponse(status_code=401, content={"message": "La contraseña es incorrecta"})
+    LimitadorLoginService.registrar_exito(request.email)
+
+    # Rehash transparente si el coste configurado subió
+    if nuevo_hash:
+        user.password = nuevo_hash
+        await run_in_threadpool(db.commit)
 
     payload = {
         'id': user.id,
-        'role': user.role,
+        **claims_principal(user),
         'exp': datetime.utcnow() + timedelta(days=1)
     }
     
@@ -66,23 +94,21 @@ def check_session(request: Request, db: Session = Depends(get_db)):
         return JSONResponse(status_code=401, content={"message": "No token provided"})
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        user_id = payload.get("id")
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return JSONResponse(status_code=401, content={"message": "User not found"})
-            
-        return {
-            "authenticated": True,
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "name_user": user.name_user,
-                "fotoPerfil": user.urlphotoperfil
-            },
-            "message": "Session valid"
-        }
-    except jwt.ExpiredSignatureError:
+        user = VerificadorTokens.verificar(token, lambda user_id: db.get(User, user_id))
+    except UsuarioNoEncontrado:
+        return JSONResponse(status_code=401, content={"message": "User not found"})
+    except TokenExpirado:
         return JSONResponse(status_code=401, content={"message": "Token expired"})
-    except jwt.JWTError:
+    except TokenInvalido:
         return JSONResponse(status_code=401, content={"message": "Invalid token"})
+
+    return {
+        "authenticated": True,
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "name_user": user.name_user,
+            "fotoPerfil": user.urlphotoperfil
+        },
+        "message": "Session valid"
+    }
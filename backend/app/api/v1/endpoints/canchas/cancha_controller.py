@@ -1,8 +1,10 @@
 from flask import request
 from flask_restx import Resource, fields
 from app.services.auth.cancha_service import CanchaService
+from app.services.imagenes.imagen_service import ImagenService
+from app.utils.image_serving import servir_imagen
 import json
-from flask import request, send_file, abort, make_response, current_app, send_from_directory
+from flask import request, send_file, abort, make_response, current_app
 import os
 from urllib.parse import quote
 
@@ -165,12 +167,34 @@ class CanchaCreateResource(Resource):
 
 @cancha_ns.route('/list')
 class CanchaListResource(Resource):
+    @cancha_ns.doc(params={
+        'cursor': {'description': 'Modo paginado: cursor de la página (vacío para la primera)'},
+        'por_pagina': {'description': 'Canchas por página (máx. 100)', 'example': 20},
+        'incluir': {'description': 'Colecciones a incluir separadas por coma: imagenes,horarios,reglas,amenidades (por defecto todas)'}
+    })
     def get(self):
         """Obtener todas las canchas activas con URLs de imágenes WebP"""
         print("🎯 Llegó request a /cancha/list GET")
         try:
+            incluir = request.args.get('incluir')
+            if incluir is not None:
+                incluir = [c.strip() for c in incluir.split(',') if c.strip()]
+
+            # Modo cursor: ?cursor= (vacío para la primera página)
+            if 'cursor' in request.args:
+                pagina = CanchaService.obtener_canchas_cursor(
+                    request.args.get('cursor'), request.args.get('por_pagina', 20, type=int), incluir
+                )
+                return {
+                    'success': True,
+                    'data': pagina['data'],
+                    'count': len(pagina['data']),
+                    'next_cursor': pagina['next_cursor'],
+                    'formato_imagenes': 'webp_url'
+                }, 200
+
             # ✅ El servicio retorna diccionarios con URLs WebP
-            canchas = CanchaService.obtener_todas_las_canchas()
+            canchas = CanchaService.obtener_todas_las_canchas(incluir)
             
             print(f"✅ Retornando {len(canchas)} canchas con URLs WebP")
             return {
@@ -179,6 +203,8 @@ class CanchaListResource(Resource):
                 'count': len(canchas),
                 'formato_imagenes': 'webp_url'
             }, 200
+        except ValueError as e:
+            return {"success": False, "error": str(e), "codigo": "PARAMETROS_INVALIDOS"}, 400
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             return {
@@ -187,6 +213,49 @@ class CanchaListResource(Resource):
                 "codigo": "ERROR_OBTENER_CANCHAS"
             }, 500
 
+@cancha_ns.route('/cercanas')
+class CanchasCercanasResource(Resource):
+    @cancha_ns.doc(params={
+        'lat': {'description': 'Latitud del usuario', 'required': True},
+        'lon': {'description': 'Longitud del usuario', 'required': True},
+        'limite': {'description': 'Cantidad de canchas (máx. 50)', 'example': 20},
+        'radio_km': {'description': 'Radio máximo de búsqueda en km'},
+        'tipo': {'description': 'Filtrar por tipo'},
+        'subtipo': {'description': 'Filtrar por subtipo'}
+    })
+    @cancha_ns.response(400, 'Parámetros inválidos', cancha_error_model)
+    @cancha_ns.response(500, 'Error al buscar canchas', cancha_error_model)
+    def get(self):
+        """Obtener las canchas activas más cercanas a una ubicación, ordenadas por distancia"""
+        print("🎯 Llegó request a /cancha/cercanas GET")
+        latitud = request.args.get('lat', type=float)
+        longitud = request.args.get('lon', type=float)
+        if latitud is None or longitud is None:
+            return {"success": False, "error": "Parámetros 'lat' y 'lon' requeridos", "codigo": "COORDENADAS_REQUERIDAS"}, 400
+
+        try:
+            canchas = CanchaService.buscar_canchas_cercanas(
+                latitud, longitud,
+                limite=request.args.get('limite', 20, type=int),
+                radio_km=request.args.get('radio_km', type=float),
+                tipo=request.args.get('tipo'),
+                subtipo=request.args.get('subtipo')
+            )
+            return {
+                'success': True,
+                'data': canchas,
+                'count': len(canchas)
+            }, 200
+        except ValueError as e:
+            return {"success": False, "error": str(e), "codigo": "COORDENADAS_INVALIDAS"}, 400
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return {
+                "success": False,
+                "error": "Error al buscar canchas cercanas",
+                "codigo": "ERROR_CANCHAS_CERCANAS"
+            }, 500
+
 @cancha_ns.route('/<int:cancha_id>/imagen-webp/<filename>')
 class CanchaImagenWebPResource(Resource):
     def get(self, cancha_id, filename):
@@ -199,15 +268,17 @@ class CanchaImagenWebPResource(Resource):
                 str(cancha_id), 'webp'
             )
             
-            # Verificar que el archivo existe
-            file_path = os.path.join(webp_folder, filename)
-            if not os.path.exists(file_path):
-                print(f"❌ Archivo WebP no encontrado: {file_path}")
-                return {"error": "Imagen WebP no encontrada"}, 404
+            # Variante por tamaño: ?tamano=mini|pequena|mediana|completa
+            archivo = ImagenService.resolver_variante(webp_folder, filename, request.args.get('tamano'))
             
-            print(f"📤 Sirviendo archivo WebP: {filename}")
-            return send_from_directory(webp_folder, filename)
+            # ETag + 304, Range y caché inmutable
+            return servir_imagen(webp_folder, archivo)
             
+        except FileNotFoundError:
+            print(f"❌ Archivo WebP no encontrado: {filename}")
+            return {"error": "Imagen WebP no encontrada"}, 404
+        except ValueError as e:
+            return {"error": str(e), "codigo": "TAMANO_INVALIDO"}, 400
         except Exception as e:
             print(f"❌ Error sirviendo imagen WebP: {str(e)}")
             return {"error": "Error al cargar imagen WebP"}, 500
@@ -1,8 +1,10 @@
 from flask_restx import Resource
-from flask import request, current_app, send_from_directory
+from flask import request, current_app
 import os
 from app.services.auth.post_service import PostService
+from app.services.imagenes.imagen_service import ImagenService
 from app.utils.auth_utils import obtener_usuario_desde_token
+from app.utils.image_serving import servir_imagen
 
 # ✅ CORREGIDO: Importar desde el __init__ de auth
 from . import posts_ns, post_model, post_update_model, comentario_model
@@ -90,8 +92,38 @@ class obtenerpost(Resource):
         por_pagina = request.args.get('por_pagina', 10, type=int)
 
         try:
-            result = PostService.obtener_posts(pagina, por_pagina)
+            # Modo cursor: ?cursor= (vacío para la primera página) y ?total=1 opcional
+            if 'cursor' in request.args:
+                result = PostService.obtener_posts_cursor(
+                    request.args.get('cursor'), por_pagina, request.args.get('total', 0, type=int) == 1
+                )
+            else:
+                result = PostService.obtener_posts(pagina, por_pagina)
+            return result, 200
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except Exception as e:
+            return {'message': 'Error interno del servidor'}, 500
+        
+@posts_ns.route('/timeline')
+class Timeline(Resource):
+    def get(self):
+        """Obtener el home timeline del usuario autenticado (posts propios y de amigos)"""
+        print("🌐 [POSTS] Solicitud recibida para obtener timeline")
+        
+        # Obtener usuario desde el token JWT
+        usuario, error, status_code = obtener_usuario_desde_token()
+        if error:
+            return error, status_code
+        
+        cursor = request.args.get('cursor')
+        por_pagina = request.args.get('por_pagina', 10, type=int)
+
+        try:
+            result = PostService.obtener_timeline(usuario.id, cursor, por_pagina)
             return result, 200
+        except ValueError as e:
+            return {'message': str(e)}, 400
         except Exception as e:
             return {'message': 'Error interno del servidor'}, 500
         
@@ -110,8 +142,15 @@ class MisPosts(Resource):
         por_pagina = request.args.get('por_pagina', 10, type=int)
 
         try:
-            result = PostService.obtener_mis_posts(usuario.id, pagina, por_pagina)
+            if 'cursor' in request.args:
+                result = PostService.obtener_mis_posts_cursor(
+                    usuario.id, request.args.get('cursor'), por_pagina, request.args.get('total', 0, type=int) == 1
+                )
+            else:
+                result = PostService.obtener_mis_posts(usuario.id, pagina, por_pagina)
             return result, 200
+        except ValueError as e:
+            return {'message': str(e)}, 400
         except Exception as e:
             return {'message': 'Error interno del servidor'}, 500
 
@@ -130,8 +169,15 @@ class MisLikes(Resource):
         por_pagina = request.args.get('por_pagina', 10, type=int)
 
         try:
-            result = PostService.obtener_mis_likes_posts(usuario.id, pagina, por_pagina)
+            if 'cursor' in request.args:
+                result = PostService.obtener_mis_likes_posts_cursor(
+                    usuario.id, request.args.get('cursor'), por_pagina, request.args.get('total', 0, type=int) == 1
+                )
+            else:
+                result = PostService.obtener_mis_likes_posts(usuario.id, pagina, por_pagina)
             return result, 200
+        except ValueError as e:
+            return {'message': str(e)}, 400
         except Exception as e:
             return {'message': 'Error interno del servidor'}, 500
 
@@ -252,6 +298,25 @@ class PostComentarios(Resource):
         except Exception as e:
             return {'message': 'Error interno del servidor'}, 500
 
+@posts_ns.route('/comentarios/<int:comentario_id>')
+class ComentarioDetail(Resource):
+    def delete(self, comentario_id):
+        """Eliminar un comentario propio"""
+        print(f"🌐 [POSTS] Solicitud recibida para eliminar comentario ID: {comentario_id}")
+        
+        # Obtener usuario desde el token JWT
+        usuario, error, status_code = obtener_usuario_desde_token()
+        if error:
+            return error, status_code
+
+        try:
+            result = PostService.eliminar_comentario(comentario_id, usuario.id)
+            return result, 200
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except Exception as e:
+            return {'message': 'Error interno del servidor'}, 500
+
 @posts_ns.route('/<int:post_id>/like')
 class PostLike(Resource):
     def post(self, post_id):
@@ -296,8 +361,6 @@ class PostImagenResource(Resource):
     def get(self, user_id, filename):
         """Servir archivo WebP de post"""
         try:
-            print(f"📤 Sirviendo imagen de post para usuario {user_id}: {filename}")
-            
             # Construir ruta al directorio WebP del usuario para posts
             webp_folder = os.path.join(
                 current_app.root_path, 
@@ -305,15 +368,17 @@ class PostImagenResource(Resource):
                 str(user_id), 'webp'
             )
             
-            # Verificar que el archivo existe
-            file_path = os.path.join(webp_folder, filename)
-            if not os.path.exists(file_path):
-                print(f"❌ Archivo WebP no encontrado: {file_path}")
-                return {"error": "Imagen de post no encontrada"}, 404
+            # Variante por tamaño: ?tamano=mini|pequena|mediana|completa
+            archivo = ImagenService.resolver_variante(webp_folder, filename, request.args.get('tamano'))
             
-            print(f"✅ Sirviendo archivo WebP: {filename}")
-            return send_from_directory(webp_folder, filename)
+            # ETag + 304, Range y caché inmutable
+            return servir_imagen(webp_folder, archivo)
             
+        except FileNotFoundError:
+            print(f"❌ Archivo WebP no encontrado: {filename}")
+            return {"error": "Imagen de post no encontrada"}, 404
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             print(f"❌ Error sirviendo imagen de post: {str(e)}")
             return {"error": "Error al cargar imagen de post"}, 500
\ No newline at end of file
@@ -1,5 +1,5 @@
 from flask import request
-from app.models.reserva import Reserva
+from app.models.reservas.reserva import Reserva
 from app.utils.auth_utils import obtener_usuario_desde_token 
 from datetime import datetime
 from flask_restx import Resource, fields
@@ -47,6 +47,37 @@ class CrearReservaController(Resource):
             traceback.print_exc()
             return {"error": "Error interno del servidor"}, 500
 
+@reserva_ns.route('/recurrente')
+class CrearReservaRecurrenteController(Resource):
+    @reserva_ns.response(201, 'Reservas creadas (con conflictos por fecha si los hay)')
+    @reserva_ns.response(400, 'Error de validación', error_response_model)
+    @reserva_ns.response(401, 'No autorizado', error_response_model)
+    @reserva_ns.response(409, 'Ninguna fecha disponible')
+    @reserva_ns.response(500, 'Error interno del servidor', error_response_model)
+    def post(self):
+        """Reservar la misma cancha y hora en varias fechas (fechas: [...] o fecha_inicio + semanas)"""
+        try:
+            print("🎯 Llegó request a /reserva/recurrente POST")
+            resultado = ReservaService.crear_reservas_recurrentes(request.json or {})
+
+            if not resultado['reservas']:
+                return {"error": "Ninguna de las fechas está disponible", **resultado}, 409
+
+            return {
+                "message": f"{len(resultado['reservas'])} reservas realizadas correctamente",
+                **resultado
+            }, 201
+
+        except PermissionError as e:
+            print(f"❌ Error de permisos: {str(e)}")
+            return {"error": str(e)}, 401
+        except ValueError as e:
+            print(f"❌ Error de validación: {str(e)}")
+            return {"error": str(e)}, 400
+        except Exception as e:
+            print(f"💥 Error interno: {str(e)}")
+            return {"error": "Error interno del servidor"}, 500
+
 @reserva_ns.route('/ocupados/<int:cancha_id>/<string:fecha>')
 class HorariosOcupadosController(Resource):
     @reserva_ns.response(200, 'Horarios ocupados obtenidos', horarios_ocupados_response)
@@ -66,6 +97,37 @@ class HorariosOcupadosController(Resource):
 
         return {"horarios_ocupados": horas_ocupadas}, 200
 
+@reserva_ns.route('/disponibilidad')
+class DisponibilidadRangoController(Resource):
+    @reserva_ns.doc(params={
+        'canchas': {'description': 'IDs de cancha separados por coma', 'required': True, 'example': '1,2,3'},
+        'desde': {'description': 'Fecha inicial YYYY-MM-DD', 'required': True},
+        'hasta': {'description': 'Fecha final YYYY-MM-DD (incluida)', 'required': True}
+    })
+    @reserva_ns.response(400, 'Parámetros inválidos', error_response_model)
+    @reserva_ns.response(500, 'Error interno del servidor', error_response_model)
+    def get(self):
+        """Obtener horarios libres de varias canchas en un rango de fechas (vista de calendario)"""
+        print("🎯 Llegó request a /reserva/disponibilidad GET")
+
+        desde = request.args.get('desde')
+        hasta = request.args.get('hasta')
+        if not desde or not hasta:
+            return {"error": "Parámetros 'desde' y 'hasta' requeridos"}, 400
+
+        try:
+            cancha_ids = [int(c) for c in request.args.get('canchas', '').split(',') if c.strip()]
+        except ValueError:
+            return {"error": "Parámetro 'canchas' inválido (IDs separados por coma)"}, 400
+
+        try:
+            return ReservaService.obtener_disponibilidad_rango(cancha_ids, desde, hasta), 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception as e:
+            print(f"💥 Error interno: {str(e)}")
+            return {"error": "Error interno del servidor"}, 500
+
 @reserva_ns.route('/ya-reservado')
 class VerificarReservaUsuario(Resource):
     @reserva_ns.doc(params={
@@ -100,11 +162,24 @@ class MisReservasController(Resource):
     @reserva_ns.response(200, 'Lista de reservas obtenida', fields.List(fields.Nested(reserva_usuario_model)))
     @reserva_ns.response(401, 'No autorizado', error_response_model)
     @reserva_ns.response(500, 'Error interno del servidor', error_response_model)
+    @reserva_ns.doc(params={
+        'cursor': {'description': 'Modo paginado: cursor de la página (vacío para la primera)'},
+        'filtro': {'description': 'todas | proximas | pasadas (solo modo paginado)'},
+        'por_pagina': {'description': 'Reservas por página (máx. 50)'}
+    })
     def get(self):
-        """Obtener TODAS las reservas del usuario autenticado"""
+        """Obtener las reservas del usuario autenticado (todas, o paginadas con ?cursor=)"""
         print("🎯 Llegó request a /reserva/mis-reservas GET - TODAS las reservas")
         
         try:
+            # Modo cursor: ?cursor= (vacío para la primera página), ?filtro= y ?por_pagina=
+            if 'cursor' in request.args:
+                return ReservaService.obtener_mis_reservas_cursor(
+                    request.args.get('filtro', 'todas'),
+                    request.args.get('cursor'),
+                    request.args.get('por_pagina', 20, type=int)
+                ), 200
+
             # Usar el servicio simplificado
             reservas = ReservaService.obtener_todas_las_reservas_usuario()
             return reservas, 200
@@ -112,6 +187,8 @@ class MisReservasController(Resource):
         except PermissionError as e:
             print(f"❌ Error de autenticación: {str(e)}")
             return {"error": str(e)}, 401
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             print(f"💥 Error interno: {str(e)}")
             return {"error": "Error interno del servidor"}, 500
@@ -10,6 +10,56 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key")
+
+    # AUTH
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "300"))
+    AUTH_CACHE_MAX: int = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+    # Antigüedad máxima (s) de los claims del JWT para confiar en ellos sin consultar users
+    AUTH_CLAIMS_MAX_EDAD: int = int(os.getenv("AUTH_CLAIMS_MAX_EDAD", "900"))
+    # Invalidaciones de claims por usuario: 'sqlite' (compartidas en CACHE_SQLITE_PATH) o 'memoria' (un worker)
+    AUTH_INVALIDACIONES_BACKEND: str = os.getenv("AUTH_INVALIDACIONES_BACKEND", "sqlite")
+
+    # LOGIN: límites de intentos ('memoria' o 'sqlite' compartido en CACHE_SQLITE_PATH)
+    LOGIN_LIMITE_BACKEND: str = os.getenv("LOGIN_LIMITE_BACKEND", "memoria")
+    LOGIN_MAX_POR_IP: int = int(os.getenv("LOGIN_MAX_POR_IP", "20"))
+    LOGIN_VENTANA_IP: int = int(os.getenv("LOGIN_VENTANA_IP", "60"))
+    LOGIN_MAX_FALLOS_POR_EMAIL: int = int(os.getenv("LOGIN_MAX_FALLOS_POR_EMAIL", "5"))
+    LOGIN_VENTANA_EMAIL: int = int(os.getenv("LOGIN_VENTANA_EMAIL", "900"))
+
+    # CÓDIGOS DE VERIFICACIÓN: 'memoria' (un worker), 'sqlite' (CACHE_SQLITE_PATH) o 'sql' (BD principal)
+    VERIFICACION_BACKEND: str = os.getenv("VERIFICACION_BACKEND", "memoria")
+    VERIFICACION_TTL: int = int(os.getenv("VERIFICACION_TTL", "900"))
+    VERIFICACION_MAX_INTENTOS: int = int(os.getenv("VERIFICACION_MAX_INTENTOS", "5"))
+    VERIFICACION_BARRIDO_SEGUNDOS: int = int(os.getenv("VERIFICACION_BARRIDO_SEGUNDOS", "60"))
+
+    # SMTP (envío real de correos; en desarrollo apuntar a app.utils.smtp_stub)
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "1025"))
+    SMTP_USER: str = os.getenv("SMTP_USER", "")
+    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    # STARTTLS tras conectar (requerido por la mayoría de proveedores en el puerto 587)
+    SMTP_TLS: bool = os.getenv("SMTP_TLS", "false").lower() == "true"
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "10"))
+    SMTP_REMITENTE: str = os.getenv("SMTP_REMITENTE", "Sporthub <no-reply@sporthub.local>")
+
+    # Tareas de mantenimiento (outbox, finalizador de reservas, barridos) en los procesos web; false si corren en un worker aparte
+    TAREAS_EN_SEGUNDO_PLANO: bool = os.getenv("TAREAS_EN_SEGUNDO_PLANO", "true").lower() == "true"
+
+    # OUTBOX DE CORREOS
+    OUTBOX_LOTE: int = int(os.getenv("OUTBOX_LOTE", "20"))
+    OUTBOX_INTERVALO: float = float(os.getenv("OUTBOX_INTERVALO", "2"))
+    OUTBOX_MAX_INTENTOS: int = int(os.getenv("OUTBOX_MAX_INTENTOS", "6"))
+    OUTBOX_BACKOFF_BASE: int = int(os.getenv("OUTBOX_BACKOFF_BASE", "10"))
+    OUTBOX_BACKOFF_MAX: int = int(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+    # Las filas enviadas/fallidas se borran pasados estos días (la purga corre cada OUTBOX_PURGA_INTERVALO s)
+    OUTBOX_RETENCION_DIAS: int = int(os.getenv("OUTBOX_RETENCION_DIAS", "7"))
+    OUTBOX_PURGA_INTERVALO: int = int(os.getenv("OUTBOX_PURGA_INTERVALO", "3600"))
+
+    # PASSWORDS (bcrypt en pool de procesos)
+    BCRYPT_COSTO: int = int(os.getenv("BCRYPT_COSTO", "12"))
+    PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS", "2"))
+    PASSWORD_MAX_PENDIENTES: int = int(os.getenv("PASSWORD_MAX_PENDIENTES", "32"))
+    PASSWORD_ESPERA_MAX: float = float(os.getenv("PASSWORD_ESPERA_MAX", "5"))
     
     # DATABASE
     DB_USER: str = os.getenv("DB_USER", "root")
@@ -17,6 +67,35 @@ class Settings(BaseSettings):
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: str = os.getenv("DB_PORT", "3306")
     DB_NAME: str = os.getenv("DB_NAME", "sporthub")
+
+    # POSTS
+    TIMELINE_MAX_ENTRADAS: int = int(os.getenv("TIMELINE_MAX_ENTRADAS", "800"))
+
+    # IMAGENES
+    IMAGENES_WORKERS: int = int(os.getenv("IMAGENES_WORKERS", "2"))
+    # Conversiones en 'procesando' más de este tiempo se dan por interrumpidas
+    IMAGENES_TIMEOUT_MINUTOS: int = int(os.getenv("IMAGENES_TIMEOUT_MINUTOS", "30"))
+    IMAGENES_BARRIDO_INTERVALO: int = int(os.getenv("IMAGENES_BARRIDO_INTERVALO", "600"))
+
+    # RESERVAS
+    RESERVAS_FINALIZADOR_INTERVALO: int = int(os.getenv("RESERVAS_FINALIZADOR_INTERVALO", "300"))
+    RESERVAS_FINALIZADOR_LOTE: int = int(os.getenv("RESERVAS_FINALIZADOR_LOTE", "500"))
+
+    # CANCHAS
+    CANCHAS_CERCANAS_RADIO_MAX_KM: float = float(os.getenv("CANCHAS_CERCANAS_RADIO_MAX_KM", "50"))
+    CANCHAS_CERCANAS_MAX: int = int(os.getenv("CANCHAS_CERCANAS_MAX", "50"))
+
+    # CACHE
+    # 'memoria' (por proceso) o 'sqlite' (compartida entre workers de la misma máquina)
+    DISPONIBILIDAD_CACHE_BACKEND: str = os.getenv("DISPONIBILIDAD_CACHE_BACKEND", "memoria")
+    DISPONIBILIDAD_CACHE_TTL: int = int(os.getenv("DISPONIBILIDAD_CACHE_TTL", "300"))
+    DISPONIBILIDAD_CACHE_MAX: int = int(os.getenv("DISPONIBILIDAD_CACHE_MAX", "5000"))
+    HORARIOS_COMPILADOS_TTL: int = int(os.getenv("HORARIOS_COMPILADOS_TTL", "600"))
+    HORARIOS_COMPILADOS_MAX: int = int(os.getenv("HORARIOS_COMPILADOS_MAX", "2000"))
+    FESTIVOS_TTL: int = int(os.getenv("FESTIVOS_TTL", "3600"))
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", "sporthub_cache.db")
+    # Versiones de horarios y festivos: 'sqlite' (compartidas entre workers) o 'memoria' (un solo worker)
+    CACHE_GENERACIONES_BACKEND: str = os.getenv("CACHE_GENERACIONES_BACKEND", "sqlite")
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
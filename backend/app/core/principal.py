@@ -0,0 +1,156 @@
+# app/core/principal.py
+import time
+import hashlib
+from jose import jwt, ExpiredSignatureError, JWTError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.users.user_model import User
+from app.utils.cache_utils import CacheLRU, MarcasTiempoMemoria, MarcasTiempoSQLite
+
+# Campos del usuario que viajan en el JWT para autorizar sin consultar la tabla users
+CLAIMS_PRINCIPAL = ('email', 'role', 'name_user', 'urlphotoperfil', 'slug', 'status')
+
+class TokenExpirado(Exception):
+    pass
+
+class TokenInvalido(Exception):
+    pass
+
+class UsuarioNoEncontrado(Exception):
+    pass
+
+class Principal:
+    """
+    Usuario autenticado de la petición: los campos que usan los endpoints
+    (id, email, role, ...) sin ser una fila de la sesión de SQLAlchemy.
+    """
+    __slots__ = ('id',) + CLAIMS_PRINCIPAL + ('emitido_en',)
+
+    def __init__(self, id, emitido_en=0, **campos):
+        self.id = id
+        self.emitido_en = emitido_en
+        for campo in CLAIMS_PRINCIPAL:
+            setattr(self, campo, campos.get(campo))
+
+    @classmethod
+    def desde_usuario(cls, usuario, emitido_en=0):
+        return cls(usuario.id, emitido_en, **{campo: getattr(usuario, campo) for campo in CLAIMS_PRINCIPAL})
+
+    def __repr__(self):
+        return f'<Principal {self.id} {self.email}>'
+
+
+def claims_principal(usuario) -> dict:
+    """Claims a incluir en el JWT al hacer login"""
+    claims = {campo: getattr(usuario, campo) for campo in CLAIMS_PRINCIPAL}
+    claims['iat'] = int(time.time())
+    return claims
+
+
+def _crear_invalidaciones():
+    """
+    user_id -> instante a partir del cual sus claims previos no valen.
+    Una marca deja de importar cuando ya no puede quedar nada emitido antes de ella en uso:
+    claims más viejos que AUTH_CLAIMS_MAX_EDAD se revisan en BD y la caché dura AUTH_CACHE_TTL.
+    """
+    retencion = max(settings.AUTH_CLAIMS_MAX_EDAD, settings.AUTH_CACHE_TTL)
+    if settings.AUTH_INVALIDACIONES_BACKEND == 'sqlite':
+        return MarcasTiempoSQLite(settings.CACHE_SQLITE_PATH, 'auth_invalidaciones', retencion)
+    return MarcasTiempoMemoria(retencion)
+
+
+class VerificadorTokens:
+    """
+    Verificación de JWT con caché LRU de principals por hash del token.
+    - Acierto de caché: ni decode ni consulta a users.
+    - Fallo: decode; si el token trae los claims y son recientes se usan tal cual,
+      si no (tokens antiguos o usuario invalidado) se consulta la BD una vez.
+    Las entradas viven hasta AUTH_CACHE_TTL o la expiración del token, lo que llegue antes.
+    """
+
+    _cache = CacheLRU(settings.AUTH_CACHE_MAX, settings.AUTH_CACHE_TTL)
+    _invalidados = _crear_invalidaciones()
+
+    @staticmethod
+    def _clave(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _vigente(principal: Principal) -> bool:
+        return principal.emitido_en >= VerificadorTokens._invalidados.obtener(str(principal.id))
+
+    @staticmethod
+    def verificar(token: str, cargar_usuario, clave_secreta: str = None) -> Principal:
+        """
+        Devolver el Principal del token. cargar_usuario(user_id) -> User|None se usa
+        solo cuando los claims no alcanzan. Lanza TokenExpirado, TokenInvalido o UsuarioNoEncontrado.
+        """
+        clave = VerificadorTokens._clave(token)
+        cacheado = VerificadorTokens._cache.obtener(clave)
+        if cacheado is not None:
+            principal, expira = cacheado
+            if expira <= time.time():
+                VerificadorTokens._cache.eliminar(clave)
+                raise TokenExpirado()
+            if VerificadorTokens._vigente(principal):
+                return principal
+
+        try:
+            payload = jwt.decode(token, clave_secreta or settings.SECRET_KEY, algorithms=['HS256'])
+        except ExpiredSignatureError:
+            raise TokenExpirado()
+        except JWTError as e:
+            raise TokenInvalido(str(e))
+
+        user_id = payload.get('id')
+        emitido_en = payload.get('iat') or 0
+        claims_completos = all(campo in payload for campo in CLAIMS_PRINCIPAL)
+        claims_recientes = time.time() - emitido_en <= settings.AUTH_CLAIMS_MAX_EDAD
+
+        principal = Principal(user_id, emitido_en, **{campo: payload.get(campo) for campo in CLAIMS_PRINCIPAL})
+        if not (claims_completos and claims_recientes and VerificadorTokens._vigente(principal)):
+            usuario = cargar_usuario(user_id)
+            if not usuario:
+                raise UsuarioNoEncontrado()
+            # Datos frescos de BD: válidos frente a invalidaciones anteriores a este momento
+            principal = Principal.desde_usuario(usuario, emitido_en=time.time())
+
+        expira = payload.get('exp') or (time.time() + settings.AUTH_CACHE_TTL)
+        VerificadorTokens._cache.guardar(
+            clave, (principal, expira), ttl_segundos=max(1, min(settings.AUTH_CACHE_TTL, expira - time.time()))
+        )
+        return principal
+
+    @staticmethod
+    def invalidar_usuario(user_id: int):
+        """Hook para cambios de rol/estado/perfil: los claims emitidos antes de ahora dejan de usarse"""
+        VerificadorTokens._invalidados.marcar(str(user_id), time.time())
+
+
+_USUARIOS_PENDIENTES = 'usuarios_invalidados_pendientes'
+
+
+# Cualquier cambio en la fila del usuario invalida sus principals cacheados y sus claims.
+# Se publica tras el commit: invalidar antes permitiría recargar de BD los datos viejos como frescos.
+@event.listens_for(Session, 'after_flush')
+def _anotar_usuarios(session, contexto):
+    ids = session.info.setdefault(_USUARIOS_PENDIENTES, set())
+    for objeto in session.dirty:
+        if isinstance(objeto, User) and session.is_modified(objeto):
+            ids.add(objeto.id)
+    for objeto in session.deleted:
+        if isinstance(objeto, User):
+            ids.add(objeto.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_principales(session):
+    for user_id in session.info.pop(_USUARIOS_PENDIENTES, ()):
+        VerificadorTokens.invalidar_usuario(user_id)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _descartar_usuarios(session, transaccion):
+    if transaccion.parent is None:
+        session.info.pop(_USUARIOS_PENDIENTES, None)
@@ -29,6 +29,13 @@ def get_application() -> FastAPI:
 
 app = get_application()
 
+@app.on_event("startup")
+def iniciar_tareas():
+    # Los servicios usan la sesión de Flask-SQLAlchemy: las tareas corren con su app
+    if settings.TAREAS_EN_SEGUNDO_PLANO:
+        from app.utils import create_app, iniciar_tareas_en_segundo_plano
+        iniciar_tareas_en_segundo_plano(create_app())
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Sporthub API"}
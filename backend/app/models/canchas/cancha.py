@@ -1,10 +1,8 @@
 from app.utils.database import db
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Numeric
-from flask import request, current_app  # ✅ Agregar current_app aquí
-import os
-import base64
+from sqlalchemy import Numeric, event
+from app.utils.geo_utils import codificar_geohash
 
 class Cancha(db.Model):
     __tablename__ = 'canchas'
@@ -16,6 +14,7 @@ class Cancha(db.Model):
     direccion = db.Column(db.String(200), nullable=False)
     latitud = db.Column(db.Float, nullable=False)
     longitud = db.Column(db.Float, nullable=False)
+    geohash = db.Column(db.String(12), index=True, comment='Geohash de (latitud, longitud) para búsqueda por cercanía')
     direccion_completa = db.Column(db.String(300), nullable=False)
     superficie = db.Column(db.String(50), nullable=False)
     capacidad = db.Column(db.Integer, nullable=False)
@@ -63,83 +62,10 @@ class Cancha(db.Model):
             'amenidades': [{'amenidad': a.amenidad} for a in self.amenidades]
         }
 
-    def to_dict_con_imagenes_base64(self):
-        """
-        Incluir las imágenes completas en base64
-        """
-        data = self.to_dict_completo()
-        
-        # Reemplazar las URLs por datos base64
-        data['imagenes_base64'] = []
-        
-        for img in self.imagenes:
-            if img.url_imagen.startswith('/utils/pictures/'):
-                # Es una imagen local, cargar como base64
-                base64_data = self._cargar_imagen_a_base64(img.url_imagen)
-                if base64_data:
-                    data['imagenes_base64'].append({
-                        'id': img.id,
-                        'orden': img.orden,
-                        'data': base64_data,
-                        'nombre': os.path.basename(img.url_imagen),
-                        'tipo': 'local'
-                    })
-                else:
-                    # Si no se pudo cargar, mantener la URL original
-                    data['imagenes_base64'].append({
-                        'id': img.id,
-                        'orden': img.orden,
-                        'url': img.url_imagen,
-                        'tipo': 'local_error'
-                    })
-            else:
-                # Es una URL externa, mantener como URL
-                data['imagenes_base64'].append({
-                    'id': img.id,
-                    'orden': img.orden,
-                    'url': img.url_imagen,
-                    'tipo': 'externo'
-                })
-        
-        return data
 
-    def _cargar_imagen_a_base64(self, ruta_imagen):
-        """
-        Cargar imagen del sistema de archivos y convertir a base64
-        """
-        try:
-            # Construir ruta completa
-            if ruta_imagen.startswith('/'):
-                ruta_completa = os.path.join(current_app.root_path, ruta_imagen.lstrip('/'))
-            else:
-                ruta_completa = os.path.join(current_app.root_path, 'utils', 'pictures', 'canchas', str(self.id), ruta_imagen)
-            
-            print(f"📁 Intentando cargar imagen: {ruta_completa}")
-            
-            # Verificar que el archivo existe
-            if not os.path.exists(ruta_completa):
-                print(f"❌ Imagen no encontrada: {ruta_completa}")
-                return None
-            
-            # Leer imagen y convertir a base64
-            with open(ruta_completa, 'rb') as img_file:
-                imagen_bytes = img_file.read()
-                base64_encoded = base64.b64encode(imagen_bytes).decode('utf-8')
-                
-                # Determinar el tipo MIME
-                extension = os.path.splitext(ruta_completa)[1].lower()
-                mime_types = {
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.png': 'image/png',
-                    '.gif': 'image/gif',
-                    '.webp': 'image/webp'
-                }
-                mime_type = mime_types.get(extension, 'image/jpeg')
-                
-                print(f"✅ Imagen convertida a base64: {os.path.basename(ruta_imagen)}")
-                return f"data:{mime_type};base64,{base64_encoded}"
-                
-        except Exception as e:
-            print(f"❌ Error cargando imagen a base64: {str(e)}")
-            return None
\ No newline at end of file
+# Mantener el geohash sincronizado con las coordenadas
+@event.listens_for(Cancha, 'before_insert')
+@event.listens_for(Cancha, 'before_update')
+def _actualizar_geohash(mapper, connection, target):
+    if target.latitud is not None and target.longitud is not None:
+        target.geohash = codificar_geohash(target.latitud, target.longitud)
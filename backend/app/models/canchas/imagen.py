@@ -7,9 +7,13 @@ class Imagen(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     cancha_id = db.Column(db.Integer, db.ForeignKey('canchas.id'), nullable=True)
-    player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # los jugadores viven en users
     url_imagen = db.Column(db.String(255), nullable=False)
     orden = db.Column(db.Integer, default=0)
+    estado = db.Column(db.String(20), nullable=False, default='listo', server_default='listo')  # 'procesando', 'listo', 'error'
+    ancho = db.Column(db.Integer, nullable=True)
+    alto = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.String(1024), nullable=True, comment='Data URI WebP de ~16px calculado al subir')
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
 
 
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app.utils.database import db
+
+class CorreoSaliente(db.Model):
+    """
+    Outbox de correos: la petición inserta la fila y responde;
+    el emisor en segundo plano la envía con reintentos y backoff.
+    """
+    __tablename__ = 'correos_salientes'
+    __table_args__ = (
+        # El emisor lee WHERE estado = 'pendiente' AND proximo_intento <= ahora ORDER BY id
+        db.Index('ix_correos_salientes_pendientes', 'estado', 'proximo_intento', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False, comment='p.ej. verificacion')
+    destinatario = db.Column(db.String(255), nullable=False)
+    datos = db.Column(db.JSON, nullable=False, comment='Argumentos del envío')
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')  # 'pendiente', 'enviado', 'fallido'
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    proximo_intento = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    ultimo_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    enviado_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'destinatario': self.destinatario,
+            'estado': self.estado,
+            'intentos': self.intentos,
+            'proximo_intento': self.proximo_intento.isoformat() if self.proximo_intento else None,
+            'ultimo_error': self.ultimo_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'enviado_at': self.enviado_at.isoformat() if self.enviado_at else None
+        }
@@ -3,16 +3,26 @@ from datetime import datetime
 
 class Post(db.Model):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Paginación por cursor (created_at, id) del feed y de "mis posts"
+        db.Index('ix_posts_feed_cursor', 'eliminado', 'created_at', 'id'),
+        db.Index('ix_posts_usuario_cursor', 'usuario_id', 'eliminado', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     tipo_post = db.Column(db.Enum('texto', 'foto'), nullable=False)
     contenido = db.Column(db.Text, nullable=False)
     imagen_url = db.Column(db.String(500), nullable=True)
+    imagen_estado = db.Column(db.String(20), nullable=False, default='listo', server_default='listo')  # 'procesando', 'listo', 'error'
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     eliminado = db.Column(db.Boolean, default=False)
 
+    # Contadores desnormalizados (se mantienen en PostService, reconciliar con ContadoresPostService)
+    likes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comments_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # Relaciones
     usuario = db.relationship('User', backref=db.backref('posts', lazy=True))
     comentarios = db.relationship('PostComentario', backref='post', lazy=True)
@@ -25,6 +35,7 @@ class Post(db.Model):
             'tipo_post': self.tipo_post,
             'contenido': self.contenido,
             'imagen_url': self.imagen_url,
+            'imagen_estado': self.imagen_estado,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'eliminado': self.eliminado,
@@ -33,8 +44,8 @@ class Post(db.Model):
                 'name_user': self.usuario.name_user,
                 'urlphotoperfil': self.usuario.urlphotoperfil
             } if self.usuario else None,
-            'total_comentarios': len([c for c in self.comentarios if not c.eliminado]),
-            'total_likes': len(self.likes)
+            'total_comentarios': self.comments_count or 0,
+            'total_likes': self.likes_count or 0
         }
 
 class PostComentario(db.Model):
@@ -48,6 +59,9 @@ class PostComentario(db.Model):
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     eliminado = db.Column(db.Boolean, default=False)
 
+    # Contador desnormalizado de likes
+    likes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # Relaciones
     usuario = db.relationship('User', backref=db.backref('comentarios', lazy=True))
     likes = db.relationship('ComentarioLike', backref='comentario', lazy=True)
@@ -66,11 +80,15 @@ class PostComentario(db.Model):
                 'name_user': self.usuario.name_user,
                 'urlphotoperfil': self.usuario.urlphotoperfil
             } if self.usuario else None,
-            'total_likes': len(self.likes)
+            'total_likes': self.likes_count or 0
         }
 
 class PostLike(db.Model):
     __tablename__ = 'post_likes'
+    __table_args__ = (
+        # Paginación por cursor de "mis likes"
+        db.Index('ix_post_likes_usuario_cursor', 'usuario_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
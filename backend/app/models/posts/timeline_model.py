@@ -0,0 +1,25 @@
+from app.utils.database import db
+
+class TimelineEntrada(db.Model):
+    """
+    Timeline materializado en escritura: una fila por (lector, post).
+    La lectura del home es un range scan sobre (usuario_id, post_created_at, post_id).
+    """
+    __tablename__ = 'timeline_entradas'
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'post_id', name='uq_timeline_usuario_post'),
+        db.Index('ix_timeline_usuario_cursor', 'usuario_id', 'post_created_at', 'post_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
+    post_created_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'usuario_id': self.usuario_id,
+            'post_id': self.post_id,
+            'post_created_at': self.post_created_at.isoformat() if self.post_created_at else None
+        }
@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, Time, DateTime, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 from decimal import Decimal
 
 class Reserva(Base):
     __tablename__ = 'reservas'
+    __table_args__ = (
+        # Un horario solo puede tener una reserva activa. MySQL no tiene índices parciales:
+        # las canceladas ponen slot_activo a NULL y los NULL no chocan en un índice único.
+        UniqueConstraint('cancha_id', 'fecha', 'hora', 'slot_activo', name='uq_reservas_slot_activo'),
+        # Barrido de reservas pasadas: WHERE estado = 'confirmada' AND (fecha, hora) < ahora
+        Index('ix_reservas_estado_fecha_hora', 'estado', 'fecha', 'hora'),
+        # "Mis reservas" paginado por (fecha, hora, id) dentro de cada usuario
+        Index('ix_reservas_usuario_fecha_hora', 'user_id', 'fecha', 'hora', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cancha_id = Column(Integer, ForeignKey('canchas.id'), nullable=False)
@@ -12,8 +21,9 @@ class Reserva(Base):
     fecha = Column(Date, nullable=False)
     hora = Column(Time, nullable=False)
     estado = Column(String(20), default='pendiente') # 'pendiente', 'confirmada', 'cancelada'
+    slot_activo = Column(Boolean, nullable=True, default=True) # True mientras ocupa el horario, NULL si está cancelada
     created_at = Column(DateTime, server_default=func.now())
     
     # Relaciones
-    cancha = relationship('Cancha', back_populates='reservas')
+    cancha = relationship('Cancha', backref='reservas')
     usuario = relationship('User', backref='reservas')
\ No newline at end of file
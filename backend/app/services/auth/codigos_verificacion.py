@@ -0,0 +1,163 @@
+# app/services/auth/codigos_verificacion.py
+import hmac
+import time
+import hashlib
+import threading
+from sqlalchemy import MetaData, Table, Column, String, Float, Integer, create_engine, delete, select, update
+from app.core.config import settings
+
+def _hash_codigo(email: str, codigo: str) -> str:
+    """Los códigos no se guardan en claro: sha256 de email + código"""
+    return hashlib.sha256(f"{email}:{codigo}".encode('utf-8')).hexdigest()
+
+def _normalizar(email: str) -> str:
+    return (email or '').strip().lower()
+
+
+class AlmacenCodigosMemoria:
+    """
+    Códigos de verificación en memoria del proceso, con TTL e intentos máximos.
+    Un hilo daemon barre los expirados cada VERIFICACION_BARRIDO_SEGUNDOS.
+    Solo sirve con un único worker.
+    """
+
+    def __init__(self, ttl_segundos: int, max_intentos: int, barrido_segundos: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_intentos = max_intentos
+        self._codigos = {}  # email -> [hash_codigo, expira, intentos]
+        self._lock = threading.Lock()
+        hilo = threading.Thread(target=self._barrer_periodicamente, args=(barrido_segundos,),
+                                name='barrido-codigos-verificacion', daemon=True)
+        hilo.start()
+
+    def _barrer_periodicamente(self, intervalo: int):
+        while True:
+            time.sleep(intervalo)
+            self.purgar_expirados()
+
+    def guardar(self, email: str, codigo: str):
+        email = _normalizar(email)
+        with self._lock:
+            self._codigos[email] = [_hash_codigo(email, codigo), time.time() + self.ttl_segundos, 0]
+
+    def verificar(self, email: str, codigo: str, consumir: bool = True) -> bool:
+        email = _normalizar(email)
+        with self._lock:
+            entrada = self._codigos.get(email)
+            if entrada is None:
+                return False
+            hash_codigo, expira, intentos = entrada
+            if expira < time.time() or intentos >= self.max_intentos:
+                del self._codigos[email]
+                return False
+            if not hmac.compare_digest(hash_codigo, _hash_codigo(email, codigo)):
+                entrada[2] += 1
+                return False
+            if consumir:
+                del self._codigos[email]
+            return True
+
+    def eliminar(self, email: str):
+        with self._lock:
+            self._codigos.pop(_normalizar(email), None)
+
+    def purgar_expirados(self) -> int:
+        ahora = time.time()
+        with self._lock:
+            expirados = [email for email, (_, expira, _) in self._codigos.items() if expira < ahora]
+            for email in expirados:
+                del self._codigos[email]
+        return len(expirados)
+
+
+class AlmacenCodigosSQL:
+    """
+    Códigos de verificación en una tabla SQL (MySQL de la app o un archivo SQLite local),
+    compartidos por todos los workers. Búsqueda por clave primaria (email).
+    Los expirados se borran al leerlos y cada 100 códigos guardados (purgar_expirados).
+    """
+
+    def __init__(self, engine, ttl_segundos: int, max_intentos: int):
+        self.engine = engine
+        self.ttl_segundos = ttl_segundos
+        self.max_intentos = max_intentos
+        self._guardados = 0
+        self.tabla = Table(
+            'codigos_verificacion', MetaData(),
+            Column('email', String(255), primary_key=True),
+            Column('codigo_hash', String(64), nullable=False),
+            Column('expira', Float, nullable=False, index=True),
+            Column('intentos', Integer, nullable=False, default=0)
+        )
+        self.tabla.create(self.engine, checkfirst=True)
+
+    def guardar(self, email: str, codigo: str):
+        email = _normalizar(email)
+        with self.engine.begin() as conexion:
+            conexion.execute(delete(self.tabla).where(self.tabla.c.email == email))
+            conexion.execute(self.tabla.insert().values(
+                email=email, codigo_hash=_hash_codigo(email, codigo),
+                expira=time.time() + self.ttl_segundos, intentos=0
+            ))
+        self._guardados += 1
+        if self._guardados % 100 == 0:
+            self.purgar_expirados()
+
+    def verificar(self, email: str, codigo: str, consumir: bool = True) -> bool:
+        """
+        El intento se cuenta antes de comparar con un UPDATE condicionado (intentos < max_intentos):
+        la fila queda bloqueada hasta el commit, así verificaciones concurrentes no superan el máximo
+        """
+        email = _normalizar(email)
+        ahora = time.time()
+        por_email = self.tabla.c.email == email
+        with self.engine.begin() as conexion:
+            contado = conexion.execute(
+                update(self.tabla)
+                .where(por_email, self.tabla.c.intentos < self.max_intentos, self.tabla.c.expira >= ahora)
+                .values(intentos=self.tabla.c.intentos + 1)
+            ).rowcount
+            if not contado:
+                # No existe, expiró o agotó los intentos
+                conexion.execute(delete(self.tabla).where(por_email))
+                return False
+            codigo_hash = conexion.execute(select(self.tabla.c.codigo_hash).where(por_email)).scalar_one()
+            if not hmac.compare_digest(codigo_hash, _hash_codigo(email, codigo)):
+                return False
+            if consumir:
+                conexion.execute(delete(self.tabla).where(por_email))
+            else:
+                # Código correcto sin consumir: el intento no cuenta
+                conexion.execute(update(self.tabla).where(por_email).values(intentos=self.tabla.c.intentos - 1))
+            return True
+
+    def eliminar(self, email: str):
+        with self.engine.begin() as conexion:
+            conexion.execute(delete(self.tabla).where(self.tabla.c.email == _normalizar(email)))
+
+    def purgar_expirados(self) -> int:
+        with self.engine.begin() as conexion:
+            return conexion.execute(delete(self.tabla).where(self.tabla.c.expira < time.time())).rowcount
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+def obtener_almacen_codigos():
+    """
+    Almacén configurado en VERIFICACION_BACKEND:
+    'memoria' (un worker), 'sqlite' (workers de una máquina) o 'sql' (BD de la aplicación).
+    """
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                ttl, intentos = settings.VERIFICACION_TTL, settings.VERIFICACION_MAX_INTENTOS
+                if settings.VERIFICACION_BACKEND == 'sql':
+                    from app.db.session import engine
+                    _almacen = AlmacenCodigosSQL(engine, ttl, intentos)
+                elif settings.VERIFICACION_BACKEND == 'sqlite':
+                    _almacen = AlmacenCodigosSQL(create_engine(f"sqlite:///{settings.CACHE_SQLITE_PATH}"), ttl, intentos)
+                else:
+                    _almacen = AlmacenCodigosMemoria(ttl, intentos, settings.VERIFICACION_BARRIDO_SEGUNDOS)
+    return _almacen
@@ -0,0 +1,51 @@
+# app/services/auth/limitador_login_service.py
+import math
+from app.core.config import settings
+from app.utils.rate_limit import LimitadorVentana, LimitadorVentanaSQLite
+
+def _crear_limitador(nombre: str, max_eventos: int, ventana_segundos: int):
+    """En memoria por proceso o en SQLite compartido entre workers de la máquina"""
+    if settings.LOGIN_LIMITE_BACKEND == 'sqlite':
+        return LimitadorVentanaSQLite(settings.CACHE_SQLITE_PATH, f'limite_login_{nombre}', max_eventos, ventana_segundos)
+    return LimitadorVentana(max_eventos, ventana_segundos)
+
+class LimitadorLoginService:
+    """
+    Freno a la fuerza bruta en el login con ventanas deslizantes:
+    - por IP: todos los intentos (frena el credential stuffing contra muchos emails)
+    - por email: los intentos fallidos; un login correcto lo reinicia
+    El intento se reserva antes de tocar la BD o bcrypt, comprobando y anotando en un solo paso:
+    cuenta como fallo hasta que el login sale bien, así los intentos concurrentes contra un
+    email no pasan todos el límite mientras bcrypt compara.
+    """
+
+    _por_ip = _crear_limitador('ip', settings.LOGIN_MAX_POR_IP, settings.LOGIN_VENTANA_IP)
+    _por_email = _crear_limitador('email', settings.LOGIN_MAX_FALLOS_POR_EMAIL, settings.LOGIN_VENTANA_EMAIL)
+
+    @staticmethod
+    def _clave_email(email: str) -> str:
+        return (email or '').strip().lower()
+
+    @staticmethod
+    def reservar_intento(email: str, ip: str) -> tuple:
+        """
+        (espera, reserva): espera son los segundos de Retry-After si el intento debe rechazarse (0 si continúa);
+        reserva identifica el intento anotado para anular_intento()
+        """
+        espera, _ = LimitadorLoginService._por_ip.reservar(ip or 'desconocida')
+        if espera:
+            return math.ceil(espera), None
+        espera, reserva = LimitadorLoginService._por_email.reservar(LimitadorLoginService._clave_email(email))
+        if espera:
+            return math.ceil(espera), None
+        return 0, reserva
+
+    @staticmethod
+    def anular_intento(email: str, reserva):
+        """El intento no llegó a comprobar la contraseña (servicio saturado, error interno): no cuenta como fallo"""
+        if reserva is not None:
+            LimitadorLoginService._por_email.liberar(LimitadorLoginService._clave_email(email), reserva)
+
+    @staticmethod
+    def registrar_exito(email: str):
+        LimitadorLoginService._por_email.limpiar(LimitadorLoginService._clave_email(email))
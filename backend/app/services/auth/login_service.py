@@ -1,36 +1,50 @@
-from app.models.user_model import User
+from app.models.users.user_model import User
 from app.utils.database import db
 from app.models.owner_model import Owner
-from app.models.imagen import Imagen
+from app.models.canchas.imagen import Imagen
 from app.models.player_model import Player
-import bcrypt
+from app.services.auth.password_service import PasswordService, PasswordServiceSaturado
+from app.services.auth.limitador_login_service import LimitadorLoginService
 import jwt
-from flask import make_response, jsonify
+from flask import make_response, jsonify, request
 from datetime import datetime, timedelta
 from app.utils.config import Config
+from app.core.principal import claims_principal
 
 class AuthLoginService:
     @staticmethod
     def login_user(data):
+        reserva = None
         try:
+            # Límite por IP y por email antes de tocar la BD o bcrypt (el intento queda reservado)
+            espera, reserva = LimitadorLoginService.reservar_intento(data['email'], request.remote_addr)
+            if espera:
+                response = make_response(jsonify({'message': 'Demasiados intentos de inicio de sesión, intenta más tarde'}), 429)
+                response.headers['Retry-After'] = str(espera)
+                return response
+
             print("🔍 Buscando usuario...")
             user = User.query.filter_by(email=data['email']).first()
             if not user:
                 return make_response(jsonify({'message': 'El email ingresado no está registrado'}), 401)
 
             print("🔐 Verificando contraseña...")
-            input_pw = data['password'].encode('utf-8')
-            stored_pw = user.password.encode('utf-8')
-
-            if not bcrypt.checkpw(input_pw, stored_pw):
+            valida, nuevo_hash = PasswordService.verificar_y_actualizar(data['password'], user.password)
+            if not valida:
                 return make_response(jsonify({'message': 'La contraseña es incorrecta'}), 401)
+            LimitadorLoginService.registrar_exito(data['email'])
+
+            # Rehash transparente si el coste configurado subió
+            if nuevo_hash:
+                user.password = nuevo_hash
+                db.session.commit()
 
             print(f"🎭 Role detectado: {user.role}")  # Cambié .value por .role directo
 
             # Generar JWT
             payload = {
                 'id': user.id,
-                'role': user.role,  # Cambié .value por .role directo
+                **claims_principal(user),  # role, email, status... para autorizar sin consultar users
                 'exp': datetime.utcnow() + timedelta(days=1)
             }
             token = jwt.encode(payload, Config.SECRET_KEY, algorithm='HS256')
@@ -59,6 +73,12 @@ class AuthLoginService:
             print("✅ Login exitoso.")
             return response
 
+        except PasswordServiceSaturado:
+            LimitadorLoginService.anular_intento(data.get('email'), reserva)
+            response = make_response(jsonify({'message': 'Servicio ocupado, intenta de nuevo en unos segundos'}), 503)
+            response.headers['Retry-After'] = '1'
+            return response
         except Exception as e:
+            LimitadorLoginService.anular_intento(data.get('email'), reserva)
             print("❌ Error durante el login:", str(e))
             return make_response(jsonify({'message': 'Error interno del servidor'}), 500)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# app/services/auth/password_service.py
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from app.core.config import settings
+
+def _hashear(password: str, costo: int) -> str:
+    """Se ejecuta en el pool de procesos"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=costo)).decode('utf-8')
+
+def _verificar(password: str, hash_guardado: str) -> bool:
+    """Se ejecuta en el pool de procesos"""
+    return bcrypt.checkpw(password.encode('utf-8'), hash_guardado.encode('utf-8'))
+
+def costo_de_hash(hash_guardado: str) -> int:
+    """Factor de coste de un hash bcrypt ('$2b$12$...' -> 12); 0 si no se reconoce"""
+    try:
+        return int(hash_guardado.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+class PasswordServiceSaturado(Exception):
+    """Hay demasiadas operaciones de hash en cola: el llamador debe responder 503"""
+    pass
+
+class PasswordService:
+    """
+    Hash y verificación de contraseñas con bcrypt fuera del hilo de la petición.
+    Un pool de procesos (settings.PASSWORD_WORKERS) limita la CPU dedicada a bcrypt y
+    un semáforo (settings.PASSWORD_MAX_PENDIENTES) acota la cola: un pico de logins
+    no deja sin hilos al resto de endpoints.
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+    _cupos = threading.BoundedSemaphore(settings.PASSWORD_MAX_PENDIENTES)
+
+    @staticmethod
+    def _obtener_pool() -> ProcessPoolExecutor:
+        """Pool de procesos perezoso (spawn: seguro aunque el servidor use hilos)"""
+        if PasswordService._pool is None:
+            with PasswordService._pool_lock:
+                if PasswordService._pool is None:
+                    PasswordService._pool = ProcessPoolExecutor(
+                        max_workers=settings.PASSWORD_WORKERS,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return PasswordService._pool
+
+    @staticmethod
+    def _descartar_pool(pool: ProcessPoolExecutor):
+        """Quitar un pool roto (p.ej. un worker murió por OOM) para que el siguiente envío cree otro"""
+        with PasswordService._pool_lock:
+            if PasswordService._pool is not pool:
+                return  # otro hilo ya lo descartó
+            PasswordService._pool = None
+        print("⚠️ Pool de contraseñas roto: se recrea")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _enviar(funcion, *args, esperar: bool = True):
+        """Encolar en el pool ocupando un cupo; el cupo se libera al terminar. Si el pool está roto se recrea una vez."""
+        timeout = settings.PASSWORD_ESPERA_MAX if esperar else None
+        if not PasswordService._cupos.acquire(blocking=esperar, timeout=timeout):
+            raise PasswordServiceSaturado("Demasiadas operaciones de contraseña en curso")
+        try:
+            pool = PasswordService._obtener_pool()
+            try:
+                futuro = pool.submit(funcion, *args)
+            except BrokenProcessPool:
+                PasswordService._descartar_pool(pool)
+                futuro = PasswordService._obtener_pool().submit(funcion, *args)
+        except Exception:
+            PasswordService._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: PasswordService._cupos.release())
+        return futuro
+
+    @staticmethod
+    def _ejecutar(funcion, *args):
+        """Esperar el resultado; si el pool se rompe con la tarea en curso se reintenta una vez (bcrypt es idempotente)"""
+        pool = PasswordService._obtener_pool()
+        try:
+            return PasswordService._enviar(funcion, *args).result()
+        except BrokenProcessPool:
+            PasswordService._descartar_pool(pool)
+            return PasswordService._enviar(funcion, *args).result()
+
+    @staticmethod
+    async def _ejecutar_async(funcion, *args):
+        pool = PasswordService._obtener_pool()
+        try:
+            return await asyncio.wrap_future(PasswordService._enviar(funcion, *args, esperar=False))
+        except BrokenProcessPool:
+            PasswordService._descartar_pool(pool)
+            return await asyncio.wrap_future(PasswordService._enviar(funcion, *args, esperar=False))
+
+    # --- API síncrona (servicios Flask) ---
+
+    @staticmethod
+    def hashear(password: str) -> str:
+        return PasswordService._ejecutar(_hashear, password, settings.BCRYPT_COSTO)
+
+    @staticmethod
+    def verificar(password: str, hash_guardado: str) -> bool:
+        return PasswordService._ejecutar(_verificar, password, hash_guardado)
+
+    # --- API async (rutas FastAPI): no bloquea el event loop ni ocupa el threadpool ---
+
+    @staticmethod
+    async def hashear_async(password: str) -> str:
+        return await PasswordService._ejecutar_async(_hashear, password, settings.BCRYPT_COSTO)
+
+    @staticmethod
+    async def verificar_async(password: str, hash_guardado: str) -> bool:
+        return await PasswordService._ejecutar_async(_verificar, password, hash_guardado)
+
+    # --- Rehash transparente al subir el coste ---
+
+    @staticmethod
+    def necesita_rehash(hash_guardado: str) -> bool:
+        return costo_de_hash(hash_guardado) < settings.BCRYPT_COSTO
+
+    @staticmethod
+    def verificar_y_actualizar(password: str, hash_guardado: str) -> tuple:
+        """(valida, nuevo_hash): nuevo_hash no es None si hay que guardar un hash con el coste actual"""
+        if not PasswordService.verificar(password, hash_guardado):
+            return False, None
+        if PasswordService.necesita_rehash(hash_guardado):
+            return True, PasswordService.hashear(password)
+        return True, None
+
+    @staticmethod
+    async def verificar_y_actualizar_async(password: str, hash_guardado: str) -> tuple:
+        if not await PasswordService.verificar_async(password, hash_guardado):
+            return False, None
+        if PasswordService.necesita_rehash(hash_guardado):
+            return True, await PasswordService.hashear_async(password)
+        return True, None
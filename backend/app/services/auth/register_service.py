@@ -1,9 +1,11 @@
-import bcrypt
+from app.services.auth.password_service import PasswordService
 import json
-from app.models.user_model import User
+from app.models.users.user_model import User
 from app.utils.database import db
 from datetime import datetime
 from app.services.email.email_service import EmailService
+from app.services.auth.codigos_verificacion import obtener_almacen_codigos
+from app.services.email.outbox_service import OutboxService
 
 class AuthService:
     @staticmethod
@@ -51,10 +53,7 @@ class AuthService:
 
             # Hashear la contraseña
             print("🔐 Hasheando contraseña...")
-            hashed_password = bcrypt.hashpw(
-                data['password'].encode('utf-8'),
-                bcrypt.gensalt()
-            ).decode('utf-8')
+            hashed_password = PasswordService.hashear(data['password'])
             
             print("✅ Contraseña hasheada correctamente")
 
@@ -75,19 +74,16 @@ class AuthService:
             print("🔐 Generando código de verificación...")
             verification_code = EmailService.generate_verification_code()
             
-            # Enviar email de verificación
-            email_sent = EmailService.send_verification_email(
+            # Almacenar código de verificación
+            obtener_almacen_codigos().guardar(data['email'], verification_code)
+            
+            # Encolar el email de verificación: lo envía el emisor del outbox en segundo plano
+            OutboxService.encolar_verificacion(
                 user_email=data['email'],
                 user_name=data['name_user'],
                 verification_code=verification_code
             )
             
-            if not email_sent:
-                raise ValueError("Error al enviar el email de verificación. Intenta nuevamente.")
-            
-            # Almacenar código de verificación
-            EmailService.store_verification_code(data['email'], verification_code)
-            
             # ✅ Preparar datos del usuario para almacenamiento temporal INCLUYENDO SLUG
             user_data = {
                 'name_user': data['name_user'],
@@ -123,8 +119,8 @@ class AuthService:
             if not user_data:
                 raise ValueError("Datos de usuario no encontrados")
             
-            # Verificar código
-            if not EmailService.verify_code(email, verification_code):
+            # Verificar código (se consume después de crear el usuario; cada fallo suma un intento)
+            if not obtener_almacen_codigos().verificar(email, verification_code, consumir=False):
                 raise ValueError("Código de verificación inválido o expirado")
             
             # Verificar nuevamente que el email no exista (por si acaso)
@@ -153,8 +149,7 @@ class AuthService:
             print(f"✅ Usuario creado exitosamente después de verificación - Slug: {user.slug}")
             
             # Limpiar código de verificación
-            if email in EmailService.verification_codes:
-                del EmailService.verification_codes[email]
+            obtener_almacen_codigos().eliminar(email)
             
             # Calcular edad para la respuesta
             hoy = datetime.now()
@@ -192,19 +187,16 @@ class AuthService:
             # Generar nuevo código
             new_code = EmailService.generate_verification_code()
             
-            # Enviar email
-            email_sent = EmailService.send_verification_email(
+            # Actualizar código
+            obtener_almacen_codigos().guardar(email, new_code)
+            
+            # Encolar email (envío en segundo plano)
+            OutboxService.encolar_verificacion(
                 user_email=email,
                 user_name=name_user,
                 verification_code=new_code
             )
             
-            if not email_sent:
-                raise ValueError("Error al reenviar el email de verificación")
-            
-            # Actualizar código
-            EmailService.store_verification_code(email, new_code)
-            
             return {
                 'message': 'Nuevo código de verificación enviado',
                 'email': email
@@ -1,21 +1,22 @@
 import os
-import uuid
 import json
-from PIL import Image
-from flask import current_app, url_for
-from werkzeug.utils import secure_filename
+from flask import url_for
 from datetime import datetime, time, timedelta
-from app.models.cancha import Cancha
-from app.models.imagen import Imagen
-from app.models.horario_cancha import HorarioCancha
-from app.models.regla_cancha import ReglaCancha
-from app.models.amenidad_cancha import AmenidadCancha
+from app.models.canchas.cancha import Cancha
+from app.models.canchas.imagen import Imagen
+from app.models.canchas.horario_cancha import HorarioCancha
+from app.models.canchas.regla_cancha import ReglaCancha
+from app.models.canchas.amenidad_cancha import AmenidadCancha
 from app.utils.database import db
 from app.utils.auth_utils import obtener_usuario_desde_token
-from app.models.dia_festivo import DiaFestivo
-from app.models.reserva import Reserva
+from app.utils.cursor_utils import codificar_cursor, decodificar_cursor
+from app.utils.geo_utils import codificar_geohash, celdas_vecinas, distancia_km
+from app.core.config import settings
+from app.services.reservas.disponibilidad_service import DisponibilidadService
+from app.services.reservas.horario_compilado import HorarioCompiladoService, a_minutos
+from app.services.imagenes.imagen_service import ImagenService, ESTADO_PROCESANDO, ESTADO_LISTO, ESTADO_ERROR
 from sqlalchemy import Numeric
-import calendar
+from sqlalchemy.orm import selectinload
 
 class CanchaService:
 
@@ -48,17 +49,20 @@ class CanchaService:
         db.session.add(cancha)
         db.session.flush()
 
-        # ✅ MANEJO DE IMÁGENES - Guardar como WebP
+        # ✅ MANEJO DE IMÁGENES - Guardar original; el WebP se genera en segundo plano
         urls_imagenes = []
+        imagenes_pendientes = []
         if imagenes_files:
             for i, imagen_file in enumerate(imagenes_files):
                 if imagen_file and imagen_file.filename:
-                    url_imagen = CanchaService._guardar_y_convertir_a_webp(imagen_file, cancha.id)
-                    if url_imagen:
+                    pendiente = CanchaService._guardar_imagen_pendiente(imagen_file, cancha.id)
+                    if pendiente:
+                        url_imagen = pendiente['url_relativa']
                         urls_imagenes.append(url_imagen)
-                        imagen = Imagen(cancha_id=cancha.id, url_imagen=url_imagen, orden=i)
+                        imagen = Imagen(cancha_id=cancha.id, url_imagen=url_imagen, orden=i, estado=ESTADO_PROCESANDO)
                         db.session.add(imagen)
-                        print(f"📸 Imagen convertida a WebP: {url_imagen}")
+                        imagenes_pendientes.append((imagen, pendiente))
+                        print(f"📸 Imagen en cola para WebP: {url_imagen}")
 
         # URLs de imágenes (compatibilidad)
         for i, url in enumerate(data.get('imagenes', [])):
@@ -72,62 +76,43 @@ class CanchaService:
         CanchaService._procesar_amenidades(data.get('amenidades', []), cancha.id)
 
         db.session.commit()
+
+        # Encolar conversiones una vez que las filas de imagen tienen ID
+        for imagen, pendiente in imagenes_pendientes:
+            CanchaService._encolar_imagen(imagen.id, pendiente)
+
         print("✅ Cancha creada exitosamente")
         return cancha
 
     @staticmethod
-    def _guardar_y_convertir_a_webp(imagen_file, cancha_id):
+    def _guardar_imagen_pendiente(imagen_file, cancha_id):
         """
-        Guardar imagen y convertir a WebP como archivo
+        Guardar el original de la imagen y reservar la ruta del WebP
         """
         try:
-            # Crear directorios
-            upload_folder = os.path.join(current_app.root_path, 'utils', 'pictures', 'canchas', str(cancha_id))
-            webp_folder = os.path.join(upload_folder, 'webp')
-            os.makedirs(webp_folder, exist_ok=True)
-            
-            # Generar nombres únicos
-            original_filename = secure_filename(imagen_file.filename)
-            name_without_ext = os.path.splitext(original_filename)[0]
-            unique_id = uuid.uuid4().hex
-            
-            # Guardar original temporalmente
-            temp_path = os.path.join(upload_folder, f"temp_{unique_id}_{original_filename}")
-            imagen_file.save(temp_path)
-            
-            try:
-                # Abrir y procesar imagen
-                with Image.open(temp_path) as img:
-                    # Convertir a RGB si es necesario
-                    if img.mode in ('RGBA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Redimensionar si es muy grande (máximo 1200px en el lado más largo)
-                    max_size = (1200, 1200)
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    
-                    # Guardar como WebP
-                    webp_filename = f"{unique_id}_{name_without_ext}.webp"
-                    webp_path = os.path.join(webp_folder, webp_filename)
-                    
-                    # Guardar con calidad optimizada
-                    img.save(webp_path, 'WEBP', quality=80, optimize=True)
-                    
-                    # Retornar ruta relativa del WebP para guardar en BD
-                    relative_path = f"/utils/pictures/canchas/{cancha_id}/webp/{webp_filename}"
-                    print(f"🖼️ Imagen convertida a WebP: {original_filename} -> {webp_filename}")
-                    
-                    return relative_path
-                    
-            finally:
-                # Eliminar archivo temporal
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            
+            return ImagenService.guardar_original(imagen_file, f"canchas/{cancha_id}")
         except Exception as e:
-            print(f"❌ Error al procesar imagen: {str(e)}")
+            print(f"❌ Error al guardar imagen: {str(e)}")
             return None
 
+    @staticmethod
+    def _encolar_imagen(imagen_id, pendiente):
+        """Generar el WebP en el pool y actualizar el estado de la Imagen al terminar"""
+        def _al_terminar(resultado):
+            if resultado is None:
+                cambios = {Imagen.estado: ESTADO_ERROR}
+            else:
+                cambios = {
+                    Imagen.estado: ESTADO_LISTO,
+                    Imagen.ancho: resultado['ancho'],
+                    Imagen.alto: resultado['alto'],
+                    Imagen.placeholder: resultado['placeholder']
+                }
+            Imagen.query.filter_by(id=imagen_id).update(cambios, synchronize_session=False)
+            db.session.commit()
+
+        ImagenService.encolar_conversion(pendiente, _al_terminar)
+
     @staticmethod
     def _procesar_horarios(horarios, cancha_id):
         """Procesar horarios de la cancha"""
@@ -157,83 +142,206 @@ class CanchaService:
             a = AmenidadCancha(cancha_id=cancha_id, amenidad=amenidad['amenidad'])
             db.session.add(a)
 
+    # Colecciones del listado -> clave en la respuesta
+    RELACIONES_LISTADO = {
+        'imagenes': 'imagenes_webp',
+        'horarios': 'horarios',
+        'reglas': 'reglas',
+        'amenidades': 'amenidades'
+    }
+    MAX_POR_PAGINA_CANCHAS = 100
+
     @staticmethod
-    def obtener_todas_las_canchas():
+    def _cancha_a_dict_listado(cancha, incluir) -> dict:
+        """Cancha del listado con solo las colecciones pedidas (ya cargadas con selectinload)"""
+        cancha_data = {
+            'id': cancha.id,
+            'nombre': cancha.nombre,
+            'tipo': cancha.tipo,
+            'subtipo': cancha.subtipo,
+            'direccion': cancha.direccion,
+            'latitud': cancha.latitud,
+            'longitud': cancha.longitud,
+            'direccion_completa': cancha.direccion_completa,
+            'superficie': cancha.superficie,
+            'capacidad': cancha.capacidad,
+            'precio_hora': float(cancha.precio_hora) if cancha.precio_hora else None,
+            'descripcion': cancha.descripcion,
+            'estado': cancha.estado
+        }
+        # Solo las colecciones pedidas: imagenes_webp, horarios, reglas, amenidades
+        for relacion, clave in CanchaService.RELACIONES_LISTADO.items():
+            if relacion in incluir:
+                cancha_data[clave] = []
+        
+        # Procesar imágenes como URLs WebP
+        for img in (cancha.imagenes if 'imagenes' in incluir else []):
+            if img.url_imagen.startswith('/utils/pictures/'):
+                # Es una imagen local WebP
+                cancha_data['imagenes_webp'].append({
+                    'id': img.id,
+                    'orden': img.orden,
+                    'url_webp': CanchaService._construir_url_accesible(img.url_imagen, cancha.id),
+                    'nombre': os.path.basename(img.url_imagen),
+                    'formato': 'webp',
+                    'estado': img.estado or ESTADO_LISTO,
+                    'urls': ImagenService.urls_por_tamano(
+                        CanchaService._construir_url_accesible(img.url_imagen, cancha.id)
+                    )
+                })
+            else:
+                # Es una URL externa
+                cancha_data['imagenes_webp'].append({
+                    'id': img.id,
+                    'orden': img.orden,
+                    'url': img.url_imagen,
+                    'formato': 'externo'
+                })
+        
+        # ✅ Procesar horarios
+        for horario in (cancha.horarios if 'horarios' in incluir else []):
+            cancha_data['horarios'].append({
+                'id': horario.id,
+                'dia_semana': horario.dia_semana,
+                'hora_inicio': horario.hora_inicio.strftime('%H:%M') if horario.hora_inicio else None,
+                'hora_fin': horario.hora_fin.strftime('%H:%M') if horario.hora_fin else None,
+                'intervalo_minutos': horario.intervalo_minutos,
+                'disponible': horario.disponible
+            })
+        
+        # ✅ Procesar reglas
+        for regla in (cancha.reglas if 'reglas' in incluir else []):
+            cancha_data['reglas'].append({
+                'id': regla.id,
+                'regla': regla.regla
+            })
+        
+        # ✅ Procesar amenidades
+        for amenidad in (cancha.amenidades if 'amenidades' in incluir else []):
+            cancha_data['amenidades'].append({
+                'id': amenidad.id,
+                'amenidad': amenidad.amenidad
+            })
+
+        return cancha_data
+
+    @staticmethod
+    def _query_listado(incluir):
+        """Canchas activas con las colecciones pedidas cargadas en lote: 1 consulta + 1 por colección"""
+        opciones = [selectinload(getattr(Cancha, relacion)) for relacion in CanchaService.RELACIONES_LISTADO if relacion in incluir]
+        return Cancha.query.options(*opciones).filter_by(estado='activa')
+
+    @staticmethod
+    def _normalizar_incluir(incluir) -> set:
+        if incluir is None:
+            return set(CanchaService.RELACIONES_LISTADO)
+        desconocidas = set(incluir) - set(CanchaService.RELACIONES_LISTADO)
+        if desconocidas:
+            raise ValueError(f"Colecciones desconocidas: {', '.join(sorted(desconocidas))}")
+        return set(incluir)
+
+    @staticmethod
+    def obtener_todas_las_canchas(incluir=None):
         """Obtener todas las canchas con URLs de imágenes WebP y horarios"""
         print("🔍 Obteniendo todas las canchas activas")
-        canchas = Cancha.query.filter_by(estado='activa').all()
+        incluir = CanchaService._normalizar_incluir(incluir)
+        canchas = CanchaService._query_listado(incluir).all()
         print(f"✅ Encontradas {len(canchas)} canchas activas")
         
-        canchas_dict = []
-        for cancha in canchas:
-            cancha_data = {
-                'id': cancha.id,
-                'nombre': cancha.nombre,
-                'tipo': cancha.tipo,
-                'subtipo': cancha.subtipo,
-                'direccion': cancha.direccion,
-                'latitud': cancha.latitud,
-                'longitud': cancha.longitud,
-                'direccion_completa': cancha.direccion_completa,
-                'superficie': cancha.superficie,
-                'capacidad': cancha.capacidad,
-                'precio_hora': float(cancha.precio_hora) if cancha.precio_hora else None,
-                'descripcion': cancha.descripcion,
-                'estado': cancha.estado,
-                'imagenes_webp': [],  # ✅ URLs de archivos WebP
-                'horarios': [],       # ✅ Horarios de la cancha
-                'reglas': [],         # ✅ Reglas de la cancha
-                'amenidades': []      # ✅ Amenidades de la cancha
+        return [CanchaService._cancha_a_dict_listado(cancha, incluir) for cancha in canchas]
+
+    @staticmethod
+    def obtener_canchas_cursor(cursor: str = None, por_pagina: int = 20, incluir=None) -> dict:
+        """
+        Página del listado de canchas activas por cursor sobre id.
+        Coste constante en consultas: 1 de canchas + 1 por colección incluida.
+        """
+        incluir = CanchaService._normalizar_incluir(incluir)
+        por_pagina = max(1, min(por_pagina, CanchaService.MAX_POR_PAGINA_CANCHAS))
+
+        query = CanchaService._query_listado(incluir)
+        if cursor:
+            _, id_cursor = decodificar_cursor(cursor)
+            query = query.filter(Cancha.id > id_cursor)
+
+        canchas = query.order_by(Cancha.id.asc()).limit(por_pagina + 1).all()
+        hay_mas = len(canchas) > por_pagina
+        canchas = canchas[:por_pagina]
+        print(f"✅ Página de {len(canchas)} canchas (hay más: {hay_mas})")
+
+        return {
+            'data': [CanchaService._cancha_a_dict_listado(cancha, incluir) for cancha in canchas],
+            'next_cursor': codificar_cursor(None, canchas[-1].id) if hay_mas else None
+        }
+
+    # Precisión inicial del geohash (~5 km por celda); se agranda hasta cubrir el radio pedido
+    PRECISION_GEOHASH_INICIAL = 5
+
+    @staticmethod
+    def buscar_canchas_cercanas(latitud: float, longitud: float, limite: int = 20, radio_km: float = None,
+                                tipo: str = None, subtipo: str = None) -> list:
+        """
+        Las `limite` canchas activas más cercanas a (latitud, longitud), con su distancia en km.
+        Busca por prefijos de geohash (índice B-tree) en la celda del punto y sus 8 vecinas,
+        agrandando las celdas hasta tener `limite` resultados dentro del radio que cubren.
+        """
+        if not (-90 <= latitud <= 90 and -180 <= longitud <= 180):
+            raise ValueError("Coordenadas fuera de rango")
+        limite = max(1, min(limite, settings.CANCHAS_CERCANAS_MAX))
+        radio_km = min(radio_km or settings.CANCHAS_CERCANAS_RADIO_MAX_KM, settings.CANCHAS_CERCANAS_RADIO_MAX_KM)
+
+        base = db.session.query(
+            Cancha.id, Cancha.nombre, Cancha.tipo, Cancha.subtipo, Cancha.direccion,
+            Cancha.latitud, Cancha.longitud, Cancha.precio_hora
+        ).filter(Cancha.estado == 'activa')
+        if tipo:
+            base = base.filter(Cancha.tipo == tipo)
+        if subtipo:
+            base = base.filter(Cancha.subtipo == subtipo)
+
+        for precision in range(CanchaService.PRECISION_GEOHASH_INICIAL, 0, -1):
+            celdas, radio_cubierto = celdas_vecinas(latitud, longitud, precision)
+            filas = base.filter(db.or_(*[Cancha.geohash.like(f'{celda}%') for celda in celdas])).all()
+
+            alcance = min(radio_cubierto, radio_km)
+            candidatas = sorted(
+                (
+                    (distancia_km(latitud, longitud, fila.latitud, fila.longitud), fila)
+                    for fila in filas
+                ),
+                key=lambda par: par[0]
+            )
+            dentro = [par for par in candidatas if par[0] <= alcance]
+
+            # Todo lo que está a menos de radio_cubierto cae en las 9 celdas: el resultado es exacto
+            if len(dentro) >= limite or radio_cubierto >= radio_km:
+                break
+
+        print(f"📍 {len(dentro[:limite])} canchas cercanas a ({latitud}, {longitud}) con precisión {precision}")
+        return [
+            {
+                'id': fila.id,
+                'nombre': fila.nombre,
+                'tipo': fila.tipo,
+                'subtipo': fila.subtipo,
+                'direccion': fila.direccion,
+                'latitud': fila.latitud,
+                'longitud': fila.longitud,
+                'precio_hora': float(fila.precio_hora) if fila.precio_hora else None,
+                'distancia_km': round(distancia, 3)
             }
-            
-            # Procesar imágenes como URLs WebP
-            for img in cancha.imagenes:
-                if img.url_imagen.startswith('/utils/pictures/'):
-                    # Es una imagen local WebP
-                    cancha_data['imagenes_webp'].append({
-                        'id': img.id,
-                        'orden': img.orden,
-                        'url_webp': CanchaService._construir_url_accesible(img.url_imagen, cancha.id),
-                        'nombre': os.path.basename(img.url_imagen),
-                        'formato': 'webp'
-                    })
-                else:
-                    # Es una URL externa
-                    cancha_data['imagenes_webp'].append({
-                        'id': img.id,
-                        'orden': img.orden,
-                        'url': img.url_imagen,
-                        'formato': 'externo'
-                    })
-            
-            # ✅ Procesar horarios
-            for horario in cancha.horarios:
-                cancha_data['horarios'].append({
-                    'id': horario.id,
-                    'dia_semana': horario.dia_semana,
-                    'hora_inicio': horario.hora_inicio.strftime('%H:%M') if horario.hora_inicio else None,
-                    'hora_fin': horario.hora_fin.strftime('%H:%M') if horario.hora_fin else None,
-                    'intervalo_minutos': horario.intervalo_minutos,
-                    'disponible': horario.disponible
-                })
-            
-            # ✅ Procesar reglas
-            for regla in cancha.reglas:
-                cancha_data['reglas'].append({
-                    'id': regla.id,
-                    'regla': regla.regla
-                })
-            
-            # ✅ Procesar amenidades
-            for amenidad in cancha.amenidades:
-                cancha_data['amenidades'].append({
-                    'id': amenidad.id,
-                    'amenidad': amenidad.amenidad
-                })
-            
-            canchas_dict.append(cancha_data)
-        
-        return canchas_dict
+            for distancia, fila in dentro[:limite]
+        ]
+
+    @staticmethod
+    def rellenar_geohash() -> int:
+        """Calcular el geohash de las canchas creadas antes de existir la columna"""
+        canchas = Cancha.query.filter(Cancha.geohash.is_(None)).all()
+        for cancha in canchas:
+            cancha.geohash = codificar_geohash(cancha.latitud, cancha.longitud)
+        db.session.commit()
+        print(f"✅ Geohash calculado para {len(canchas)} canchas")
+        return len(canchas)
 
     @staticmethod
     def _construir_url_accesible(ruta_imagen, cancha_id):
@@ -282,7 +390,15 @@ class CanchaService:
                     'orden': img.orden,
                     'url_webp': CanchaService._construir_url_accesible(img.url_imagen, cancha.id),
                     'nombre': os.path.basename(img.url_imagen),
-                    'formato': 'webp'
+                    'formato': 'webp',
+                    'estado': img.estado or ESTADO_LISTO,
+                    'urls': ImagenService.urls_por_tamano(
+                        CanchaService._construir_url_accesible(img.url_imagen, cancha.id)
+                    ),
+                    # Referencia ligera: dimensiones + vista previa inline (nunca los bytes completos)
+                    'ancho': img.ancho,
+                    'alto': img.alto,
+                    'placeholder': img.placeholder
                 })
             else:
                 cancha_data['imagenes_webp'].append({
@@ -327,51 +443,8 @@ class CanchaService:
         
         fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
 
-        # Verificar si es festivo
-        festivo = DiaFestivo.query.filter_by(fecha=fecha).first()
-        if festivo:
-            tipo_dia = 'domingo'  # O el tipo que uses para festivos
-            print(f"🎉 Fecha {fecha_str} es festivo, se usa tipo: {tipo_dia}")
-        else:
-            dias_map = {
-                'monday': 'lunes',
-                'tuesday': 'martes',
-                'wednesday': 'miercoles',
-                'thursday': 'jueves',
-                'friday': 'viernes',
-                'saturday': 'sabado',
-                'sunday': 'domingo'
-            }  
-            dia_semana = calendar.day_name[fecha.weekday()].lower()
-            tipo_dia = dias_map.get(dia_semana)
-            print(f"📅 Fecha {fecha_str} es {tipo_dia}")
-
-        # Obtener horarios de ese día para la cancha (NUEVO: rangos)
-        horarios_rango = HorarioCancha.query.filter_by(
-            cancha_id=cancha_id, 
-            dia_semana=tipo_dia,
-            disponible=True
-        ).all()
-
-        # Generar todos los horarios disponibles desde los rangos
-        todos_horarios_disponibles = set()
-        for horario_rango in horarios_rango:
-            horarios_generados = CanchaService._generar_horarios_desde_rango(
-                horario_rango.hora_inicio, 
-                horario_rango.hora_fin, 
-                horario_rango.intervalo_minutos
-            )
-            todos_horarios_disponibles.update(horarios_generados)
-        
-        print(f"🕒 Horarios configurados: {sorted(todos_horarios_disponibles)}")
-
-        # Obtener reservas ya hechas para esa cancha en esa fecha
-        reservas = Reserva.query.filter_by(cancha_id=cancha_id, fecha=fecha).all()
-        horas_reservadas = {r.hora.strftime('%H:%M') for r in reservas}
-        print(f"🔒 Horarios reservados: {sorted(horas_reservadas)}")
-
-        # Calcular horarios disponibles
-        disponibles = sorted(todos_horarios_disponibles - horas_reservadas)
+        # Motor de disponibilidad compartido con ReservaService (festivos no laborables usan horario de domingo)
+        disponibles = [slot['hora'] for slot in DisponibilidadService.horarios_libres(cancha_id, fecha)]
         print(f"✅ Horarios disponibles: {disponibles}")
 
         return disponibles
@@ -394,39 +467,9 @@ class CanchaService:
     @staticmethod
     def verificar_disponibilidad_horario(cancha_id: int, dia_semana: str, hora_solicitada: str):
         """
-        Verificar si un horario específico está disponible según los rangos configurados
+        Verificar si un horario específico está disponible según el horario compilado de la cancha
         """
         hora_time = datetime.strptime(hora_solicitada, '%H:%M').time()
-        
-        horarios_disponibles = HorarioCancha.query.filter_by(
-            cancha_id=cancha_id,
-            dia_semana=dia_semana,
-            disponible=True
-        ).all()
-
-        for horario in horarios_disponibles:
-            if CanchaService._hora_en_rango(hora_time, horario.hora_inicio, horario.hora_fin, horario.intervalo_minutos):
-                return True
-        
-        return False
-
-    @staticmethod
-    def _hora_en_rango(hora_solicitada: time, hora_inicio: time, hora_fin: time, intervalo_minutos: int):
-        """
-        Verificar si una hora específica está dentro de un rango considerando el intervalo
-        """
-        hora_solicitada_dt = datetime.combine(datetime.today(), hora_solicitada)
-        inicio_dt = datetime.combine(datetime.today(), hora_inicio)
-        fin_dt = datetime.combine(datetime.today(), hora_fin)
-
-        # Verificar que esté dentro del rango general
-        if not (inicio_dt <= hora_solicitada_dt < fin_dt):
-            return False
-
-        # Verificar que coincida con el intervalo
-        tiempo_desde_inicio = hora_solicitada_dt - inicio_dt
-        minutos_desde_inicio = tiempo_desde_inicio.total_seconds() / 60
-        
-        return minutos_desde_inicio % intervalo_minutos == 0
+        return HorarioCompiladoService.obtener(cancha_id).admite(dia_semana, a_minutos(hora_time))
     
     
\ No newline at end of file
@@ -0,0 +1,43 @@
+# app/services/email/email_service.py
+import secrets
+import smtplib
+from email.message import EmailMessage
+from app.core.config import settings
+
+class EmailService:
+    """
+    Envío de correos por SMTP con la configuración de settings (SMTP_HOST, SMTP_PORT, ...).
+    No se llama desde las peticiones: lo usa el emisor del outbox (OutboxService.procesar_lote).
+    """
+
+    @staticmethod
+    def generate_verification_code() -> str:
+        """Código numérico de 6 dígitos"""
+        return f"{secrets.randbelow(10 ** 6):06d}"
+
+    @staticmethod
+    def enviar(destinatario: str, asunto: str, texto: str) -> bool:
+        """True si el servidor aceptó el mensaje; los errores de conexión o SMTP se propagan"""
+        mensaje = EmailMessage()
+        mensaje['From'] = settings.SMTP_REMITENTE
+        mensaje['To'] = destinatario
+        mensaje['Subject'] = asunto
+        mensaje.set_content(texto)
+
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT) as smtp:
+            if settings.SMTP_TLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            rechazados = smtp.send_message(mensaje)
+        return not rechazados
+
+    @staticmethod
+    def send_verification_email(user_email: str, user_name: str, verification_code: str) -> bool:
+        minutos = settings.VERIFICACION_TTL // 60
+        texto = (
+            f"Hola {user_name},\n\n"
+            f"Tu código de verificación de Sporthub es: {verification_code}\n\n"
+            f"Caduca en {minutos} minutos. Si no has creado una cuenta, ignora este correo.\n"
+        )
+        return EmailService.enviar(user_email, 'Código de verificación de Sporthub', texto)
@@ -0,0 +1,189 @@
+# app/services/email/outbox_service.py
+import time
+import threading
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.models.email.correo_saliente_model import CorreoSaliente
+from app.services.email.email_service import EmailService
+from app.utils.database import db
+
+TIPO_VERIFICACION = 'verificacion'
+
+ESTADO_PENDIENTE = 'pendiente'
+ESTADO_ENVIADO = 'enviado'
+ESTADO_FALLIDO = 'fallido'
+
+def _enviar_verificacion(datos: dict) -> bool:
+    return EmailService.send_verification_email(**datos)
+
+# tipo -> función que hace el envío real (True si el servidor SMTP lo aceptó)
+ENVIADORES = {
+    TIPO_VERIFICACION: _enviar_verificacion,
+}
+
+class OutboxService:
+    """
+    Cola persistente de correos (tabla correos_salientes).
+    encolar() solo inserta la fila; procesar_lote() la envía desde un worker en segundo plano,
+    con reintentos y backoff exponencial hasta OUTBOX_MAX_INTENTOS.
+    Al llegar a un estado final se borran los datos del envío (contienen el código en claro)
+    y purgar_terminados() elimina las filas pasados OUTBOX_RETENCION_DIAS.
+    """
+
+    _hilo = None
+    _hilo_lock = threading.Lock()
+
+    @staticmethod
+    def encolar(tipo: str, destinatario: str, datos: dict, reemplazar: bool = False) -> CorreoSaliente:
+        """reemplazar=True descarta en la misma transacción los pendientes del mismo tipo y destinatario"""
+        if tipo not in ENVIADORES:
+            raise ValueError(f"Tipo de correo desconocido: {tipo}")
+        try:
+            if reemplazar:
+                descartados = CorreoSaliente.query.filter_by(
+                    tipo=tipo, destinatario=destinatario, estado=ESTADO_PENDIENTE
+                ).delete(synchronize_session=False)
+                if descartados:
+                    print(f"🗑️ {descartados} correo(s) '{tipo}' pendientes para {destinatario} reemplazados")
+            correo = CorreoSaliente(tipo=tipo, destinatario=destinatario, datos=datos, estado=ESTADO_PENDIENTE)
+            db.session.add(correo)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        print(f"📮 Correo '{tipo}' para {destinatario} encolado (ID {correo.id})")
+        return correo
+
+    @staticmethod
+    def encolar_verificacion(user_email: str, user_name: str, verification_code: str) -> CorreoSaliente:
+        # Un código nuevo invalida el anterior: no tiene sentido enviar ambos
+        return OutboxService.encolar(TIPO_VERIFICACION, user_email, {
+            'user_email': user_email,
+            'user_name': user_name,
+            'verification_code': verification_code
+        }, reemplazar=True)
+
+    @staticmethod
+    def _backoff(intentos: int) -> timedelta:
+        segundos = min(settings.OUTBOX_BACKOFF_BASE * (2 ** (intentos - 1)), settings.OUTBOX_BACKOFF_MAX)
+        return timedelta(seconds=segundos)
+
+    @staticmethod
+    def _siguiente(ahora: datetime):
+        """Siguiente correo vencido, bloqueado con SKIP LOCKED para que varios emisores no envíen el mismo"""
+        return CorreoSaliente.query.filter(
+            CorreoSaliente.estado == ESTADO_PENDIENTE,
+            CorreoSaliente.proximo_intento <= ahora
+        ).order_by(CorreoSaliente.id).limit(1).with_for_update(skip_locked=True).first()
+
+    @staticmethod
+    def procesar_lote(tamano_lote: int = None) -> dict:
+        """
+        Enviar hasta tamano_lote correos pendientes vencidos, de uno en uno.
+        Cada correo se confirma tras su envío: un fallo posterior no lo reenvía
+        y el bloqueo de la fila solo dura lo que tarda su SMTP.
+        """
+        tamano_lote = tamano_lote or settings.OUTBOX_LOTE
+        ahora = datetime.now()
+        enviados, reintentos, fallidos = 0, 0, 0
+
+        try:
+            for _ in range(tamano_lote):
+                correo = OutboxService._siguiente(ahora)
+                if correo is None:
+                    break
+
+                try:
+                    exito = ENVIADORES[correo.tipo](correo.datos)
+                    error = None if exito else 'El servidor de correo rechazó el envío'
+                except Exception as e:
+                    exito, error = False, str(e)
+
+                correo.intentos += 1
+                if exito:
+                    correo.estado = ESTADO_ENVIADO
+                    correo.enviado_at = datetime.now()
+                    correo.ultimo_error = None
+                    correo.datos = {}
+                    enviados += 1
+                elif correo.intentos >= settings.OUTBOX_MAX_INTENTOS:
+                    correo.estado = ESTADO_FALLIDO
+                    correo.ultimo_error = error[:500]
+                    correo.datos = {}
+                    fallidos += 1
+                    print(f"❌ Correo {correo.id} a {correo.destinatario} descartado tras {correo.intentos} intentos: {error}")
+                else:
+                    correo.proximo_intento = datetime.now() + OutboxService._backoff(correo.intentos)
+                    correo.ultimo_error = error[:500]
+                    reintentos += 1
+
+                db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al procesar la cola de correos: {str(e)}")
+            raise e
+
+        procesados = enviados + reintentos + fallidos
+        if procesados:
+            print(f"📤 Outbox: {enviados} enviados, {reintentos} reintentos, {fallidos} fallidos")
+        return {'enviados': enviados, 'reintentos': reintentos, 'fallidos': fallidos, 'procesados': procesados}
+
+    @staticmethod
+    def purgar_terminados(retencion_dias: int = None) -> int:
+        """Borrar los correos enviados o fallidos creados hace más de retencion_dias"""
+        retencion_dias = settings.OUTBOX_RETENCION_DIAS if retencion_dias is None else retencion_dias
+        limite = datetime.now() - timedelta(days=retencion_dias)
+        try:
+            borrados = CorreoSaliente.query.filter(
+                CorreoSaliente.estado.in_([ESTADO_ENVIADO, ESTADO_FALLIDO]),
+                CorreoSaliente.created_at < limite
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al purgar la cola de correos: {str(e)}")
+            raise e
+        if borrados:
+            print(f"🧹 Outbox: {borrados} correos antiguos purgados")
+        return borrados
+
+    @staticmethod
+    def iniciar_en_segundo_plano(app, intervalo_segundos: float = None) -> threading.Thread:
+        """
+        Emisor en un hilo daemon (uno por proceso): vacía la cola por lotes, duerme cuando
+        no hay trabajo y purga los correos terminados cada OUTBOX_PURGA_INTERVALO.
+        """
+        intervalo_segundos = intervalo_segundos or settings.OUTBOX_INTERVALO
+
+        def _bucle():
+            ultima_purga = 0.0
+            while True:
+                procesados = 0
+                with app.app_context():
+                    try:
+                        procesados = OutboxService.procesar_lote()['procesados']
+                        if time.monotonic() - ultima_purga >= settings.OUTBOX_PURGA_INTERVALO:
+                            OutboxService.purgar_terminados()
+                            ultima_purga = time.monotonic()
+                    except Exception:
+                        pass  # Ya se registró; se reintenta en el siguiente ciclo
+                    finally:
+                        db.session.remove()
+                # Lote lleno: probablemente queda más trabajo, seguir sin dormir
+                if procesados < settings.OUTBOX_LOTE:
+                    time.sleep(intervalo_segundos)
+
+        with OutboxService._hilo_lock:
+            if OutboxService._hilo is None or not OutboxService._hilo.is_alive():
+                OutboxService._hilo = threading.Thread(target=_bucle, name='emisor-correos', daemon=True)
+                OutboxService._hilo.start()
+        return OutboxService._hilo
+
+
+if __name__ == '__main__':
+    # python -m app.services.email.outbox_service   -> emisor continuo
+    # (worker aparte: con TAREAS_EN_SEGUNDO_PLANO=false los procesos web no envían)
+    from app.utils import create_app
+
+    OutboxService.iniciar_en_segundo_plano(create_app()).join()
@@ -0,0 +1,84 @@
+"""
+Trabajo CPU de imágenes que se ejecuta en los procesos del pool.
+Solo depende de PIL para que los procesos hijos no importen Flask ni la BD.
+"""
+import os
+import io
+import base64
+from PIL import Image
+
+# Variantes generadas una sola vez al subir: nombre -> lado máximo en píxeles
+TAMANOS_IMAGEN = {
+    'mini': 64,
+    'pequena': 320,
+    'mediana': 800,
+    'completa': 1920
+}
+TAMANO_COMPLETO = 'completa'
+
+# Vista previa inline: miniatura diminuta embebida como data URI (máximo 1KB)
+LADO_PLACEHOLDER = 16
+MAX_BYTES_PLACEHOLDER = 1024
+
+def nombre_variante(filename: str, tamano: str) -> str:
+    """'abc_foto.webp' + 'mini' -> 'abc_foto__mini.webp' (la completa conserva el nombre original)"""
+    if tamano == TAMANO_COMPLETO:
+        return filename
+    base, extension = os.path.splitext(filename)
+    return f"{base}__{tamano}{extension}"
+
+def _guardar_webp(img, ruta_webp: str):
+    # Escribir a un temporal y renombrar: el servidor nunca ve un WebP a medias
+    ruta_temporal = f"{ruta_webp}.part"
+    img.save(ruta_temporal, 'WEBP', quality=80, optimize=True)
+    os.replace(ruta_temporal, ruta_webp)
+
+def _generar_placeholder(img) -> str:
+    """Data URI WebP de ~16px para pintar mientras carga la imagen real (None si supera 1KB)"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'WEBP', quality=30)
+    datos = base64.b64encode(buffer.getvalue()).decode('ascii')
+    placeholder = f"data:image/webp;base64,{datos}"
+    return placeholder if len(placeholder) <= MAX_BYTES_PLACEHOLDER else None
+
+def convertir_a_webp(ruta_original: str, ruta_webp: str) -> dict:
+    """
+    Decodificar una vez y generar todas las variantes WebP (LANCZOS).
+    Cada variante se reduce desde la anterior, más grande; la completa se escribe
+    la última para que su presencia implique que las demás ya existen.
+    Devuelve dimensiones de la completa y un placeholder inline.
+    Elimina el original al terminar.
+    """
+    try:
+        carpeta, filename = os.path.split(ruta_webp)
+
+        with Image.open(ruta_original) as img:
+            # Convertir a RGB si es necesario
+            if img.mode in ('RGBA', 'P'):
+                img = img.convert('RGB')
+
+            completa = None
+            actual = img
+            for tamano, lado in sorted(TAMANOS_IMAGEN.items(), key=lambda item: -item[1]):
+                actual = actual.copy()
+                actual.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+                if tamano == TAMANO_COMPLETO:
+                    completa = actual
+                else:
+                    _guardar_webp(actual, os.path.join(carpeta, nombre_variante(filename, tamano)))
+
+            placeholder = actual.copy()
+            placeholder.thumbnail((LADO_PLACEHOLDER, LADO_PLACEHOLDER), Image.Resampling.LANCZOS)
+
+            _guardar_webp(completa, ruta_webp)
+
+        return {
+            'ruta_webp': ruta_webp,
+            'ancho': completa.width,
+            'alto': completa.height,
+            'placeholder': _generar_placeholder(placeholder)
+        }
+
+    finally:
+        if os.path.exists(ruta_original):
+            os.remove(ruta_original)
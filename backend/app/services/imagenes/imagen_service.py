@@ -0,0 +1,257 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.utils import secure_filename
+from app.core.config import settings
+from app.models.posts.post_model import Post
+from app.models.canchas.imagen import Imagen
+from app.utils.database import db
+from app.services.imagenes.conversion_webp import convertir_a_webp, nombre_variante, TAMANOS_IMAGEN, TAMANO_COMPLETO
+
+# Estados de procesamiento guardados en los registros de imagen
+ESTADO_PROCESANDO = 'procesando'
+ESTADO_LISTO = 'listo'
+ESTADO_ERROR = 'error'
+
+class ImagenService:
+    """
+    Pipeline asíncrono de imágenes: la petición solo guarda el archivo original
+    y responde; un pool de procesos genera el WebP y avisa al registro al terminar.
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+    _barrido = None
+
+    @staticmethod
+    def _obtener_pool() -> ProcessPoolExecutor:
+        """Pool de procesos perezoso (spawn: seguro aunque el servidor use hilos)"""
+        if ImagenService._pool is None:
+            with ImagenService._pool_lock:
+                if ImagenService._pool is None:
+                    ImagenService._pool = ProcessPoolExecutor(
+                        max_workers=settings.IMAGENES_WORKERS,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return ImagenService._pool
+
+    @staticmethod
+    def _descartar_pool(pool: ProcessPoolExecutor):
+        """Quitar un pool roto (p.ej. un worker murió por OOM con una imagen enorme) para que el siguiente envío cree otro"""
+        with ImagenService._pool_lock:
+            if ImagenService._pool is not pool:
+                return  # otro hilo ya lo descartó
+            ImagenService._pool = None
+        print("⚠️ Pool de imágenes roto: se recrea")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _enviar(*args):
+        """(pool, futuro); si el pool está roto se recrea una vez"""
+        pool = ImagenService._obtener_pool()
+        try:
+            return pool, pool.submit(convertir_a_webp, *args)
+        except BrokenProcessPool:
+            ImagenService._descartar_pool(pool)
+            pool = ImagenService._obtener_pool()
+            return pool, pool.submit(convertir_a_webp, *args)
+
+    @staticmethod
+    def guardar_original(imagen_file, carpeta_relativa: str) -> dict:
+        """
+        Guardar el upload tal cual llega y reservar la ruta del WebP final.
+        carpeta_relativa: p.ej. 'posts/25' o 'canchas/17' (bajo utils/pictures).
+        """
+        upload_folder = os.path.join(current_app.root_path, 'utils', 'pictures', *carpeta_relativa.split('/'))
+        webp_folder = os.path.join(upload_folder, 'webp')
+        os.makedirs(webp_folder, exist_ok=True)
+
+        # Generar nombres únicos
+        original_filename = secure_filename(imagen_file.filename)
+        name_without_ext = os.path.splitext(original_filename)[0]
+        unique_id = uuid.uuid4().hex
+
+        ruta_original = os.path.join(upload_folder, f"temp_{unique_id}_{original_filename}")
+        imagen_file.save(ruta_original)
+
+        webp_filename = f"{unique_id}_{name_without_ext}.webp"
+        return {
+            'ruta_original': ruta_original,
+            'ruta_webp': os.path.join(webp_folder, webp_filename),
+            'url_relativa': f"/utils/pictures/{carpeta_relativa}/webp/{webp_filename}"
+        }
+
+    @staticmethod
+    def encolar_conversion(pendiente: dict, al_terminar) -> None:
+        """
+        Enviar la conversión al pool. al_terminar(resultado) se ejecuta con
+        contexto de aplicación para poder actualizar el registro en BD;
+        resultado es None si falló o un dict con ancho, alto y placeholder.
+        El registro ya está guardado: si el pool no admite el trabajo se marca
+        como error (al_terminar(None)) en lugar de propagar la excepción.
+        """
+        app = current_app._get_current_object()
+        try:
+            pool, futuro = ImagenService._enviar(pendiente['ruta_original'], pendiente['ruta_webp'])
+        except Exception as e:
+            print(f"❌ No se pudo encolar la imagen {pendiente['ruta_original']}: {str(e)}")
+            try:
+                al_terminar(None)
+            except Exception as e:
+                print(f"❌ Error al actualizar estado de imagen: {str(e)}")
+            return
+
+        def _callback(f):
+            resultado = None
+            if f.exception() is None:
+                resultado = f.result()
+                print(f"🖼️ WebP generado: {os.path.basename(pendiente['ruta_webp'])}")
+            else:
+                print(f"❌ Error al procesar imagen {pendiente['ruta_original']}: {str(f.exception())}")
+                if isinstance(f.exception(), BrokenProcessPool):
+                    # El worker murió con esta imagen: no se reintenta, pero las siguientes usan un pool nuevo
+                    ImagenService._descartar_pool(pool)
+            with app.app_context():
+                try:
+                    al_terminar(resultado)
+                except Exception as e:
+                    print(f"❌ Error al actualizar estado de imagen: {str(e)}")
+
+        futuro.add_done_callback(_callback)
+
+    @staticmethod
+    def urls_por_tamano(url_webp: str) -> dict:
+        """URLs de cada variante a partir de la URL de servicio de la imagen completa"""
+        return {
+            tamano: url_webp if tamano == TAMANO_COMPLETO else f"{url_webp}?tamano={tamano}"
+            for tamano in TAMANOS_IMAGEN
+        }
+
+    @staticmethod
+    def resolver_variante(carpeta: str, filename: str, tamano: str = None) -> str:
+        """
+        Nombre de archivo a servir para un tamaño pedido.
+        Lanza ValueError si el tamaño no existe; si la variante no está en disco
+        (imágenes anteriores al pipeline) se sirve la completa.
+        """
+        if not tamano or tamano == TAMANO_COMPLETO:
+            return filename
+        if tamano not in TAMANOS_IMAGEN:
+            raise ValueError(f"Tamaño inválido. Use uno de: {', '.join(TAMANOS_IMAGEN)}")
+
+        variante = nombre_variante(filename, tamano)
+        if os.path.exists(os.path.join(carpeta, variante)):
+            return variante
+        return filename
+
+    @staticmethod
+    def eliminar_variantes(ruta_webp: str):
+        """Eliminar del disco las variantes de una imagen (no la completa)"""
+        carpeta, filename = os.path.split(ruta_webp)
+        for tamano in TAMANOS_IMAGEN:
+            if tamano == TAMANO_COMPLETO:
+                continue
+            ruta_variante = os.path.join(carpeta, nombre_variante(filename, tamano))
+            if os.path.exists(ruta_variante):
+                os.remove(ruta_variante)
+
+    # --- Recuperación de conversiones interrumpidas ---
+
+    @staticmethod
+    def _ruta_en_disco(url_relativa: str) -> str:
+        """'/utils/pictures/posts/25/webp/x.webp' -> ruta absoluta (misma raíz que guardar_original)"""
+        return os.path.join(current_app.root_path, *url_relativa.strip('/').split('/'))
+
+    @staticmethod
+    def _estado_recuperado(url_relativa: str) -> str:
+        """La completa se escribe la última: si existe, la conversión terminó aunque no se avisara al registro"""
+        return ESTADO_LISTO if url_relativa and os.path.exists(ImagenService._ruta_en_disco(url_relativa)) else ESTADO_ERROR
+
+    @staticmethod
+    def _eliminar_originales_temporales(antiguedad_segundos: float) -> int:
+        """Borrar los uploads 'temp_*' más antiguos que antiguedad_segundos que ningún proceso llegó a convertir"""
+        limite = time.time() - antiguedad_segundos
+        eliminados = 0
+        for raiz, _, archivos in os.walk(os.path.join(current_app.root_path, 'utils', 'pictures')):
+            for nombre in archivos:
+                if not nombre.startswith('temp_'):
+                    continue
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    if os.path.getmtime(ruta) < limite:
+                        os.remove(ruta)
+                        eliminados += 1
+                except OSError:
+                    pass  # Lo borró la conversión entre tanto
+        return eliminados
+
+    @staticmethod
+    def recuperar_colgadas(timeout_minutos: int = None) -> dict:
+        """
+        Cerrar las imágenes que llevan en 'procesando' más de IMAGENES_TIMEOUT_MINUTOS
+        (murió un proceso del pool o el servidor a mitad de conversión):
+        pasan a 'listo' si el WebP completo llegó a escribirse y a 'error' si no.
+        Después borra los originales temporales huérfanos.
+        """
+        timeout = timedelta(minutes=timeout_minutos or settings.IMAGENES_TIMEOUT_MINUTOS)
+        recuperadas = {ESTADO_LISTO: 0, ESTADO_ERROR: 0}
+
+        try:
+            posts = Post.query.filter(
+                Post.imagen_estado == ESTADO_PROCESANDO,
+                Post.updated_at < datetime.now() - timeout
+            ).all()
+            for post in posts:
+                post.imagen_estado = ImagenService._estado_recuperado(post.imagen_url)
+                recuperadas[post.imagen_estado] += 1
+
+            # fecha_creacion de las imágenes se guarda en UTC
+            imagenes = Imagen.query.filter(
+                Imagen.estado == ESTADO_PROCESANDO,
+                Imagen.fecha_creacion < datetime.utcnow() - timeout
+            ).all()
+            for imagen in imagenes:
+                imagen.estado = ImagenService._estado_recuperado(imagen.url_imagen)
+                recuperadas[imagen.estado] += 1
+
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al recuperar imágenes colgadas: {str(e)}")
+            raise e
+
+        temporales = ImagenService._eliminar_originales_temporales(timeout.total_seconds())
+
+        if posts or imagenes or temporales:
+            print(f"🧹 Imágenes colgadas: {recuperadas[ESTADO_LISTO]} listas, "
+                  f"{recuperadas[ESTADO_ERROR]} con error, {temporales} temporales eliminados")
+        return {'listas': recuperadas[ESTADO_LISTO], 'errores': recuperadas[ESTADO_ERROR], 'temporales': temporales}
+
+    @staticmethod
+    def iniciar_barrido_en_segundo_plano(app, intervalo_segundos: int = None) -> threading.Thread:
+        """Barrido al arrancar y cada IMAGENES_BARRIDO_INTERVALO en un hilo daemon (uno por proceso)"""
+        intervalo_segundos = intervalo_segundos or settings.IMAGENES_BARRIDO_INTERVALO
+
+        def _bucle():
+            while True:
+                with app.app_context():
+                    try:
+                        ImagenService.recuperar_colgadas()
+                    except Exception:
+                        pass  # Ya se registró; se reintenta en el siguiente ciclo
+                    finally:
+                        db.session.remove()
+                time.sleep(intervalo_segundos)
+
+        with ImagenService._pool_lock:
+            if ImagenService._barrido is None or not ImagenService._barrido.is_alive():
+                ImagenService._barrido = threading.Thread(target=_bucle, name='barrido-imagenes', daemon=True)
+                ImagenService._barrido.start()
+        return ImagenService._barrido
@@ -0,0 +1,66 @@
+from app.models.posts.post_model import Post, PostComentario, PostLike, ComentarioLike
+from app.utils.database import db
+
+class ContadoresPostService:
+    """
+    Reconstruye los contadores desnormalizados (likes_count / comments_count)
+    a partir de las tablas de origen. Se usa tras la migración de las columnas
+    o si se sospecha de deriva en los contadores.
+    """
+
+    @staticmethod
+    def reconciliar_contadores() -> dict:
+        """Recalcular todos los contadores con UPDATEs basados en subconsultas"""
+        try:
+            print("🔄 Reconciliando contadores de posts y comentarios...")
+
+            total_likes_post = (
+                db.session.query(db.func.count(PostLike.id))
+                .filter(PostLike.post_id == Post.id)
+                .scalar_subquery()
+            )
+            total_comentarios_post = (
+                db.session.query(db.func.count(PostComentario.id))
+                .filter(PostComentario.post_id == Post.id, PostComentario.eliminado == False)
+                .scalar_subquery()
+            )
+            posts_actualizados = Post.query.update(
+                {
+                    Post.likes_count: total_likes_post,
+                    Post.comments_count: total_comentarios_post,
+                    Post.updated_at: Post.updated_at  # reconciliar no es editar: sin onupdate
+                },
+                synchronize_session=False
+            )
+
+            total_likes_comentario = (
+                db.session.query(db.func.count(ComentarioLike.id))
+                .filter(ComentarioLike.comentario_id == PostComentario.id)
+                .scalar_subquery()
+            )
+            comentarios_actualizados = PostComentario.query.update(
+                {PostComentario.likes_count: total_likes_comentario, PostComentario.updated_at: PostComentario.updated_at},
+                synchronize_session=False
+            )
+
+            db.session.commit()
+
+            print(f"✅ Contadores reconciliados: {posts_actualizados} posts, {comentarios_actualizados} comentarios")
+            return {
+                'posts_actualizados': posts_actualizados,
+                'comentarios_actualizados': comentarios_actualizados
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al reconciliar contadores: {str(e)}")
+            raise e
+
+
+if __name__ == '__main__':
+    # python -m app.services.posts.contadores_service
+    from app.utils import create_app
+
+    app = create_app()
+    with app.app_context():
+        ContadoresPostService.reconciliar_contadores()
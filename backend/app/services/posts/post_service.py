@@ -1,11 +1,13 @@
 import os
-import uuid
-from PIL import Image
 from flask import current_app
-from werkzeug.utils import secure_filename
-from app.models.post_model import Post, PostComentario, PostLike, ComentarioLike
-from app.models.user_model import User
+from sqlalchemy.orm import contains_eager, selectinload
+from app.models.posts.post_model import Post, PostComentario, PostLike, ComentarioLike
+from app.models.users.user_model import User
+from app.models.posts.timeline_model import TimelineEntrada
+from app.services.posts.timeline_service import TimelineService
+from app.services.imagenes.imagen_service import ImagenService, ESTADO_PROCESANDO, ESTADO_LISTO, ESTADO_ERROR
 from app.utils.database import db
+from app.utils.cursor_utils import codificar_cursor, decodificar_cursor
 from datetime import datetime
 
 class PostService:
@@ -26,15 +28,19 @@ class PostService:
             if data['tipo_post'] not in ['texto', 'foto']:
                 raise ValueError("Tipo de post inválido. Debe ser 'texto' o 'foto'")
             
-            # ✅ MANEJO DE IMÁGENES - EXACTAMENTE IGUAL QUE CANCHAS Y PROFILE
+            # ✅ MANEJO DE IMÁGENES - se guarda el original y el WebP se genera en segundo plano
             imagen_url = None
+            imagen_estado = ESTADO_LISTO
+            imagen_pendiente = None
             if data['tipo_post'] == 'foto':
                 if imagen_file and imagen_file.filename:
-                    print("🖼️ Procesando imagen del post...")
-                    imagen_url = PostService._guardar_y_convertir_a_webp(imagen_file, usuario_id, 'post')
-                    if not imagen_url:
+                    print("🖼️ Guardando imagen original del post...")
+                    imagen_pendiente = PostService._guardar_imagen_pendiente(imagen_file, usuario_id)
+                    if not imagen_pendiente:
                         raise ValueError("Error al procesar la imagen del post")
-                    print(f"📷 Imagen del post guardada: {imagen_url}")
+                    imagen_url = imagen_pendiente['url_relativa']
+                    imagen_estado = ESTADO_PROCESANDO
+                    print(f"📷 Imagen del post en cola: {imagen_url}")
                 elif data.get('imagen_url'):
                     # URL existente (compatibilidad)
                     imagen_url = data['imagen_url']
@@ -47,12 +53,20 @@ class PostService:
                 usuario_id=usuario_id,
                 tipo_post=data['tipo_post'],
                 contenido=data['contenido'],
-                imagen_url=imagen_url
+                imagen_url=imagen_url,
+                imagen_estado=imagen_estado
             )
             
             db.session.add(post)
+            db.session.flush()
+            
+            # Fan-out al home timeline del autor y sus amigos
+            TimelineService.publicar_post(post)
             db.session.commit()
             
+            if imagen_pendiente:
+                PostService._encolar_imagen(post.id, imagen_pendiente)
+            
             print("✅ Post creado exitosamente")
             return {
                 'message': 'Post creado exitosamente',
@@ -65,58 +79,34 @@ class PostService:
             raise e
 
     @staticmethod
-    def _guardar_y_convertir_a_webp(imagen_file, user_id, tipo='post'):
+    def _guardar_imagen_pendiente(imagen_file, user_id):
         """
-        Guardar imagen y convertir a WebP como archivo - EXACTAMENTE IGUAL QUE CANCHAS Y PROFILE
+        Guardar el original del post y reservar la ruta del WebP - misma estructura que canchas y profile
         """
         try:
-            # Crear directorios específicos para posts - Misma estructura que canchas y profile
-            upload_folder = os.path.join(current_app.root_path, 'utils', 'pictures', 'posts', str(user_id))
-            webp_folder = os.path.join(upload_folder, 'webp')
-            os.makedirs(webp_folder, exist_ok=True)
-            
-            # Generar nombres únicos - Mismo formato que canchas y profile
-            original_filename = secure_filename(imagen_file.filename)
-            name_without_ext = os.path.splitext(original_filename)[0]
-            unique_id = uuid.uuid4().hex
-            
-            # Guardar original temporalmente
-            temp_path = os.path.join(upload_folder, f"temp_{unique_id}_{original_filename}")
-            imagen_file.save(temp_path)
-            
-            try:
-                # Abrir y procesar imagen - Mismo procesamiento que canchas y profile
-                with Image.open(temp_path) as img:
-                    # Convertir a RGB si es necesario
-                    if img.mode in ('RGBA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Redimensionar (máximo 1200px como canchas)
-                    max_size = (1200, 1200)
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    
-                    # Guardar como WebP - Mismo formato que canchas y profile
-                    webp_filename = f"{unique_id}_{name_without_ext}.webp"
-                    webp_path = os.path.join(webp_folder, webp_filename)
-                    
-                    # Guardar con calidad optimizada
-                    img.save(webp_path, 'WEBP', quality=80, optimize=True)
-                    
-                    # Retornar ruta relativa del WebP para guardar en BD - Mismo formato
-                    relative_path = f"/utils/pictures/posts/{user_id}/webp/{webp_filename}"
-                    print(f"🖼️ Imagen de post convertida a WebP: {original_filename} -> {webp_filename}")
-                    
-                    return relative_path
-                    
-            finally:
-                # Eliminar archivo temporal - Misma limpieza que canchas y profile
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            
+            return ImagenService.guardar_original(imagen_file, f"posts/{user_id}")
         except Exception as e:
-            print(f"❌ Error al procesar imagen de post: {str(e)}")
+            print(f"❌ Error al guardar imagen de post: {str(e)}")
             return None
 
+    @staticmethod
+    def _encolar_imagen(post_id: int, imagen_pendiente: dict):
+        """Generar el WebP en el pool y marcar el post cuando termine"""
+        imagen_url = imagen_pendiente['url_relativa']
+        ImagenService.encolar_conversion(
+            imagen_pendiente,
+            lambda resultado: PostService._marcar_imagen_procesada(post_id, imagen_url, resultado is not None)
+        )
+
+    @staticmethod
+    def _marcar_imagen_procesada(post_id: int, imagen_url: str, exito: bool):
+        """Actualizar el estado de la imagen (solo si el post sigue apuntando a esa imagen)"""
+        Post.query.filter_by(id=post_id, imagen_url=imagen_url).update(
+            {Post.imagen_estado: ESTADO_LISTO if exito else ESTADO_ERROR},
+            synchronize_session=False
+        )
+        db.session.commit()
+
     
     @staticmethod
     def _post_to_dict(post: Post) -> dict:
@@ -129,8 +119,8 @@ class PostService:
             'created_at': post.created_at.isoformat() if post.created_at else None,
             'updated_at': post.updated_at.isoformat() if post.updated_at else None,
             'eliminado': post.eliminado,
-            'total_comentarios': getattr(post, 'total_comentarios', 0),
-            'total_likes': getattr(post, 'total_likes', 0)
+            'total_comentarios': post.comments_count or 0,
+            'total_likes': post.likes_count or 0
         }
         
         # ✅ INFORMACIÓN DEL USUARIO CON FOTO DE PERFIL ACCESIBLE (IGUAL QUE EL SERVICIO DE PERFIL)
@@ -157,15 +147,67 @@ class PostService:
                 'orden': 0,
                 'url_webp': f"/posts/{post.usuario_id}/imagen-post/{filename}",
                 'nombre': filename,
-                'formato': 'webp'
+                'formato': 'webp',
+                'estado': post.imagen_estado or ESTADO_LISTO
             }
+            imagen_info['urls'] = ImagenService.urls_por_tamano(imagen_info['url_webp'])
             post_dict['imagenes_webp'].append(imagen_info)
         
+        # Estado del procesamiento en segundo plano ('procesando', 'listo', 'error')
+        post_dict['imagen_estado'] = post.imagen_estado or ESTADO_LISTO
+        
         # Mantener compatibilidad
         post_dict['imagen_url_accesible'] = post_dict['imagenes_webp'][0]['url_webp'] if post_dict['imagenes_webp'] else None
         
         return post_dict
 
+    @staticmethod
+    def _posts_con_totales(posts: list) -> list:
+        """Serializar una página de posts; los totales vienen de los contadores del post"""
+        return [PostService._post_to_dict(post) for post in posts]
+
+    @staticmethod
+    def _paginar_por_cursor(query, columna_fecha, columna_id, cursor: str, por_pagina: int) -> tuple:
+        """
+        Paginación keyset sobre (columna_fecha, columna_id) descendente.
+        Devuelve (filas, hay_mas). Cuesta lo mismo en la primera página que en la 500.
+        """
+        if cursor:
+            fecha_cursor, id_cursor = decodificar_cursor(cursor)
+            query = query.filter(db.or_(
+                columna_fecha < fecha_cursor,
+                db.and_(columna_fecha == fecha_cursor, columna_id < id_cursor)
+            ))
+
+        filas = query.order_by(columna_fecha.desc(), columna_id.desc()).limit(por_pagina + 1).all()
+        hay_mas = len(filas) > por_pagina
+        return filas[:por_pagina], hay_mas
+
+    @staticmethod
+    def _respuesta_cursor(data: list, next_cursor: str, total: int = None) -> dict:
+        """Estructura común de respuesta en modo cursor"""
+        respuesta = {
+            'success': True,
+            'data': data,
+            'count': len(data),
+            'next_cursor': next_cursor,
+            'formato_imagenes': 'webp_url'
+        }
+        if total is not None:
+            respuesta['total_posts'] = total
+        return respuesta
+
+    @staticmethod
+    def _ajustar_contador(modelo, registro_id: int, columna, delta: int):
+        """
+        Incrementar/decrementar un contador con un UPDATE atómico en la misma transacción.
+        No se hace commit aquí: lo hace el método que registra el like/comentario.
+        updated_at se fija a sí mismo para que el onupdate no lo marque como editado.
+        """
+        modelo.query.filter(modelo.id == registro_id).update(
+            {columna: columna + delta, modelo.updated_at: modelo.updated_at}, synchronize_session=False
+        )
+
     @staticmethod
     def obtener_posts(pagina: int = 1, por_pagina: int = 10) -> dict:
         """Obtener lista de posts paginados con información completa del usuario"""
@@ -181,27 +223,13 @@ class PostService:
             # Contar total
             total = query.count()
             
-            # Obtener posts paginados
-            posts = query.order_by(Post.created_at.desc()).paginate(
+            # Obtener posts paginados (el autor sale del mismo JOIN, sin SELECT por post)
+            posts = query.options(contains_eager(Post.usuario)).order_by(Post.created_at.desc()).paginate(
                 page=pagina, per_page=por_pagina, error_out=False
             )
             
             # Procesar posts con información completa
-            posts_con_totales = []
-            for post in posts.items:
-                post_dict = PostService._post_to_dict(post)
-                
-                # Contar comentarios no eliminados
-                total_comentarios = PostComentario.query.filter_by(
-                    post_id=post.id, eliminado=False
-                ).count()
-                post_dict['total_comentarios'] = total_comentarios
-                
-                # Contar likes
-                total_likes = PostLike.query.filter_by(post_id=post.id).count()
-                post_dict['total_likes'] = total_likes
-                
-                posts_con_totales.append(post_dict)
+            posts_con_totales = PostService._posts_con_totales(posts.items)
             
             print(f"✅ Encontrados {len(posts_con_totales)} posts con información de usuarios")
             return {
@@ -222,6 +250,60 @@ class PostService:
             print(f"❌ Error al obtener posts: {str(e)}")
             raise e
     @staticmethod
+    def obtener_posts_cursor(cursor: str = None, por_pagina: int = 10, incluir_total: bool = False) -> dict:
+        """Obtener posts del feed con paginación por cursor (created_at, id)"""
+        try:
+            print(f"📄 Obteniendo posts por cursor - cursor {cursor}")
+            
+            query = db.session.query(Post).join(User).filter(
+                Post.eliminado == False,
+                User.id == Post.usuario_id
+            )
+            
+            posts, hay_mas = PostService._paginar_por_cursor(
+                query.options(contains_eager(Post.usuario)), Post.created_at, Post.id, cursor, por_pagina
+            )
+            next_cursor = codificar_cursor(posts[-1].created_at, posts[-1].id) if hay_mas else None
+            
+            # El total es opcional: obliga a recorrer toda la tabla
+            total = query.count() if incluir_total else None
+            
+            print(f"✅ Encontrados {len(posts)} posts (hay más: {hay_mas})")
+            return PostService._respuesta_cursor(PostService._posts_con_totales(posts), next_cursor, total)
+            
+        except Exception as e:
+            print(f"❌ Error al obtener posts por cursor: {str(e)}")
+            raise e
+
+    @staticmethod
+    def obtener_timeline(usuario_id: int, cursor: str = None, por_pagina: int = 10) -> dict:
+        """Obtener el home timeline (posts propios y de amigos) materializado en escritura"""
+        try:
+            print(f"🏠 Obteniendo timeline del usuario ID: {usuario_id} - cursor {cursor}")
+            
+            query = TimelineEntrada.query.filter(TimelineEntrada.usuario_id == usuario_id)
+            entradas, hay_mas = PostService._paginar_por_cursor(
+                query, TimelineEntrada.post_created_at, TimelineEntrada.post_id, cursor, por_pagina
+            )
+            next_cursor = codificar_cursor(entradas[-1].post_created_at, entradas[-1].post_id) if hay_mas else None
+            
+            # Cargar los posts de la página por PK y respetar el orden del timeline
+            post_ids = [entrada.post_id for entrada in entradas]
+            posts_por_id = {
+                post.id: post for post in Post.query.options(selectinload(Post.usuario)).filter(
+                    Post.id.in_(post_ids), Post.eliminado == False
+                ).all()
+            } if post_ids else {}
+            posts = [posts_por_id[post_id] for post_id in post_ids if post_id in posts_por_id]
+            
+            print(f"✅ Timeline con {len(posts)} posts (hay más: {hay_mas})")
+            return PostService._respuesta_cursor(PostService._posts_con_totales(posts), next_cursor)
+            
+        except Exception as e:
+            print(f"❌ Error al obtener timeline: {str(e)}")
+            raise e
+
+    @staticmethod
     def obtener_post_por_id(post_id: int) -> dict:
         """Obtener un post específico por ID con URL accesible"""
         try:
@@ -254,16 +336,17 @@ class PostService:
                 raise ValueError("No tienes permisos para editar este post")
             
             # ✅ MANEJO DE NUEVA IMAGEN SI SE PROPORCIONA
-            nueva_imagen_url = None
+            imagen_pendiente = None
             if imagen_file and imagen_file.filename:
-                print("🖼️ Procesando nueva imagen para el post...")
-                nueva_imagen_url = PostService._guardar_y_convertir_a_webp(imagen_file, usuario_id, 'post')
-                if nueva_imagen_url:
+                print("🖼️ Guardando nueva imagen para el post...")
+                imagen_pendiente = PostService._guardar_imagen_pendiente(imagen_file, usuario_id)
+                if imagen_pendiente:
                     # Eliminar imagen anterior si existe y es local
                     if post.imagen_url and post.imagen_url.startswith('/utils/pictures/'):
                         PostService._eliminar_imagen_fisica(post.imagen_url)
-                    post.imagen_url = nueva_imagen_url
-                    print(f"📷 Nueva imagen del post guardada: {nueva_imagen_url}")
+                    post.imagen_url = imagen_pendiente['url_relativa']
+                    post.imagen_estado = ESTADO_PROCESANDO
+                    print(f"📷 Nueva imagen del post en cola: {post.imagen_url}")
             
             # Actualizar campos permitidos (si no se proporcionó nueva imagen)
             if 'contenido' in data:
@@ -271,9 +354,13 @@ class PostService:
             if 'imagen_url' in data and not imagen_file:
                 # Solo actualizar URL si no se subió nueva imagen
                 post.imagen_url = data['imagen_url']
+                post.imagen_estado = ESTADO_LISTO
             
             db.session.commit()
             
+            if imagen_pendiente:
+                PostService._encolar_imagen(post.id, imagen_pendiente)
+            
             print("✅ Post actualizado exitosamente")
             return {
                 'message': 'Post actualizado exitosamente',
@@ -291,6 +378,7 @@ class PostService:
         try:
             if ruta_imagen.startswith('/utils/pictures/'):
                 ruta_completa = os.path.join(current_app.root_path, ruta_imagen.lstrip('/'))
+                ImagenService.eliminar_variantes(ruta_completa)
                 if os.path.exists(ruta_completa):
                     os.remove(ruta_completa)
                     print(f"✅ Archivo de imagen eliminado: {ruta_completa}")
@@ -340,7 +428,7 @@ class PostService:
             print(f"❌ Error al eliminar post: {str(e)}")
             raise e
 
-    # ... (los demás métodos se mantienen igual: agregar_comentario, obtener_comentarios, toggle_like_post, toggle_like_comentario, obtener_mis_posts, obtener_mis_likes_posts)
+    # ... (los demás métodos se mantienen igual: agregar_comentario, obtener_comentarios, eliminar_comentario, toggle_like_post, toggle_like_comentario, obtener_mis_posts, obtener_mis_likes_posts)
 
     @staticmethod
     def agregar_comentario(post_id: int, usuario_id: int, data: dict) -> dict:
@@ -366,6 +454,7 @@ class PostService:
             )
             
             db.session.add(comentario)
+            PostService._ajustar_contador(Post, post_id, Post.comments_count, 1)
             db.session.commit()
             
             print("✅ Comentario agregado exitosamente")
@@ -390,7 +479,10 @@ class PostService:
             if not post:
                 raise ValueError("Post no encontrado")
             
-            comentarios = PostComentario.query.filter_by(
+            # Autores en una sola consulta IN; total_likes sale del contador del comentario
+            comentarios = PostComentario.query.options(
+                selectinload(PostComentario.usuario)
+            ).filter_by(
                 post_id=post_id, eliminado=False
             ).order_by(PostComentario.created_at.asc()).all()
             
@@ -403,6 +495,36 @@ class PostService:
             print(f"❌ Error al obtener comentarios: {str(e)}")
             raise e
 
+    @staticmethod
+    def eliminar_comentario(comentario_id: int, usuario_id: int) -> dict:
+        """Eliminar (soft delete) un comentario propio y descontarlo del post"""
+        try:
+            print(f"🗑️ Eliminando comentario ID: {comentario_id}")
+            print(f"👤 Usuario autenticado ID: {usuario_id}")
+            
+            comentario = PostComentario.query.filter_by(
+                id=comentario_id, eliminado=False
+            ).first()
+            if not comentario:
+                raise ValueError("Comentario no encontrado")
+            
+            # Verificar que el usuario es el autor del comentario
+            if comentario.usuario_id != usuario_id:
+                raise ValueError("No tienes permisos para eliminar este comentario")
+            
+            # Soft delete + contador del post en la misma transacción
+            comentario.eliminado = True
+            PostService._ajustar_contador(Post, comentario.post_id, Post.comments_count, -1)
+            db.session.commit()
+            
+            print("✅ Comentario eliminado exitosamente")
+            return {'message': 'Comentario eliminado exitosamente'}
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al eliminar comentario: {str(e)}")
+            raise e
+
     @staticmethod
     def toggle_like_post(post_id: int, usuario_id: int) -> dict:
         """Agregar o quitar like de un post"""
@@ -423,11 +545,13 @@ class PostService:
             if like_existente:
                 # Quitar like
                 db.session.delete(like_existente)
+                PostService._ajustar_contador(Post, post_id, Post.likes_count, -1)
                 accion = "quitado"
             else:
                 # Agregar like
                 nuevo_like = PostLike(post_id=post_id, usuario_id=usuario_id)
                 db.session.add(nuevo_like)
+                PostService._ajustar_contador(Post, post_id, Post.likes_count, 1)
                 accion = "agregado"
             
             db.session.commit()
@@ -465,6 +589,7 @@ class PostService:
             if like_existente:
                 # Quitar like
                 db.session.delete(like_existente)
+                PostService._ajustar_contador(PostComentario, comentario_id, PostComentario.likes_count, -1)
                 accion = "quitado"
             else:
                 # Agregar like
@@ -472,6 +597,7 @@ class PostService:
                     comentario_id=comentario_id, usuario_id=usuario_id
                 )
                 db.session.add(nuevo_like)
+                PostService._ajustar_contador(PostComentario, comentario_id, PostComentario.likes_count, 1)
                 accion = "agregado"
             
             db.session.commit()
@@ -500,24 +626,12 @@ class PostService:
             total = query.count()
             
             # Obtener posts paginados
-            posts = query.order_by(Post.created_at.desc()).paginate(
+            posts = query.options(selectinload(Post.usuario)).order_by(Post.created_at.desc()).paginate(
                 page=pagina, per_page=por_pagina, error_out=False
             )
             
             # Procesar posts con la nueva estructura
-            posts_con_totales = []
-            for post in posts.items:
-                post_dict = PostService._post_to_dict(post)
-                
-                total_comentarios = PostComentario.query.filter_by(
-                    post_id=post.id, eliminado=False
-                ).count()
-                post_dict['total_comentarios'] = total_comentarios
-                
-                total_likes = PostLike.query.filter_by(post_id=post.id).count()
-                post_dict['total_likes'] = total_likes
-                
-                posts_con_totales.append(post_dict)
+            posts_con_totales = PostService._posts_con_totales(posts.items)
             
             print(f"✅ Encontrados {len(posts_con_totales)} posts del usuario")
             return {
@@ -538,6 +652,28 @@ class PostService:
             print(f"❌ Error al obtener posts del usuario: {str(e)}")
             raise e
 
+    @staticmethod
+    def obtener_mis_posts_cursor(usuario_id: int, cursor: str = None, por_pagina: int = 10, incluir_total: bool = False) -> dict:
+        """Obtener posts del usuario autenticado con paginación por cursor (created_at, id)"""
+        try:
+            print(f"📄 Obteniendo posts del usuario ID: {usuario_id} por cursor - cursor {cursor}")
+            
+            query = Post.query.filter_by(usuario_id=usuario_id, eliminado=False)
+            
+            posts, hay_mas = PostService._paginar_por_cursor(
+                query.options(selectinload(Post.usuario)), Post.created_at, Post.id, cursor, por_pagina
+            )
+            next_cursor = codificar_cursor(posts[-1].created_at, posts[-1].id) if hay_mas else None
+            
+            total = query.count() if incluir_total else None
+            
+            print(f"✅ Encontrados {len(posts)} posts del usuario (hay más: {hay_mas})")
+            return PostService._respuesta_cursor(PostService._posts_con_totales(posts), next_cursor, total)
+            
+        except Exception as e:
+            print(f"❌ Error al obtener posts del usuario por cursor: {str(e)}")
+            raise e
+
     @staticmethod
     def obtener_mis_likes_posts(usuario_id: int, pagina: int = 1, por_pagina: int = 10) -> dict:
         """Obtener posts que el usuario autenticado ha dado like con URLs accesibles"""
@@ -554,7 +690,7 @@ class PostService:
             total = query.count()
             
             # Obtener posts paginados
-            posts = query.order_by(PostLike.created_at.desc()).paginate(
+            posts = query.options(selectinload(Post.usuario)).order_by(PostLike.created_at.desc()).paginate(
                 page=pagina, per_page=por_pagina, error_out=False
             )
             
@@ -571,4 +707,35 @@ class PostService:
             
         except Exception as e:
             print(f"❌ Error al obtener posts likeados: {str(e)}")
-            raise e
\ No newline at end of file
+            raise e
+
+    @staticmethod
+    def obtener_mis_likes_posts_cursor(usuario_id: int, cursor: str = None, por_pagina: int = 10, incluir_total: bool = False) -> dict:
+        """Obtener posts likeados por el usuario con paginación por cursor (PostLike.created_at, PostLike.id)"""
+        try:
+            print(f"❤️ Obteniendo posts likeados por usuario ID: {usuario_id} por cursor - cursor {cursor}")
+            
+            query = db.session.query(Post, PostLike.created_at, PostLike.id).join(
+                PostLike, PostLike.post_id == Post.id
+            ).filter(
+                PostLike.usuario_id == usuario_id,
+                Post.eliminado == False
+            )
+            
+            filas, hay_mas = PostService._paginar_por_cursor(
+                query.options(selectinload(Post.usuario)), PostLike.created_at, PostLike.id, cursor, por_pagina
+            )
+            next_cursor = None
+            if hay_mas:
+                _, like_created_at, like_id = filas[-1]
+                next_cursor = codificar_cursor(like_created_at, like_id)
+            
+            total = query.count() if incluir_total else None
+            
+            posts = [post for post, _, _ in filas]
+            print(f"✅ Encontrados {len(posts)} posts likeados (hay más: {hay_mas})")
+            return PostService._respuesta_cursor(PostService._posts_con_totales(posts), next_cursor, total)
+            
+        except Exception as e:
+            print(f"❌ Error al obtener posts likeados por cursor: {str(e)}")
+            raise e
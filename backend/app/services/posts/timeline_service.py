@@ -0,0 +1,109 @@
+from datetime import datetime
+from sqlalchemy import func, literal, exists, and_
+from app.core.config import settings
+from app.models.social.friendship_model import Friendship
+from app.models.posts.post_model import Post
+from app.models.posts.timeline_model import TimelineEntrada
+from app.utils.database import db
+
+class TimelineService:
+    """
+    Almacén del home timeline (fan-out en escritura) sobre la tabla timeline_entradas.
+    Cada usuario guarda como máximo settings.TIMELINE_MAX_ENTRADAS entradas.
+    """
+
+    @staticmethod
+    def _obtener_amigos_ids(usuario_id: int) -> list:
+        """IDs de los amigos aceptados de un usuario"""
+        relaciones = db.session.query(Friendship.sender_id, Friendship.receiver_id).filter(
+            Friendship.status == 'accepted',
+            (Friendship.sender_id == usuario_id) | (Friendship.receiver_id == usuario_id)
+        ).all()
+        return [receiver_id if sender_id == usuario_id else sender_id for sender_id, receiver_id in relaciones]
+
+    @staticmethod
+    def publicar_post(post) -> int:
+        """
+        Empujar un post recién creado al timeline del autor y de sus amigos aceptados.
+        No hace commit: se ejecuta dentro de la transacción de crear_post.
+        """
+        destinatarios = [post.usuario_id] + TimelineService._obtener_amigos_ids(post.usuario_id)
+        post_created_at = post.created_at or datetime.now()
+
+        db.session.execute(
+            TimelineEntrada.__table__.insert(),
+            [
+                {'usuario_id': usuario_id, 'post_id': post.id, 'post_created_at': post_created_at}
+                for usuario_id in destinatarios
+            ]
+        )
+
+        TimelineService._recortar_timelines(destinatarios)
+
+        print(f"📬 Post {post.id} publicado en {len(destinatarios)} timelines")
+        return len(destinatarios)
+
+    @staticmethod
+    def _recortar_timelines(usuario_ids: list):
+        """
+        Eliminar en una sola sentencia las entradas que superan el tope de cada usuario.
+        Las entradas se numeran por usuario en el mismo orden en que se leen
+        (post_created_at, post_id descendente) y se borran las que pasan de TIMELINE_MAX_ENTRADAS.
+        """
+        if not usuario_ids:
+            return
+
+        numeradas = db.session.query(
+            TimelineEntrada.id.label('id'),
+            func.row_number().over(
+                partition_by=TimelineEntrada.usuario_id,
+                order_by=(TimelineEntrada.post_created_at.desc(), TimelineEntrada.post_id.desc())
+            ).label('posicion')
+        ).filter(TimelineEntrada.usuario_id.in_(usuario_ids)).subquery()
+        # La tabla derivada se materializa (tiene función de ventana): MySQL permite borrar de la misma tabla
+        sobrantes = db.session.query(numeradas.c.id).filter(numeradas.c.posicion > settings.TIMELINE_MAX_ENTRADAS)
+
+        TimelineEntrada.query.filter(TimelineEntrada.id.in_(sobrantes)).delete(synchronize_session=False)
+
+    @staticmethod
+    def conectar_amigos(usuario_a_id: int, usuario_b_id: int):
+        """
+        Al aceptar una amistad: copiar los posts recientes de cada usuario al timeline del otro.
+        No hace commit: se ejecuta dentro de la transacción que acepta la solicitud.
+        """
+        for lector_id, autor_id in ((usuario_a_id, usuario_b_id), (usuario_b_id, usuario_a_id)):
+            ya_en_timeline = exists().where(and_(
+                TimelineEntrada.usuario_id == lector_id,
+                TimelineEntrada.post_id == Post.id
+            ))
+            recientes = db.session.query(
+                literal(lector_id), Post.id, Post.created_at
+            ).filter(
+                Post.usuario_id == autor_id,
+                Post.eliminado == False,
+                ~ya_en_timeline
+            ).order_by(Post.created_at.desc(), Post.id.desc()).limit(settings.TIMELINE_MAX_ENTRADAS)
+
+            db.session.execute(
+                TimelineEntrada.__table__.insert().from_select(
+                    ['usuario_id', 'post_id', 'post_created_at'], recientes.statement
+                )
+            )
+
+        TimelineService._recortar_timelines([usuario_a_id, usuario_b_id])
+        print(f"📬 Timelines de {usuario_a_id} y {usuario_b_id} completados con los posts del otro")
+
+    @staticmethod
+    def desconectar_amigos(usuario_a_id: int, usuario_b_id: int):
+        """
+        Al eliminar una amistad: quitar de cada timeline los posts del otro usuario.
+        No hace commit: se ejecuta dentro de la transacción que elimina la amistad.
+        """
+        for lector_id, autor_id in ((usuario_a_id, usuario_b_id), (usuario_b_id, usuario_a_id)):
+            posts_autor = db.session.query(Post.id).filter(Post.usuario_id == autor_id)
+            TimelineEntrada.query.filter(
+                TimelineEntrada.usuario_id == lector_id,
+                TimelineEntrada.post_id.in_(posts_autor)
+            ).delete(synchronize_session=False)
+
+        print(f"🧹 Timelines de {usuario_a_id} y {usuario_b_id} sin los posts del otro")
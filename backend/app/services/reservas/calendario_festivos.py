@@ -0,0 +1,73 @@
+# app/services/reservas/calendario_festivos.py
+import time
+import threading
+from app.core.config import settings
+from app.models.canchas.dia_festivo import DiaFestivo
+from app.utils.database import db
+from app.services.reservas.generaciones import generaciones, CLAVE_FESTIVOS
+
+class CalendarioFestivos:
+    """
+    Calendario de días festivos cargado completo en memoria.
+    La tabla dias_festivos es pequeña y cambia pocas veces al año: se lee entera
+    una vez y se recarga cuando cambia la generación de festivos (tras confirmar un cambio
+    de DiaFestivo en cualquier worker) o al vencer settings.FESTIVOS_TTL.
+    """
+
+    _festivos = None  # {fecha: es_laborable}
+    _cargado_en = 0.0
+    _generacion = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _vigente(cls, generacion: int) -> bool:
+        return (
+            cls._festivos is not None
+            and cls._generacion == generacion
+            and time.monotonic() - cls._cargado_en < settings.FESTIVOS_TTL
+        )
+
+    @classmethod
+    def _datos(cls) -> dict:
+        generacion = generaciones.obtener(CLAVE_FESTIVOS)
+        festivos = cls._festivos
+        if festivos is not None and cls._vigente(generacion):
+            return festivos
+
+        with cls._lock:
+            if not cls._vigente(generacion):
+                # La generación se lee antes de la consulta: un cambio confirmado durante la carga fuerza otra
+                filas = db.session.query(DiaFestivo.fecha, DiaFestivo.es_laborable).all()
+                cls._festivos = {fecha: bool(es_laborable) for fecha, es_laborable in filas}
+                cls._generacion = generacion
+                cls._cargado_en = time.monotonic()
+                print(f"📅 Calendario de festivos cargado: {len(cls._festivos)} días")
+            return cls._festivos
+
+    @classmethod
+    def es_festivo(cls, fecha) -> bool:
+        return fecha in cls._datos()
+
+    @classmethod
+    def es_laborable(cls, fecha) -> bool:
+        """Un festivo marcado como laborable se trabaja; los días normales también lo son"""
+        return cls._datos().get(fecha, True)
+
+    @classmethod
+    def usa_horario_festivo(cls, fecha) -> bool:
+        """True si la fecha es festivo no laborable (aplica el horario de festivos)"""
+        return cls._datos().get(fecha) is False
+
+    @classmethod
+    def festivos_entre(cls, fecha_inicio, fecha_fin) -> set:
+        """Fechas del rango que usan el horario de festivos"""
+        return {
+            fecha for fecha, es_laborable in cls._datos().items()
+            if not es_laborable and fecha_inicio <= fecha <= fecha_fin
+        }
+
+    @classmethod
+    def invalidar(cls):
+        """Forzar la recarga en la próxima consulta"""
+        cls._festivos = None
+
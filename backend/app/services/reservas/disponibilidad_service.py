@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.models.reservas.reserva import Reserva
+from app.utils.database import db
+from app.utils.cache_utils import CacheLRU, CacheSQLite
+from app.services.reservas.generaciones import generaciones, clave_horario, clave_reservas, CLAVE_FESTIVOS
+from app.services.reservas.horario_compilado import HorarioCompilado, HorarioCompiladoService, a_minutos
+from app.services.reservas.calendario_festivos import CalendarioFestivos
+
+def _a_hora_str(minutos: int) -> str:
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+def _crear_cache():
+    """Caché de huecos libres por (cancha_id, fecha): en memoria o SQLite compartido entre workers"""
+    if settings.DISPONIBILIDAD_CACHE_BACKEND == 'sqlite':
+        return CacheSQLite(settings.CACHE_SQLITE_PATH, 'cache_disponibilidad', settings.DISPONIBILIDAD_CACHE_TTL)
+    return CacheLRU(settings.DISPONIBILIDAD_CACHE_MAX, settings.DISPONIBILIDAD_CACHE_TTL)
+
+class DisponibilidadService:
+    """
+    Motor único de disponibilidad de canchas.
+    Usa los horarios compilados por cancha y el calendario de festivos en memoria,
+    carga las reservas del rango con una consulta y calcula los huecos libres como operaciones de conjuntos sobre minutos del día.
+    Los huecos por (cancha_id, fecha) se cachean junto con las generaciones del horario
+    de la cancha, de los festivos y de las reservas de esa fecha con que se calcularon:
+    editar horarios o festivos, reservar o cancelar (tras el commit, en cualquier worker)
+    los deja obsoletos. El filtro de horas ya pasadas se aplica al leer.
+    """
+
+    _cache = _crear_cache()
+
+    @staticmethod
+    def _clave(cancha_id: int, fecha) -> str:
+        return f"{cancha_id}:{fecha.isoformat()}"
+
+    @staticmethod
+    def _generaciones(cancha_ids: list, fechas: list) -> dict:
+        """
+        {(cancha_id, fecha): [generación del horario, de festivos, de las reservas del día]};
+        se leen antes de consultar la BD
+        """
+        claves = [CLAVE_FESTIVOS] + [clave_horario(cancha_id) for cancha_id in cancha_ids]
+        claves += [clave_reservas(cancha_id, fecha) for cancha_id in cancha_ids for fecha in fechas]
+        valores = generaciones.obtener_varias(claves)
+        return {
+            (cancha_id, fecha): [
+                valores[clave_horario(cancha_id)], valores[CLAVE_FESTIVOS], valores[clave_reservas(cancha_id, fecha)]
+            ]
+            for cancha_id in cancha_ids for fecha in fechas
+        }
+
+    @staticmethod
+    def _calcular_huecos(cancha_ids: list, fechas: list) -> dict:
+        """Huecos libres sin filtrar por hora actual: {(cancha_id, fecha): [[minuto, intervalo], ...]}"""
+        # 1) Horarios semanales compilados (caché por cancha)
+        compilados = HorarioCompiladoService.obtener_varios(cancha_ids)
+
+        # 2) Festivos no laborables entre las fechas (calendario en memoria)
+        festivos = CalendarioFestivos.festivos_entre(min(fechas), max(fechas))
+
+        # 3) Reservas activas de esas fechas: (cancha_id, fecha) -> {minuto}
+        ocupados = {}
+        reservas = db.session.query(Reserva.cancha_id, Reserva.fecha, Reserva.hora).filter(
+            Reserva.cancha_id.in_(cancha_ids),
+            Reserva.fecha.in_(fechas),
+            Reserva.estado != 'cancelada'
+        ).all()
+        for cancha_id, fecha, hora in reservas:
+            ocupados.setdefault((cancha_id, fecha), set()).add(a_minutos(hora))
+
+        # 4) Huecos libres = slots configurados - ocupados
+        huecos = {}
+        for cancha_id in cancha_ids:
+            for fecha in fechas:
+                dia = HorarioCompilado.dia_para(fecha, fecha in festivos)
+                slots = compilados[cancha_id].slots(dia)
+                libres = slots.keys() - ocupados.get((cancha_id, fecha), set())
+                huecos[(cancha_id, fecha)] = [[minuto, slots[minuto]] for minuto in sorted(libres)]
+
+        return huecos
+
+    @staticmethod
+    def calcular(cancha_ids: list, fecha_inicio, fecha_fin=None, ahora: datetime = None) -> dict:
+        """
+        Calcular los horarios libres de varias canchas en un rango de fechas.
+        Devuelve {cancha_id: {fecha: [{'hora': 'HH:MM', 'intervalo': int}, ...]}}.
+        No incluye horarios que ya pasaron.
+        """
+        fecha_fin = fecha_fin or fecha_inicio
+        fechas = [fecha_inicio + timedelta(days=i) for i in range((fecha_fin - fecha_inicio).days + 1)]
+        return DisponibilidadService.calcular_fechas(cancha_ids, fechas, ahora)
+
+    @staticmethod
+    def calcular_fechas(cancha_ids: list, fechas: list, ahora: datetime = None) -> dict:
+        """
+        Como calcular(), pero solo para las fechas indicadas (p.ej. las de una reserva recurrente):
+        no se calcula ni se cachea ningún día intermedio.
+        """
+        ahora = ahora or datetime.now()
+        hoy = ahora.date()
+        minuto_actual = ahora.hour * 60 + ahora.minute
+
+        # Las fechas pasadas no tienen huecos: no hace falta ni caché ni BD
+        fechas_vigentes = sorted({fecha for fecha in fechas if fecha >= hoy})
+
+        huecos = {}
+        faltantes = []
+        actuales = DisponibilidadService._generaciones(cancha_ids, fechas_vigentes)
+        for fecha in fechas_vigentes:
+            for cancha_id in cancha_ids:
+                valor = DisponibilidadService._cache.obtener(DisponibilidadService._clave(cancha_id, fecha))
+                if valor is None or valor['generacion'] != actuales[(cancha_id, fecha)]:
+                    faltantes.append((cancha_id, fecha))
+                else:
+                    huecos[(cancha_id, fecha)] = valor['huecos']
+
+        if faltantes:
+            canchas_faltantes = sorted({cancha_id for cancha_id, _ in faltantes})
+            fechas_faltantes = sorted({fecha for _, fecha in faltantes})
+            calculados = DisponibilidadService._calcular_huecos(canchas_faltantes, fechas_faltantes)
+            for (cancha_id, fecha), valor in calculados.items():
+                DisponibilidadService._cache.guardar(
+                    DisponibilidadService._clave(cancha_id, fecha),
+                    {'generacion': actuales[(cancha_id, fecha)], 'huecos': valor}
+                )
+            huecos.update(calculados)
+
+        resultado = {}
+        for cancha_id in cancha_ids:
+            por_fecha = resultado.setdefault(cancha_id, {})
+            for fecha in fechas:
+                libres = huecos.get((cancha_id, fecha), []) if fecha >= hoy else []
+                por_fecha[fecha] = [
+                    {'hora': _a_hora_str(minuto), 'intervalo': intervalo}
+                    for minuto, intervalo in libres
+                    if fecha > hoy or minuto > minuto_actual
+                ]
+
+        return resultado
+
+    @staticmethod
+    def horarios_libres(cancha_id: int, fecha) -> list:
+        """Horarios libres de una cancha en una fecha"""
+        return DisponibilidadService.calcular([cancha_id], fecha)[cancha_id][fecha]
+
+    @staticmethod
+    def invalidar_todo():
+        """Invalidar toda la caché (p.ej. al cambiar el calendario de festivos)"""
+        DisponibilidadService._cache.limpiar()
+
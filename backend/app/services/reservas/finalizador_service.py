@@ -0,0 +1,111 @@
+# app/services/reservas/finalizador_service.py
+import time
+import threading
+from datetime import datetime
+from sqlalchemy import and_, or_
+from app.core.config import settings
+from app.models.reservas.reserva import Reserva
+from app.utils.database import db
+
+ESTADO_FINALIZADO = 'finalizado'
+
+def reserva_ya_paso(reserva, ahora: datetime = None) -> bool:
+    """True si la fecha/hora de la reserva es anterior a ahora"""
+    ahora = ahora or datetime.now()
+    return datetime.combine(reserva.fecha, reserva.hora) < ahora
+
+def estado_visible(reserva, ahora: datetime = None) -> str:
+    """
+    Estado a mostrar sin escribir en la BD: una reserva confirmada que ya pasó
+    se muestra como finalizada aunque el barrido todavía no la haya actualizado.
+    """
+    if reserva.estado == 'confirmada' and reserva_ya_paso(reserva, ahora):
+        return ESTADO_FINALIZADO
+    return reserva.estado
+
+class FinalizadorReservasService:
+    """
+    Barrido periódico que pasa a 'finalizado' las reservas confirmadas que ya pasaron.
+    Cada lote es un SELECT de ids + un UPDATE por conjunto, con commit por lote
+    para no mantener bloqueos largos.
+    """
+
+    _hilo = None
+    _hilo_lock = threading.Lock()
+
+    @staticmethod
+    def finalizar_pasadas(ahora: datetime = None, tamano_lote: int = None) -> int:
+        """Finalizar reservas confirmadas anteriores a ahora. Devuelve cuántas se actualizaron."""
+        ahora = ahora or datetime.now()
+        tamano_lote = tamano_lote or settings.RESERVAS_FINALIZADOR_LOTE
+        condicion_pasada = or_(
+            Reserva.fecha < ahora.date(),
+            and_(Reserva.fecha == ahora.date(), Reserva.hora < ahora.time())
+        )
+
+        total = 0
+        try:
+            while True:
+                ids = [
+                    reserva_id for (reserva_id,) in db.session.query(Reserva.id).filter(
+                        Reserva.estado == 'confirmada',
+                        condicion_pasada
+                    ).order_by(Reserva.id).limit(tamano_lote).all()
+                ]
+                if not ids:
+                    break
+
+                actualizadas = Reserva.query.filter(
+                    Reserva.id.in_(ids),
+                    Reserva.estado == 'confirmada'
+                ).update({Reserva.estado: ESTADO_FINALIZADO}, synchronize_session=False)
+                db.session.commit()
+                total += actualizadas
+
+                if len(ids) < tamano_lote:
+                    break
+
+            if total:
+                print(f"✅ {total} reservas pasadas a '{ESTADO_FINALIZADO}'")
+            return total
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error al finalizar reservas: {str(e)}")
+            raise e
+
+    @staticmethod
+    def iniciar_en_segundo_plano(app, intervalo_segundos: int = None) -> threading.Thread:
+        """Lanzar el barrido en un hilo daemon que se repite cada intervalo_segundos (uno por proceso)"""
+        intervalo_segundos = intervalo_segundos or settings.RESERVAS_FINALIZADOR_INTERVALO
+
+        def _bucle():
+            while True:
+                with app.app_context():
+                    try:
+                        FinalizadorReservasService.finalizar_pasadas()
+                    except Exception:
+                        pass  # Ya se registró; se reintenta en el siguiente ciclo
+                    finally:
+                        db.session.remove()
+                time.sleep(intervalo_segundos)
+
+        with FinalizadorReservasService._hilo_lock:
+            if FinalizadorReservasService._hilo is None or not FinalizadorReservasService._hilo.is_alive():
+                FinalizadorReservasService._hilo = threading.Thread(target=_bucle, name='finalizador-reservas', daemon=True)
+                FinalizadorReservasService._hilo.start()
+        return FinalizadorReservasService._hilo
+
+
+if __name__ == '__main__':
+    # python -m app.services.reservas.finalizador_service          -> un barrido (cron)
+    # python -m app.services.reservas.finalizador_service --loop   -> barrido continuo
+    import sys
+    from app.utils import create_app
+
+    app = create_app()
+    if '--loop' in sys.argv:
+        FinalizadorReservasService.iniciar_en_segundo_plano(app).join()
+    else:
+        with app.app_context():
+            FinalizadorReservasService.finalizar_pasadas()
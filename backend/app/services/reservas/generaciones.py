@@ -0,0 +1,69 @@
+# app/services/reservas/generaciones.py
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.canchas.horario_cancha import HorarioCancha
+from app.models.canchas.dia_festivo import DiaFestivo
+from app.models.reservas.reserva import Reserva
+from app.utils.cache_utils import GeneracionesMemoria, GeneracionesSQLite
+
+# Generación de los festivos (afecta a todas las canchas) y de los horarios de cada cancha
+CLAVE_FESTIVOS = 'festivos'
+
+def clave_horario(cancha_id: int) -> str:
+    return f"horario:{cancha_id}"
+
+def clave_reservas(cancha_id: int, fecha) -> str:
+    """Generación de las reservas de una cancha en una fecha (reservar o cancelar la cambia)"""
+    return f"reservas:{cancha_id}:{fecha}"  # str(date) es YYYY-MM-DD
+
+def _crear_generaciones():
+    """'sqlite': compartidas por los workers de la máquina (CACHE_SQLITE_PATH); 'memoria': un solo worker"""
+    if settings.CACHE_GENERACIONES_BACKEND == 'sqlite':
+        return GeneracionesSQLite(settings.CACHE_SQLITE_PATH, 'generaciones')
+    return GeneracionesMemoria()
+
+# Versiones de los datos de reservas y su configuración. Las cachés derivadas (horarios compilados,
+# calendario de festivos, disponibilidad) guardan la generación leída antes de consultar la BD
+# y descartan lo cacheado cuando cambia.
+generaciones = _crear_generaciones()
+
+_PENDIENTES = 'generaciones_pendientes'
+
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_cambios(session, contexto):
+    """Anotar qué generaciones cambia la transacción; se publican solo si llega a confirmarse"""
+    claves = session.info.setdefault(_PENDIENTES, set())
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(objeto, HorarioCancha):
+            # También la cancha anterior si el horario se movió de cancha
+            anteriores = inspect(objeto).attrs.cancha_id.history.deleted or ()
+            for cancha_id in (objeto.cancha_id, *anteriores):
+                if cancha_id is not None:
+                    claves.add(clave_horario(cancha_id))
+        elif isinstance(objeto, DiaFestivo):
+            claves.add(CLAVE_FESTIVOS)
+        elif isinstance(objeto, Reserva):
+            # Fecha y cancha actuales y, si la reserva se movió, las anteriores
+            estado = inspect(objeto)
+            canchas = {objeto.cancha_id, *(estado.attrs.cancha_id.history.deleted or ())}
+            fechas = {objeto.fecha, *(estado.attrs.fecha.history.deleted or ())}
+            for cancha_id in canchas:
+                for fecha in fechas:
+                    if cancha_id is not None and fecha is not None:
+                        claves.add(clave_reservas(cancha_id, fecha))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publicar_cambios(session):
+    # Después del commit: nadie puede recalcular con los datos anteriores y quedarse la generación nueva
+    for clave in session.info.pop(_PENDIENTES, ()):
+        generaciones.incrementar(clave)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _descartar_cambios(session, transaccion):
+    # Rollback de la transacción externa: los cambios anotados no llegaron a la BD
+    if transaccion.parent is None:
+        session.info.pop(_PENDIENTES, None)
@@ -0,0 +1,100 @@
+# app/services/reservas/horario_compilado.py
+from app.core.config import settings
+from app.models.canchas.horario_cancha import HorarioCancha
+from app.utils.cache_utils import CacheLRU
+from app.services.reservas.generaciones import generaciones, clave_horario
+from app.services.reservas.calendario_festivos import CalendarioFestivos
+
+DIAS_SEMANA = ['lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo']
+
+# Los festivos no laborables usan el horario configurado para el domingo
+DIA_FESTIVO = 'domingo'
+
+def a_minutos(hora) -> int:
+    return hora.hour * 60 + hora.minute
+
+class HorarioCompilado:
+    """
+    Horario semanal de una cancha compilado a partir de sus filas HorarioCancha.
+    Por día guarda un bitset de minutos de inicio válidos (bit m = se puede reservar a las m/60:m%60)
+    y el intervalo de cada slot. Validar una hora es un desplazamiento de bits.
+    """
+    __slots__ = ('cancha_id', 'bits', 'intervalos')
+
+    def __init__(self, cancha_id: int, horarios: list):
+        self.cancha_id = cancha_id
+        self.bits = {}
+        self.intervalos = {}
+        for horario in horarios:
+            if not horario.disponible:
+                continue
+            intervalo = horario.intervalo_minutos or 60
+            slots = self.intervalos.setdefault(horario.dia_semana, {})
+            bits = self.bits.get(horario.dia_semana, 0)
+            for minuto in range(a_minutos(horario.hora_inicio), a_minutos(horario.hora_fin), intervalo):
+                if minuto not in slots:
+                    slots[minuto] = intervalo
+                    bits |= 1 << minuto
+            self.bits[horario.dia_semana] = bits
+
+    @staticmethod
+    def dia_para(fecha, es_festivo: bool = False) -> str:
+        """Día de la semana cuyo horario aplica a la fecha (los festivos no laborables usan el del domingo)"""
+        return DIA_FESTIVO if es_festivo else DIAS_SEMANA[fecha.weekday()]
+
+    def admite(self, dia_semana: str, minuto: int) -> bool:
+        """True si a ese minuto del día empieza un slot reservable"""
+        return (self.bits.get(dia_semana, 0) >> minuto) & 1 == 1
+
+    def slots(self, dia_semana: str) -> dict:
+        """{minuto: intervalo} de los slots del día"""
+        return self.intervalos.get(dia_semana, {})
+
+
+class HorarioCompiladoService:
+    """
+    Caché en memoria de horarios compilados por cancha.
+    Cada compilado guarda la generación del horario de su cancha (leída antes de la consulta);
+    al confirmarse un cambio de HorarioCancha en cualquier worker la generación sube y se recompila.
+    """
+
+    _cache = CacheLRU(settings.HORARIOS_COMPILADOS_MAX, settings.HORARIOS_COMPILADOS_TTL)
+
+    @staticmethod
+    def obtener_varios(cancha_ids: list) -> dict:
+        """{cancha_id: HorarioCompilado}; compila las que faltan o quedaron obsoletas con una sola consulta"""
+        actuales = generaciones.obtener_varias([clave_horario(cancha_id) for cancha_id in cancha_ids])
+        compilados = {}
+        faltantes = []
+        for cancha_id in cancha_ids:
+            valor = HorarioCompiladoService._cache.obtener(str(cancha_id))
+            if valor is None or valor[0] != actuales[clave_horario(cancha_id)]:
+                faltantes.append(cancha_id)
+            else:
+                compilados[cancha_id] = valor[1]
+
+        if faltantes:
+            por_cancha = {cancha_id: [] for cancha_id in faltantes}
+            for horario in HorarioCancha.query.filter(HorarioCancha.cancha_id.in_(faltantes)).all():
+                por_cancha[horario.cancha_id].append(horario)
+            for cancha_id, horarios in por_cancha.items():
+                compilado = HorarioCompilado(cancha_id, horarios)
+                HorarioCompiladoService._cache.guardar(str(cancha_id), (actuales[clave_horario(cancha_id)], compilado))
+                compilados[cancha_id] = compilado
+
+        return compilados
+
+    @staticmethod
+    def obtener(cancha_id: int) -> HorarioCompilado:
+        return HorarioCompiladoService.obtener_varios([cancha_id])[cancha_id]
+
+    @staticmethod
+    def admite(cancha_id: int, fecha, hora) -> bool:
+        """Validar que la hora sea un inicio de slot del horario aplicable a la fecha"""
+        dia = HorarioCompilado.dia_para(fecha, CalendarioFestivos.usa_horario_festivo(fecha))
+        return HorarioCompiladoService.obtener(cancha_id).admite(dia, a_minutos(hora))
+
+    @staticmethod
+    def invalidar(cancha_id: int):
+        HorarioCompiladoService._cache.eliminar(str(cancha_id))
+
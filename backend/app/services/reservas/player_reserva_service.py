@@ -1,6 +1,6 @@
 # app/services/player_reserva_service.py
-from app.models.reserva import Reserva
-from app.models.cancha import Cancha
+from app.models.reservas.reserva import Reserva
+from app.models.canchas.cancha import Cancha
 from app.utils.database import db
 from datetime import datetime
 
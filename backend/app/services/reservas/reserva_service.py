@@ -1,13 +1,53 @@
-from app.models.reserva import Reserva
-from app.models.cancha import Cancha
-from app.models.horario_cancha import HorarioCancha
+from app.models.reservas.reserva import Reserva
+from app.models.canchas.cancha import Cancha
 from app.utils.database import db
 from app.utils.auth_utils import obtener_usuario_desde_token
+from app.utils.cursor_utils import codificar_cursor, decodificar_cursor
+from app.services.reservas.disponibilidad_service import DisponibilidadService
+from app.services.reservas.horario_compilado import HorarioCompiladoService
+from app.services.reservas.finalizador_service import estado_visible
+from sqlalchemy.exc import IntegrityError, OperationalError
 from datetime import datetime, date, time, timedelta
 import calendar
+import time as time_module
+
+# Errores de MySQL por los que vale la pena reintentar la transacción: deadlock y lock wait timeout
+ERRORES_REINTENTABLES = (1213, 1205)
+MAX_REINTENTOS_RESERVA = 3
 
 class ReservaService:
 
+    @staticmethod
+    def _insertar_reserva(cancha_id, user_id, fecha, hora):
+        """
+        Insertar la reserva sin comprobar antes si el horario está libre.
+        Si otra transacción ya ocupó el horario, la violación del índice único
+        se traduce a ValueError; los deadlocks se reintentan con un pequeño backoff.
+        """
+        for intento in range(1, MAX_REINTENTOS_RESERVA + 1):
+            nueva_reserva = Reserva(
+                cancha_id=cancha_id,
+                user_id=user_id,
+                fecha=fecha,
+                hora=hora,
+                estado='confirmada',
+                slot_activo=True
+            )
+            try:
+                db.session.add(nueva_reserva)
+                db.session.commit()
+                return nueva_reserva
+            except IntegrityError:
+                db.session.rollback()
+                raise ValueError("Ya existe una reserva confirmada en ese horario")
+            except OperationalError as e:
+                db.session.rollback()
+                codigo = e.orig.args[0] if e.orig is not None and e.orig.args else None
+                if codigo not in ERRORES_REINTENTABLES or intento == MAX_REINTENTOS_RESERVA:
+                    raise
+                print(f"🔁 Reintentando reserva ({intento}/{MAX_REINTENTOS_RESERVA}) tras error {codigo}")
+                time_module.sleep(0.05 * intento)
+
     @staticmethod
     def _obtener_dia_semana(fecha):
         """Obtener el día de la semana en español"""
@@ -75,31 +115,11 @@ class ReservaService:
 
             # Verificar si el horario está disponible según los rangos configurados
             dia_semana = ReservaService._obtener_dia_semana(fecha)
-            if not ReservaService._verificar_disponibilidad_horario(cancha_id, dia_semana, hora_solicitada, fecha):
+            if not ReservaService._verificar_disponibilidad_horario(cancha_id, hora_solicitada, fecha):
                 raise ValueError(f"El horario {hora_solicitada.strftime('%H:%M')} no está disponible para {dia_semana}")
 
-            # Verificar si ya existe una reserva en ese horario
-            reserva_existente = Reserva.query.filter_by(
-                cancha_id=cancha_id,
-                fecha=fecha,
-                hora=hora_solicitada,
-                estado='confirmada'
-            ).first()
-            
-            if reserva_existente:
-                raise ValueError("Ya existe una reserva confirmada en ese horario")
-
-            # Crear reserva
-            nueva_reserva = Reserva(
-                cancha_id=cancha_id,
-                user_id=usuario.id,
-                fecha=fecha,
-                hora=hora_solicitada,
-                estado='confirmada'
-            )
-
-            db.session.add(nueva_reserva)
-            db.session.commit()
+            # Insert atómico: el índice único uq_reservas_slot_activo decide quién se queda el horario
+            nueva_reserva = ReservaService._insertar_reserva(cancha_id, usuario.id, fecha, hora_solicitada)
             
             print(f"✅ Reserva creada exitosamente: ID {nueva_reserva.id}, Cancha {cancha_id}, Fecha {fecha}, Hora {hora_solicitada}")
             return nueva_reserva
@@ -117,59 +137,157 @@ class ReservaService:
             print(f"🔍 Traceback completo: {traceback.format_exc()}")
             raise Exception("Error interno al crear la reserva")
 
+    # Límite de fechas por reserva recurrente (una temporada completa)
+    MAX_FECHAS_RECURRENTE = 52
+
     @staticmethod
-    def _verificar_disponibilidad_horario(cancha_id, dia_semana, hora_solicitada, fecha):
+    def _fechas_recurrentes(data) -> list:
         """
-        Verificar si un horario está disponible según los rangos configurados
+        Fechas pedidas: lista explícita 'fechas' o 'fecha_inicio' + 'semanas' (misma hora cada semana).
+        Los límites se comprueban antes de generar o parsear ninguna fecha.
         """
-        horarios_rango = HorarioCancha.query.filter_by(
-            cancha_id=cancha_id,
-            dia_semana=dia_semana,
-            disponible=True
-        ).all()
-
-        for horario in horarios_rango:
-            if ReservaService._hora_en_rango(hora_solicitada, horario.hora_inicio, horario.hora_fin, horario.intervalo_minutos, fecha):
-                return True
-        
-        return False
+        maximo = ReservaService.MAX_FECHAS_RECURRENTE
+
+        if data.get('fechas'):
+            if not isinstance(data['fechas'], list):
+                raise ValueError("'fechas' debe ser una lista de fechas YYYY-MM-DD")
+            if len(data['fechas']) > maximo:
+                raise ValueError(f"Máximo {maximo} fechas por reserva recurrente")
+            try:
+                fechas = [datetime.strptime(f, '%Y-%m-%d').date() for f in data['fechas']]
+            except (TypeError, ValueError):
+                raise ValueError("Formato de fecha inválido (debe ser YYYY-MM-DD)")
+
+        elif data.get('fecha_inicio') and data.get('semanas'):
+            semanas = data['semanas']
+            if isinstance(semanas, str) and semanas.strip().isdigit():
+                semanas = int(semanas)
+            if isinstance(semanas, bool) or not isinstance(semanas, int):
+                raise ValueError("'semanas' debe ser un número entero")
+            if not 1 <= semanas <= maximo:
+                raise ValueError(f"'semanas' debe estar entre 1 y {maximo}")
+            try:
+                inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                raise ValueError("Formato de fecha inválido (debe ser YYYY-MM-DD)")
+            try:
+                fechas = [inicio + timedelta(weeks=i) for i in range(semanas)]
+            except OverflowError:
+                raise ValueError("Las semanas pedidas superan la fecha máxima admitida")
+
+        else:
+            raise ValueError("Datos incompletos: se requieren 'fechas' o 'fecha_inicio' y 'semanas'")
+
+        return sorted(set(fechas))
 
     @staticmethod
-    def _hora_en_rango(hora_solicitada, hora_inicio, hora_fin, intervalo_minutos, fecha):
+    def crear_reservas_recurrentes(data):
         """
-        Verificar si una hora específica está dentro de un rango considerando el intervalo
-        Y si no ha pasado la fecha/hora
+        Crear varias reservas de la misma cancha y hora en distintas fechas.
+        Valida todas las fechas en una sola pasada (disponibilidad del rango + reservas del usuario)
+        e inserta las válidas en una única transacción. Devuelve las creadas y los conflictos por fecha.
         """
-        ahora = datetime.now()
-        fecha_hora_solicitada = datetime.combine(fecha, hora_solicitada)
-        
-        # ✅ LÓGICA CORREGIDA: Solo bloquear si es fecha pasada o mismo día con hora pasada
-        if fecha < ahora.date():
-            print(f"❌ Fecha bloqueada: {fecha} es una fecha pasada")
-            return False
-            
-        if fecha == ahora.date() and hora_solicitada <= ahora.time():
-            print(f"❌ Horario bloqueado: {hora_solicitada} ya pasó hoy")
-            return False
+        try:
+            usuario, error, status = obtener_usuario_desde_token()
+            if error:
+                raise PermissionError("Usuario no autenticado")
+
+            if not all(key in data for key in ['cancha_id', 'hora']):
+                raise ValueError("Datos incompletos: se requieren cancha_id y hora")
+
+            cancha_id = data['cancha_id']
+            try:
+                hora_solicitada = datetime.strptime(data['hora'], '%H:%M').time().replace(second=0)
+            except (TypeError, ValueError):
+                raise ValueError("Formato de hora inválido (debe ser HH:MM)")
+            fechas = ReservaService._fechas_recurrentes(data)
+
+            cancha = Cancha.query.get(cancha_id)
+            if not cancha:
+                raise ValueError("Cancha no encontrada")
+
+            print(f"🔁 Reserva recurrente de {usuario.email}: cancha {cancha_id}, {hora_solicitada}, {len(fechas)} fechas")
+
+            # Una sola pasada: horarios libres de las fechas pedidas y días en que el usuario ya reservó
+            libres = DisponibilidadService.calcular_fechas([cancha_id], fechas)[cancha_id]
+            hora_str = hora_solicitada.strftime('%H:%M')
+            dias_con_reserva = {
+                fecha for (fecha,) in db.session.query(Reserva.fecha).filter(
+                    Reserva.user_id == usuario.id,
+                    Reserva.fecha.in_(fechas),
+                    Reserva.estado == 'confirmada'
+                ).all()
+            }
+
+            conflictos = []
+            validas = []
+            for fecha in fechas:
+                if fecha in dias_con_reserva:
+                    conflictos.append({'fecha': fecha.isoformat(), 'motivo': 'Ya tienes una reserva confirmada para este día'})
+                elif not any(slot['hora'] == hora_str for slot in libres.get(fecha, [])):
+                    conflictos.append({'fecha': fecha.isoformat(), 'motivo': f'El horario {hora_str} no está disponible'})
+                else:
+                    validas.append(fecha)
 
-        hora_solicitada_dt = datetime.combine(datetime.today(), hora_solicitada)
-        inicio_dt = datetime.combine(datetime.today(), hora_inicio)
-        fin_dt = datetime.combine(datetime.today(), hora_fin)
+            # Una transacción con un savepoint por fila: si otra petición gana un horario
+            # entre la validación y el insert, solo esa fecha pasa a conflicto
+            creadas = []
+            for fecha in validas:
+                reserva = Reserva(
+                    cancha_id=cancha_id,
+                    user_id=usuario.id,
+                    fecha=fecha,
+                    hora=hora_solicitada,
+                    estado='confirmada',
+                    slot_activo=True
+                )
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(reserva)
+                    creadas.append(reserva)
+                except IntegrityError:
+                    conflictos.append({'fecha': fecha.isoformat(), 'motivo': 'Ya existe una reserva confirmada en ese horario'})
+
+            db.session.commit()
 
-        # Validar rango principal
-        if not (inicio_dt <= hora_solicitada_dt < fin_dt):
-            print(f"❌ Horario {hora_solicitada} fuera del rango {hora_inicio}-{hora_fin}")
+            print(f"✅ Reserva recurrente: {len(creadas)} creadas, {len(conflictos)} conflictos")
+            return {
+                'reservas': [
+                    {
+                        'id': reserva.id,
+                        'cancha_id': reserva.cancha_id,
+                        'fecha': reserva.fecha.isoformat(),
+                        'hora': reserva.hora.strftime('%H:%M'),
+                        'estado': reserva.estado
+                    }
+                    for reserva in creadas
+                ],
+                'conflictos': sorted(conflictos, key=lambda c: c['fecha'])
+            }
+
+        except PermissionError as e:
+            db.session.rollback()
+            raise e
+        except ValueError as e:
+            db.session.rollback()
+            raise e
+        except Exception as e:
+            db.session.rollback()
+            print(f"💥 Error al crear reservas recurrentes: {str(e)}")
+            raise Exception("Error interno al crear las reservas recurrentes")
+
+    @staticmethod
+    def _verificar_disponibilidad_horario(cancha_id, hora_solicitada, fecha):
+        """
+        Verificar si un horario está disponible según el horario compilado de la cancha
+        (el día aplicable se deriva de la fecha: los festivos no laborables usan el horario del domingo)
+        """
+        ahora = datetime.now()
+        if fecha < ahora.date() or (fecha == ahora.date() and hora_solicitada <= ahora.time()):
+            print(f"❌ Horario bloqueado: {fecha} {hora_solicitada} ya pasó")
             return False
 
-        # Validar intervalos
-        tiempo_desde_inicio = hora_solicitada_dt - inicio_dt
-        minutos_desde_inicio = tiempo_desde_inicio.total_seconds() / 60
-        
-        es_valido_intervalo = minutos_desde_inicio % intervalo_minutos == 0
-        if not es_valido_intervalo:
-            print(f"❌ Horario {hora_solicitada} no coincide con intervalo de {intervalo_minutos}min")
-        
-        return es_valido_intervalo
+        return HorarioCompiladoService.admite(cancha_id, fecha, hora_solicitada)
 
     @staticmethod
     def obtener_horarios_disponibles(cancha_id, fecha):
@@ -179,67 +297,13 @@ class ReservaService:
         """
         try:
             fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-            dia_semana = ReservaService._obtener_dia_semana(fecha_obj)
-            
-            print(f"🔍 Buscando horarios para cancha {cancha_id}, fecha {fecha}, día {dia_semana}")
-            
-            # Obtener rangos de horarios configurados
-            horarios_rango = HorarioCancha.query.filter_by(
-                cancha_id=cancha_id,
-                dia_semana=dia_semana,
-                disponible=True
-            ).all()
-            
-            if not horarios_rango:
-                print(f"❌ No hay horarios configurados para {dia_semana}")
-                return []
-            
-            horarios_disponibles = []
-            ahora = datetime.now()
-            
-            for horario in horarios_rango:
-                print(f"📅 Procesando rango: {horario.hora_inicio} - {horario.hora_fin}, intervalo: {horario.intervalo_minutos}min")
-                
-                # Generar horarios dentro del rango según el intervalo
-                hora_actual = horario.hora_inicio
-                while hora_actual < horario.hora_fin:
-                    fecha_hora_completa = datetime.combine(fecha_obj, hora_actual)
-                    
-                    # ✅ LÓGICA CORREGIDA: Solo excluir si es fecha pasada o mismo día con hora pasada
-                    es_valido = True
-                    
-                    if fecha_obj < ahora.date():
-                        es_valido = False
-                        print(f"❌ Excluyendo {hora_actual}: fecha pasada")
-                    elif fecha_obj == ahora.date() and hora_actual <= ahora.time():
-                        es_valido = False
-                        print(f"❌ Excluyendo {hora_actual}: hora pasada hoy")
-                    
-                    if es_valido:
-                        # Verificar si no hay reserva en este horario
-                        reserva_existente = Reserva.query.filter_by(
-                            cancha_id=cancha_id,
-                            fecha=fecha_obj,
-                            hora=hora_actual,
-                            estado='confirmada'
-                        ).first()
-                        
-                        if not reserva_existente:
-                            horarios_disponibles.append({
-                                'hora': hora_actual.strftime('%H:%M'),
-                                'disponible': True,
-                                'intervalo': horario.intervalo_minutos
-                            })
-                            print(f"✅ Hora disponible: {hora_actual}")
-                        else:
-                            print(f"⏰ Hora {hora_actual} ya reservada")
-                    
-                    # Siguiente intervalo
-                    hora_actual = (datetime.combine(date.today(), hora_actual) + 
-                                 timedelta(minutes=horario.intervalo_minutos)).time()
+            print(f"🔍 Buscando horarios para cancha {cancha_id}, fecha {fecha}")
             
-            # Ordenar horarios
-            horarios_disponibles.sort(key=lambda x: x['hora'])
+            # Motor de disponibilidad: horarios compilados, festivos en memoria y una consulta de reservas
+            horarios_disponibles = [
+                {'hora': slot['hora'], 'disponible': True, 'intervalo': slot['intervalo']}
+                for slot in DisponibilidadService.horarios_libres(cancha_id, fecha_obj)
+            ]
             
             print(f"✅ Horarios disponibles encontrados: {len(horarios_disponibles)}")
             return horarios_disponibles
@@ -250,32 +314,151 @@ class ReservaService:
             print(f"🔍 Traceback: {traceback.format_exc()}")
             return []
 
+    # Límites de la consulta de disponibilidad por rango
+    MAX_DIAS_RANGO = 31
+    MAX_CANCHAS_RANGO = 20
+
     @staticmethod
-    def actualizar_estado_reserva(reserva):
+    def obtener_disponibilidad_rango(cancha_ids, fecha_inicio, fecha_fin):
         """
-        Validar si la reserva ya pasó y cambiar estado a 'finalizado'
+        Obtener la matriz de disponibilidad de varias canchas en un intervalo de fechas
+        con un número fijo de consultas (horarios y festivos salen de caché)
         """
+        if not cancha_ids:
+            raise ValueError("Debe enviar al menos una cancha")
+        if len(cancha_ids) > ReservaService.MAX_CANCHAS_RANGO:
+            raise ValueError(f"Máximo {ReservaService.MAX_CANCHAS_RANGO} canchas por consulta")
+
         try:
-            ahora = datetime.now()
-            fecha_hora_reserva = datetime.combine(reserva.fecha, reserva.hora)
-            
-            # Si la fecha/hora de reserva es anterior a ahora, cambiar a finalizado
-            if fecha_hora_reserva < ahora and reserva.estado == 'confirmada':
-                reserva.estado = 'finalizado'
-                print(f"✅ Reserva {reserva.id} actualizada a 'finalizado' (fecha: {reserva.fecha} {reserva.hora})")
-                return True
-                
-            return False
-            
-        except Exception as e:
-            print(f"💥 Error al actualizar estado de reserva {reserva.id}: {str(e)}")
-            return False
+            desde = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+            hasta = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError("Formato de fecha inválido (debe ser YYYY-MM-DD)")
+
+        if hasta < desde:
+            raise ValueError("La fecha final debe ser mayor o igual a la inicial")
+        if (hasta - desde).days + 1 > ReservaService.MAX_DIAS_RANGO:
+            raise ValueError(f"El rango no puede superar {ReservaService.MAX_DIAS_RANGO} días")
+
+        print(f"🔍 Disponibilidad de canchas {cancha_ids} entre {desde} y {hasta}")
+
+        matriz = DisponibilidadService.calcular(cancha_ids, desde, hasta)
+
+        return {
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'canchas': {
+                str(cancha_id): {
+                    fecha.isoformat(): slots for fecha, slots in por_fecha.items()
+                }
+                for cancha_id, por_fecha in matriz.items()
+            }
+        }
+
+    # Filtros de "mis reservas" paginado
+    FILTROS_RESERVAS = ('todas', 'proximas', 'pasadas')
+    MAX_POR_PAGINA_RESERVAS = 50
+
+    @staticmethod
+    def listar_reservas_usuario(user_id: int, filtro: str = 'todas', cursor: str = None, por_pagina: int = 20) -> dict:
+        """
+        Reservas de un usuario paginadas por cursor sobre (fecha, hora, id).
+        Una sola consulta con JOIN a las columnas de cancha necesarias (sin lazy load por fila).
+        'proximas' va de la más cercana a la más lejana; 'pasadas' y 'todas', de la más reciente hacia atrás.
+        """
+        if filtro not in ReservaService.FILTROS_RESERVAS:
+            raise ValueError(f"Filtro inválido: use {', '.join(ReservaService.FILTROS_RESERVAS)}")
+        por_pagina = max(1, min(por_pagina, ReservaService.MAX_POR_PAGINA_RESERVAS))
+
+        ahora = datetime.now()
+        query = db.session.query(
+            Reserva.id, Reserva.cancha_id, Reserva.fecha, Reserva.hora, Reserva.estado, Reserva.created_at,
+            Cancha.nombre.label('cancha_nombre'),
+            Cancha.tipo.label('cancha_tipo'),
+            Cancha.direccion.label('cancha_direccion'),
+            Cancha.precio_hora.label('cancha_precio_hora')
+        ).join(Cancha, Cancha.id == Reserva.cancha_id).filter(Reserva.user_id == user_id)
+
+        futura = db.or_(
+            Reserva.fecha > ahora.date(),
+            db.and_(Reserva.fecha == ahora.date(), Reserva.hora >= ahora.time())
+        )
+        ascendente = filtro == 'proximas'
+        if filtro == 'proximas':
+            query = query.filter(futura)
+        elif filtro == 'pasadas':
+            query = query.filter(db.not_(futura))
+
+        if cursor:
+            fecha_hora_cursor, id_cursor = decodificar_cursor(cursor)
+            if fecha_hora_cursor is None:
+                # Los cursores de reservas siempre llevan fecha y hora
+                raise ValueError("Cursor de paginación inválido")
+            fecha_c, hora_c = fecha_hora_cursor.date(), fecha_hora_cursor.time()
+            if ascendente:
+                query = query.filter(db.or_(
+                    Reserva.fecha > fecha_c,
+                    db.and_(Reserva.fecha == fecha_c, Reserva.hora > hora_c),
+                    db.and_(Reserva.fecha == fecha_c, Reserva.hora == hora_c, Reserva.id > id_cursor)
+                ))
+            else:
+                query = query.filter(db.or_(
+                    Reserva.fecha < fecha_c,
+                    db.and_(Reserva.fecha == fecha_c, Reserva.hora < hora_c),
+                    db.and_(Reserva.fecha == fecha_c, Reserva.hora == hora_c, Reserva.id < id_cursor)
+                ))
+
+        orden = (Reserva.fecha, Reserva.hora, Reserva.id)
+        filas = query.order_by(*[c.asc() if ascendente else c.desc() for c in orden]).limit(por_pagina + 1).all()
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+
+        next_cursor = None
+        if hay_mas:
+            ultima = filas[-1]
+            next_cursor = codificar_cursor(datetime.combine(ultima.fecha, ultima.hora), ultima.id)
+
+        data = [
+            {
+                'id': fila.id,
+                'cancha_id': fila.cancha_id,
+                'fecha': fila.fecha.isoformat(),
+                'hora': fila.hora.strftime('%H:%M'),
+                'estado': estado_visible(fila, ahora),
+                'created_at': fila.created_at.isoformat() if fila.created_at else None,
+                'cancha': {
+                    'id': fila.cancha_id,
+                    'nombre': fila.cancha_nombre,
+                    'tipo': fila.cancha_tipo,
+                    'direccion': fila.cancha_direccion,
+                    'precio_hora': float(fila.cancha_precio_hora) if fila.cancha_precio_hora else None
+                }
+            }
+            for fila in filas
+        ]
+
+        return {
+            'data': data,
+            'count': len(data),
+            'filtro': filtro,
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def obtener_mis_reservas_cursor(filtro: str = 'todas', cursor: str = None, por_pagina: int = 20) -> dict:
+        """"Mis reservas" del usuario autenticado, paginado y con filtro próximas/pasadas"""
+        usuario, error, status = obtener_usuario_desde_token()
+        if error:
+            raise PermissionError("Usuario no autenticado")
+
+        print(f"🔍 Mis reservas de {usuario.email}: filtro {filtro}, cursor {cursor}")
+        return ReservaService.listar_reservas_usuario(usuario.id, filtro, cursor, por_pagina)
 
     @staticmethod
     def obtener_todas_las_reservas_usuario():
         """
         Obtener TODAS las reservas del usuario autenticado sin filtros
-        CON VALIDACIÓN AUTOMÁTICA DE ESTADO
+        (las confirmadas que ya pasaron se muestran como 'finalizado')
         """
         try:
             print(f"🔍 Obteniendo TODAS las reservas del usuario")
@@ -297,16 +480,8 @@ class ReservaService:
             
             print(f"📊 Total de reservas encontradas: {len(reservas)}")
             
-            # Validar y actualizar estados de cada reserva
-            reservas_actualizadas = 0
-            for reserva in reservas:
-                if ReservaService.actualizar_estado_reserva(reserva):
-                    reservas_actualizadas += 1
-            
-            # Guardar cambios si hubo actualizaciones
-            if reservas_actualizadas > 0:
-                db.session.commit()
-                print(f"📈 {reservas_actualizadas} reservas actualizadas a 'finalizado'")
+            # Lectura pura: el estado 'finalizado' lo persiste FinalizadorReservasService
+            ahora = datetime.now()
             
             # Preparar respuesta con información completa
             reservas_formateadas = []
@@ -316,7 +491,7 @@ class ReservaService:
                     'cancha_id': reserva.cancha_id,
                     'fecha': reserva.fecha.isoformat(),
                     'hora': reserva.hora.strftime('%H:%M'),
-                    'estado': reserva.estado,
+                    'estado': estado_visible(reserva, ahora),
                     'created_at': reserva.created_at.isoformat() if reserva.created_at else None
                 }
                 
@@ -337,7 +512,7 @@ class ReservaService:
                     }
                 
                 reservas_formateadas.append(reserva_info)
-                print(f"📅 Reserva {reserva.id}: {reserva.fecha} {reserva.hora.strftime('%H:%M')} - Estado: {reserva.estado}")
+                print(f"📅 Reserva {reserva.id}: {reserva.fecha} {reserva.hora.strftime('%H:%M')} - Estado: {reserva_info['estado']}")
             
             print(f"✅ Retornando {len(reservas_formateadas)} reservas para el usuario {usuario.email}")
             return reservas_formateadas
@@ -390,6 +565,7 @@ class ReservaService:
             
             # Cambiar estado a cancelada
             reserva.estado = 'cancelada'
+            reserva.slot_activo = None  # Libera el horario en el índice único
             db.session.commit()
             
             print(f"✅ Reserva {reserva_id} cancelada exitosamente por usuario {usuario.email}")
@@ -1,8 +1,9 @@
 import os
-from app.models.friendship_model import Friendship
-from app.models.user_model import User
+from app.models.social.friendship_model import Friendship
+from app.models.users.user_model import User
 from app.utils.database import db
 from app.utils.auth_utils import obtener_usuario_desde_token
+from app.services.posts.timeline_service import TimelineService
 from datetime import datetime
 
 class FriendshipService:
@@ -255,6 +256,8 @@ class FriendshipService:
             if accion == 'accept':
                 # Aceptar la solicitud
                 solicitud.status = 'accepted'
+                # Cada uno ve en su timeline los posts recientes del nuevo amigo
+                TimelineService.conectar_amigos(solicitud.sender_id, solicitud.receiver_id)
                 mensaje = f"¡Solicitud aceptada! Ahora eres amigo de {remitente.name_user}"
                 print(f"✅ Solicitud aceptada: {usuario_actual.name_user} aceptó a {remitente.name_user}")
                 
@@ -438,6 +441,8 @@ class FriendshipService:
             # 6. Eliminar la relación de amistad
             print(f"🗑️ [FRIENDSHIP SERVICE] Eliminando relación de amistad ID: {amistad.id}...")
             db.session.delete(amistad)
+            # Sacar de cada timeline los posts del que deja de ser amigo
+            TimelineService.desconectar_amigos(amistad.sender_id, amistad.receiver_id)
             db.session.commit()
             
             print(f"✅ [FRIENDSHIP SERVICE] Amistad eliminada exitosamente")
@@ -1,7 +1,7 @@
-from app.models.user_model import User
+from app.models.users.user_model import User
 from app.utils.database import db
 import re
-import bcrypt
+from app.services.auth.password_service import PasswordService
 
 class AccountService:
     @staticmethod
@@ -55,18 +55,7 @@ class AccountService:
                 # Verificar con bcrypt
                 print("🔐 Intentando verificación con bcrypt...")
                 try:
-                    input_pw = current_password.encode('utf-8')
-                    stored_pw = user.password.encode('utf-8')
-                    
-                    print(f"   - Contraseña a verificar: {current_password[:2]}...")
-                    print(f"   - Hash almacenado (inicio): {stored_pw[:20]}...")
-                    
-                    if not bcrypt.checkpw(input_pw, stored_pw):
-                        print("❌ ERROR: Contraseña actual incorrecta")
-                        raise ValueError("Contraseña actual incorrecta")
-                    
-                    print("✅ Contraseña actual verificada correctamente con bcrypt")
-                    
+                    valida = PasswordService.verificar(current_password, user.password)
                 except Exception as bcrypt_error:
                     print(f"❌ Error en bcrypt: {str(bcrypt_error)}")
                     print("🔄 Intentando verificación alternativa...")
@@ -78,6 +67,12 @@ class AccountService:
                     else:
                         print("❌ Hash con formato desconocido")
                         raise ValueError("Error en la configuración de la cuenta")
+
+                if not valida:
+                    print("❌ ERROR: Contraseña actual incorrecta")
+                    raise ValueError("Contraseña actual incorrecta")
+
+                print("✅ Contraseña actual verificada correctamente con bcrypt")
             
             # Validar que las nuevas contraseñas coincidan
             print("🔍 Verificando coincidencia de nuevas contraseñas...")
@@ -99,9 +94,7 @@ class AccountService:
             print("💾 Actualizando contraseña en base de datos con bcrypt...")
             
             # Generar nuevo hash con bcrypt
-            new_password_encoded = new_password.encode('utf-8')
-            new_hash = bcrypt.hashpw(new_password_encoded, bcrypt.gensalt())
-            user.password = new_hash.decode('utf-8')
+            user.password = PasswordService.hashear(new_password)
             
             db.session.commit()
             
@@ -163,11 +156,8 @@ class AccountService:
             
             # Verificar contraseña
             print("🔐 Verificando contraseña...")
-            input_pw = data['password'].encode('utf-8')
-            stored_pw = user.password.encode('utf-8')
-
             # ✅ CORREGIDO: Usar ValueError en lugar de make_response
-            if not bcrypt.checkpw(input_pw, stored_pw):
+            if not PasswordService.verificar(data['password'], user.password):
                 print("❌ ERROR: Contraseña incorrecta")
                 raise ValueError("La contraseña es incorrecta")
             
@@ -1,5 +1,5 @@
 import os
-from app.models.user_model import User
+from app.models.users.user_model import User
 from app.utils.database import db
 from datetime import datetime
 
@@ -21,4 +21,22 @@ def create_app():
     from app.controllers.auth_controller import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     
-    return app
\ No newline at end of file
+    return app
+
+
+def iniciar_tareas_en_segundo_plano(app):
+    """
+    Hilos daemon de mantenimiento: solo los procesos web (app.main) o un worker explícito,
+    no los scripts de un solo uso que también llaman a create_app()
+    """
+    # Cerrar conversiones de imagen que quedaron a medias (al arrancar y periódicamente)
+    from app.services.imagenes.imagen_service import ImagenService
+    ImagenService.iniciar_barrido_en_segundo_plano(app)
+
+    # Emisor del outbox de correos (uno por proceso; SKIP LOCKED reparte las filas entre workers)
+    from app.services.email.outbox_service import OutboxService
+    OutboxService.iniciar_en_segundo_plano(app)
+
+    # Pasar a 'finalizado' las reservas confirmadas que ya pasaron
+    from app.services.reservas.finalizador_service import FinalizadorReservasService
+    FinalizadorReservasService.iniciar_en_segundo_plano(app)
@@ -1,41 +1,33 @@
 # app/utils/auth_utils.py
-import jwt
 from flask import request
-from app.models.user_model import User
+from app.models.users.user_model import User
 from app.utils.config import Config
+from app.core.principal import VerificadorTokens, TokenExpirado, TokenInvalido, UsuarioNoEncontrado
 
 def obtener_usuario_desde_token():
-    print("🔐 Intentando obtener usuario desde token...")
+    """
+    Usuario autenticado de la cookie liga_token como Principal (id, email, role, ...).
+    Los tokens ya verificados salen de la caché y los claims evitan consultar users.
+    """
     token = request.cookies.get("liga_token")
-    print(f"🍪 Token encontrado en cookies: {token}")
-    print(f"📋 Todas las cookies: {request.cookies}")
     
     if not token:
         print("❌ No se encontró token en las cookies")
         return None, {"error": "Usuario no autenticado"}, 401
 
     try:
-        print("🔓 Decodificando token...")
-        data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
-        print(f"📊 Token decodificado: {data}")
-        
-        user_id = data.get("id")
-        print(f"👤 User ID desde token: {user_id}")
-        
-        usuario = User.query.get(user_id)
-        if not usuario:
-            print("❌ Usuario no encontrado en BD")
-            return None, {"error": "Usuario no válido"}, 403
-        
-        print(f"✅ Usuario válido: {usuario.email}, Role: {usuario.role}")
+        usuario = VerificadorTokens.verificar(token, User.query.get, Config.SECRET_KEY)
         return usuario, None, 200
         
-    except jwt.ExpiredSignatureError:
+    except UsuarioNoEncontrado:
+        print("❌ Usuario no encontrado en BD")
+        return None, {"error": "Usuario no válido"}, 403
+    except TokenExpirado:
         print("❌ Token expirado")
         return None, {"error": "Token expirado"}, 401
-    except jwt.InvalidTokenError as e:
+    except TokenInvalido as e:
         print(f"❌ Token inválido: {str(e)}")
         return None, {"error": "Token inválido"}, 401
     except Exception as e:
         print(f"❌ Error inesperado: {str(e)}")
-        return None, {"error": "Error interno"}, 500
\ No newline at end of file
+        return None, {"error": "Error interno"}, 500
@@ -0,0 +1,243 @@
+# app/utils/cache_utils.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+class CacheLRU:
+    """
+    Caché en memoria del proceso con expulsión LRU y expiración por TTL.
+    Las claves son strings para poder invalidar por prefijo ('12:' -> todo lo de la cancha 12).
+    """
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: float = 300):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str):
+        """Valor guardado o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor, ttl_segundos: float = None):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + (ttl_segundos or self.ttl_segundos), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def eliminar(self, clave: str):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def eliminar_prefijo(self, prefijo: str):
+        with self._lock:
+            for clave in [c for c in self._datos if c.startswith(prefijo)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+class ConexionesSQLite:
+    """
+    Una conexión SQLite por hilo, reutilizada entre operaciones.
+    Se vuelve a abrir en el proceso hijo tras un fork (las conexiones no se comparten entre procesos).
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+
+    def obtener(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or self._local.pid != os.getpid():
+            conexion = sqlite3.connect(self.ruta, timeout=5)
+            self._local.conexion, self._local.pid = conexion, os.getpid()
+        return conexion
+
+
+class CacheSQLite:
+    """
+    Caché compartida entre workers de la misma máquina sobre un archivo SQLite.
+    Misma interfaz que CacheLRU; los valores se guardan como JSON.
+    """
+
+    def __init__(self, ruta: str, tabla: str, ttl_segundos: float = 300):
+        self.ruta = ruta
+        self.tabla = tabla
+        self.ttl_segundos = ttl_segundos
+        self._conexiones = ConexionesSQLite(ruta)
+        with self._conectar() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.tabla} '
+                '(clave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira REAL NOT NULL)'
+            )
+
+    def _conectar(self):
+        # 'with' sobre la conexión confirma o deshace la operación sin cerrarla
+        return self._conexiones.obtener()
+
+    def obtener(self, clave: str):
+        with self._conectar() as conexion:
+            fila = conexion.execute(
+                f'SELECT valor, expira FROM {self.tabla} WHERE clave = ?', (clave,)
+            ).fetchone()
+        if fila is None or fila[1] < time.time():
+            return None
+        return json.loads(fila[0])
+
+    def guardar(self, clave: str, valor, ttl_segundos: float = None):
+        with self._conectar() as conexion:
+            conexion.execute(
+                f'INSERT OR REPLACE INTO {self.tabla} (clave, valor, expira) VALUES (?, ?, ?)',
+                (clave, json.dumps(valor), time.time() + (ttl_segundos or self.ttl_segundos))
+            )
+
+    def eliminar(self, clave: str):
+        with self._conectar() as conexion:
+            conexion.execute(f'DELETE FROM {self.tabla} WHERE clave = ?', (clave,))
+
+    def eliminar_prefijo(self, prefijo: str):
+        with self._conectar() as conexion:
+            conexion.execute(f'DELETE FROM {self.tabla} WHERE substr(clave, 1, ?) = ?', (len(prefijo), prefijo))
+
+    def limpiar(self):
+        with self._conectar() as conexion:
+            conexion.execute(f'DELETE FROM {self.tabla}')
+
+
+class GeneracionesMemoria:
+    """
+    Contadores de versión por clave en memoria del proceso (un solo worker).
+    Quien cachea algo derivado de la BD guarda la generación leída antes de consultar;
+    al cambiar los datos se incrementa y las copias con la generación anterior dejan de valer.
+    """
+
+    def __init__(self):
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> int:
+        return self._valores.get(clave, 0)
+
+    def obtener_varias(self, claves) -> dict:
+        return {clave: self._valores.get(clave, 0) for clave in claves}
+
+    def incrementar(self, clave: str):
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + 1
+
+
+class GeneracionesSQLite:
+    """
+    Contadores de versión compartidos por todos los workers de la máquina (archivo SQLite).
+    Misma interfaz que GeneracionesMemoria.
+    """
+
+    def __init__(self, ruta: str, tabla: str = 'generaciones'):
+        self.ruta = ruta
+        self.tabla = tabla
+        self._conexiones = ConexionesSQLite(ruta)
+        with self._conexiones.obtener() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.tabla} (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL)'
+            )
+
+    def obtener(self, clave: str) -> int:
+        return self.obtener_varias([clave])[clave]
+
+    def obtener_varias(self, claves) -> dict:
+        valores = dict.fromkeys(claves, 0)
+        pendientes = list(valores)
+        with self._conexiones.obtener() as conexion:
+            # Trozos de 500: por debajo del límite de parámetros de SQLite
+            for inicio in range(0, len(pendientes), 500):
+                trozo = pendientes[inicio:inicio + 500]
+                filas = conexion.execute(
+                    f'SELECT clave, valor FROM {self.tabla} WHERE clave IN ({", ".join("?" * len(trozo))})', trozo
+                ).fetchall()
+                valores.update(filas)
+        return valores
+
+    def incrementar(self, clave: str):
+        with self._conexiones.obtener() as conexion:
+            conexion.execute(
+                f'INSERT INTO {self.tabla} (clave, valor) VALUES (?, 1) '
+                'ON CONFLICT(clave) DO UPDATE SET valor = valor + 1',
+                (clave,)
+            )
+
+
+class MarcasTiempoMemoria:
+    """
+    Último instante (epoch) marcado por clave, en memoria del proceso (un solo worker).
+    Las marcas más antiguas que la retención se descartan al marcar: ya no afectan a nada.
+    """
+
+    def __init__(self, retencion_segundos: float):
+        self.retencion_segundos = retencion_segundos
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> float:
+        return self._valores.get(clave, 0)
+
+    def marcar(self, clave: str, instante: float = None):
+        instante = instante or time.time()
+        with self._lock:
+            self._valores[clave] = max(instante, self._valores.get(clave, 0))
+            limite = time.time() - self.retencion_segundos
+            for vieja in [c for c, valor in self._valores.items() if valor < limite]:
+                del self._valores[vieja]
+
+
+class MarcasTiempoSQLite:
+    """
+    Marcas de tiempo compartidas por todos los workers de la máquina (archivo SQLite).
+    Misma interfaz que MarcasTiempoMemoria.
+    """
+
+    def __init__(self, ruta: str, tabla: str, retencion_segundos: float):
+        self.ruta = ruta
+        self.tabla = tabla
+        self.retencion_segundos = retencion_segundos
+        self._conexiones = ConexionesSQLite(ruta)
+        with self._conexiones.obtener() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.tabla} (clave TEXT PRIMARY KEY, instante REAL NOT NULL)'
+            )
+            conexion.execute(f'CREATE INDEX IF NOT EXISTS ix_{self.tabla}_instante ON {self.tabla} (instante)')
+
+    def obtener(self, clave: str) -> float:
+        with self._conexiones.obtener() as conexion:
+            fila = conexion.execute(f'SELECT instante FROM {self.tabla} WHERE clave = ?', (clave,)).fetchone()
+        return fila[0] if fila else 0
+
+    def marcar(self, clave: str, instante: float = None):
+        instante = instante or time.time()
+        with self._conexiones.obtener() as conexion:
+            conexion.execute(
+                f'INSERT INTO {self.tabla} (clave, instante) VALUES (?, ?) '
+                'ON CONFLICT(clave) DO UPDATE SET instante = max(instante, excluded.instante)',
+                (clave, instante)
+            )
+            conexion.execute(
+                f'DELETE FROM {self.tabla} WHERE instante < ?', (time.time() - self.retencion_segundos,)
+            )
@@ -0,0 +1,6 @@
+# app/utils/config.py
+from app.core.config import settings
+
+class Config:
+    """Configuración usada por los servicios Flask; los valores salen de app.core.config.settings"""
+    SECRET_KEY = settings.SECRET_KEY
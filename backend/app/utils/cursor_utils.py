@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+
+def codificar_cursor(fecha: datetime, registro_id: int) -> str:
+    """Generar un cursor opaco a partir de la clave (created_at, id) del último elemento"""
+    payload = json.dumps({'c': fecha.isoformat() if fecha else None, 'id': registro_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor: str) -> tuple:
+    """
+    Decodificar un cursor opaco a (created_at, id).
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+        fecha = datetime.fromisoformat(payload['c']) if payload.get('c') else None
+        return fecha, int(payload['id'])
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
@@ -0,0 +1,7 @@
+# app/utils/database.py
+from flask_sqlalchemy import SQLAlchemy
+from app.db.session import Base
+
+# Los modelos db.Model (servicios Flask) y Base (rutas FastAPI) comparten registro y metadatos:
+# las relaciones entre ambos se resuelven y db.create_all() crea todas las tablas
+db = SQLAlchemy(model_class=Base)
@@ -0,0 +1,88 @@
+# app/utils/geo_utils.py
+import math
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_RADIO_TIERRA_KM = 6371.0088
+
+def codificar_geohash(latitud: float, longitud: float, precision: int = 9) -> str:
+    """Codificar una coordenada a geohash (prefijos comunes = celdas cercanas)"""
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+    resultado = []
+    bits, valor, par = 0, 0, True
+    while len(resultado) < precision:
+        if par:
+            medio = (lon_min + lon_max) / 2
+            if longitud >= medio:
+                valor = (valor << 1) | 1
+                lon_min = medio
+            else:
+                valor <<= 1
+                lon_max = medio
+        else:
+            medio = (lat_min + lat_max) / 2
+            if latitud >= medio:
+                valor = (valor << 1) | 1
+                lat_min = medio
+            else:
+                valor <<= 1
+                lat_max = medio
+        par = not par
+        bits += 1
+        if bits == 5:
+            resultado.append(_BASE32[valor])
+            bits, valor = 0, 0
+    return ''.join(resultado)
+
+def limites_geohash(geohash: str) -> tuple:
+    """(lat_min, lat_max, lon_min, lon_max) de la celda"""
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+    par = True
+    for caracter in geohash:
+        valor = _BASE32.index(caracter)
+        for desplazamiento in range(4, -1, -1):
+            bit = (valor >> desplazamiento) & 1
+            if par:
+                medio = (lon_min + lon_max) / 2
+                lon_min, lon_max = (medio, lon_max) if bit else (lon_min, medio)
+            else:
+                medio = (lat_min + lat_max) / 2
+                lat_min, lat_max = (medio, lat_max) if bit else (lat_min, medio)
+            par = not par
+    return lat_min, lat_max, lon_min, lon_max
+
+def celdas_vecinas(latitud: float, longitud: float, precision: int) -> tuple:
+    """
+    Celda que contiene el punto y sus 8 vecinas, junto con el radio (km) que cubren con seguridad:
+    todo punto a menos de ese radio cae en alguna de las 9 celdas.
+    """
+    centro = codificar_geohash(latitud, longitud, precision)
+    lat_min, lat_max, lon_min, lon_max = limites_geohash(centro)
+    alto, ancho = lat_max - lat_min, lon_max - lon_min
+    lat_centro, lon_centro = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+    celdas = set()
+    for d_lat in (-1, 0, 1):
+        lat = lat_centro + d_lat * alto
+        if not -90 <= lat <= 90:
+            continue
+        for d_lon in (-1, 0, 1):
+            lon = (lon_centro + d_lon * ancho + 180) % 360 - 180
+            celdas.add(codificar_geohash(lat, lon, precision))
+
+    # Peor caso dentro de la celda: la latitud más alejada del ecuador
+    lat_extrema = max(abs(lat_min), abs(lat_max))
+    radio_cubierto = min(
+        alto * 110.574,
+        ancho * 111.320 * math.cos(math.radians(min(lat_extrema + alto, 90)))
+    )
+    return sorted(celdas), radio_cubierto
+
+def distancia_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de haversine en kilómetros"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * _RADIO_TIERRA_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,53 @@
+# app/utils/image_serving.py
+import os
+import hashlib
+from functools import lru_cache
+from flask import request, send_file, make_response
+from werkzeug.security import safe_join
+
+# Los archivos llevan un uuid en el nombre y nunca se reescriben: se pueden cachear para siempre
+CACHE_CONTROL_INMUTABLE = 'public, max-age=31536000, immutable'
+
+@lru_cache(maxsize=4096)
+def _etag_de_contenido(ruta: str, mtime_ns: int, tamano: int) -> str:
+    """Hash del contenido; la clave incluye mtime/tamaño para no servir un ETag viejo"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+def servir_imagen(carpeta: str, filename: str):
+    """
+    Servir una imagen del disco con validadores fuertes y caché inmutable.
+    - ETag por hash de contenido (calculado una vez por archivo y memorizado)
+    - If-None-Match -> 304 sin abrir el archivo
+    - Range y envío zero-copy (wsgi.file_wrapper / sendfile) vía send_file
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    ruta = safe_join(carpeta, filename)
+    if ruta is None:
+        raise FileNotFoundError(filename)
+
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        raise FileNotFoundError(filename)
+
+    etag = _etag_de_contenido(ruta, info.st_mtime_ns, info.st_size)
+
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+    else:
+        response = send_file(
+            ruta,
+            mimetype='image/webp' if filename.endswith('.webp') else None,
+            conditional=True,
+            etag=etag,
+            last_modified=info.st_mtime,
+            max_age=31536000
+        )
+
+    response.headers['Cache-Control'] = CACHE_CONTROL_INMUTABLE
+    return response
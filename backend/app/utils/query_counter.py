@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+class ContadorConsultas:
+    """Acumula las sentencias SQL ejecutadas mientras está activo"""
+
+    def __init__(self):
+        self.sentencias = []
+
+    @property
+    def total(self) -> int:
+        return len(self.sentencias)
+
+    def afirmar_maximo(self, maximo: int):
+        """Fallar si se ejecutaron más consultas de las permitidas (útil para detectar N+1)"""
+        if self.total > maximo:
+            detalle = '\n'.join(f"  {i + 1}. {sql}" for i, sql in enumerate(self.sentencias))
+            raise AssertionError(f"Se esperaban como máximo {maximo} consultas y se ejecutaron {self.total}:\n{detalle}")
+
+@contextmanager
+def contar_consultas(engine):
+    """
+    Contar las consultas que un bloque lanza contra el engine.
+
+        with contar_consultas(db.engine) as contador:
+            PostService.obtener_comentarios(post_id)
+        contador.afirmar_maximo(3)
+    """
+    contador = ContadorConsultas()
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        contador.sentencias.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', _registrar)
@@ -0,0 +1,144 @@
+# app/utils/rate_limit.py
+import time
+import sqlite3
+import threading
+from collections import deque
+
+class LimitadorVentana:
+    """
+    Limitador de ventana deslizante en memoria del proceso.
+    Guarda los instantes de los últimos max_eventos eventos por clave;
+    la clave queda bloqueada mientras haya max_eventos dentro de la ventana.
+    """
+
+    def __init__(self, max_eventos: int, ventana_segundos: float):
+        self.max_eventos = max_eventos
+        self.ventana_segundos = ventana_segundos
+        self._eventos = {}
+        self._lock = threading.Lock()
+        self._operaciones = 0
+
+    def _purgar(self, ahora: float):
+        """Quitar claves sin eventos dentro de la ventana para acotar la memoria"""
+        for clave in [c for c, eventos in self._eventos.items() if not eventos or eventos[-1] <= ahora - self.ventana_segundos]:
+            del self._eventos[clave]
+
+    def reintentar_en(self, clave: str) -> float:
+        """Segundos hasta que la clave vuelva a estar permitida (0 si está permitida)"""
+        ahora = time.monotonic()
+        with self._lock:
+            eventos = self._eventos.get(clave)
+            if not eventos or len(eventos) < self.max_eventos:
+                return 0
+            # El más antiguo de los max_eventos últimos marca cuándo se libera un hueco
+            espera = eventos[0] + self.ventana_segundos - ahora
+            return max(0, espera)
+
+    def registrar(self, clave: str):
+        ahora = time.monotonic()
+        with self._lock:
+            self._eventos.setdefault(clave, deque(maxlen=self.max_eventos)).append(ahora)
+            self._operaciones += 1
+            if self._operaciones % 1000 == 0:
+                self._purgar(ahora)
+
+    def reservar(self, clave: str) -> tuple:
+        """
+        Comprobar y registrar en un solo paso: (0, ficha) si el evento cabe y queda anotado,
+        (espera, None) si la clave está bloqueada. Peticiones concurrentes no pasan todas el límite.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            eventos = self._eventos.setdefault(clave, deque(maxlen=self.max_eventos))
+            if len(eventos) >= self.max_eventos and eventos[0] + self.ventana_segundos > ahora:
+                return eventos[0] + self.ventana_segundos - ahora, None
+            eventos.append(ahora)
+            self._operaciones += 1
+            if self._operaciones % 1000 == 0:
+                self._purgar(ahora)
+            return 0, ahora
+
+    def liberar(self, clave: str, ficha):
+        """Devolver un evento reservado que al final no debe contar"""
+        with self._lock:
+            eventos = self._eventos.get(clave)
+            if eventos and ficha in eventos:
+                eventos.remove(ficha)
+
+    def limpiar(self, clave: str):
+        with self._lock:
+            self._eventos.pop(clave, None)
+
+
+class LimitadorVentanaSQLite:
+    """
+    Limitador de ventana deslizante compartido entre workers de la misma máquina (archivo SQLite).
+    Misma interfaz que LimitadorVentana.
+    """
+
+    def __init__(self, ruta: str, tabla: str, max_eventos: int, ventana_segundos: float):
+        self.ruta = ruta
+        self.tabla = tabla
+        self.max_eventos = max_eventos
+        self.ventana_segundos = ventana_segundos
+        self._operaciones = 0
+        with self._conectar() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute(f'CREATE TABLE IF NOT EXISTS {self.tabla} (clave TEXT NOT NULL, instante REAL NOT NULL)')
+            conexion.execute(f'CREATE INDEX IF NOT EXISTS ix_{self.tabla}_clave ON {self.tabla} (clave, instante)')
+
+    def _conectar(self):
+        # Una conexión por operación: segura entre hilos y procesos
+        return sqlite3.connect(self.ruta, timeout=5)
+
+    def reintentar_en(self, clave: str) -> float:
+        ahora = time.time()
+        with self._conectar() as conexion:
+            filas = conexion.execute(
+                f'SELECT instante FROM {self.tabla} WHERE clave = ? AND instante > ? ORDER BY instante DESC LIMIT ?',
+                (clave, ahora - self.ventana_segundos, self.max_eventos)
+            ).fetchall()
+        if len(filas) < self.max_eventos:
+            return 0
+        return max(0, filas[-1][0] + self.ventana_segundos - ahora)
+
+    def registrar(self, clave: str):
+        ahora = time.time()
+        with self._conectar() as conexion:
+            conexion.execute(f'INSERT INTO {self.tabla} (clave, instante) VALUES (?, ?)', (clave, ahora))
+            conexion.execute(
+                f'DELETE FROM {self.tabla} WHERE clave = ? AND instante <= ?', (clave, ahora - self.ventana_segundos)
+            )
+            self._operaciones += 1
+            if self._operaciones % 1000 == 0:
+                # Purga global de claves que ya no reciben eventos
+                conexion.execute(f'DELETE FROM {self.tabla} WHERE instante <= ?', (ahora - self.ventana_segundos,))
+
+    def reservar(self, clave: str) -> tuple:
+        """Como LimitadorVentana.reservar: el INSERT condicionado es una sola sentencia (atómica en SQLite)"""
+        ahora = time.time()
+        with self._conectar() as conexion:
+            cursor = conexion.execute(
+                f'INSERT INTO {self.tabla} (clave, instante) SELECT ?, ? '
+                f'WHERE (SELECT COUNT(*) FROM {self.tabla} WHERE clave = ? AND instante > ?) < ?',
+                (clave, ahora, clave, ahora - self.ventana_segundos, self.max_eventos)
+            )
+            if cursor.rowcount:
+                conexion.execute(
+                    f'DELETE FROM {self.tabla} WHERE clave = ? AND instante <= ?', (clave, ahora - self.ventana_segundos)
+                )
+                return 0, ahora
+        # Bloqueada en el momento del INSERT: al menos un segundo aunque justo ahora caduque un evento
+        return max(self.reintentar_en(clave), 1), None
+
+    def liberar(self, clave: str, ficha):
+        with self._conectar() as conexion:
+            conexion.execute(
+                f'DELETE FROM {self.tabla} WHERE rowid IN '
+                f'(SELECT rowid FROM {self.tabla} WHERE clave = ? AND instante = ? LIMIT 1)',
+                (clave, ficha)
+            )
+
+    def limpiar(self, clave: str):
+        with self._conectar() as conexion:
+            conexion.execute(f'DELETE FROM {self.tabla} WHERE clave = ?', (clave,))
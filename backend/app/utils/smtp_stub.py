@@ -0,0 +1,107 @@
+# app/utils/smtp_stub.py
+import threading
+import socketserver
+from email import message_from_bytes, policy
+
+class _ManejadorSMTP(socketserver.StreamRequestHandler):
+    """Subconjunto mínimo de SMTP: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def _responder(self, linea: str):
+        self.wfile.write(f"{linea}\r\n".encode('utf-8'))
+
+    def handle(self):
+        remitente, destinatarios = None, []
+        self._responder("220 smtp-stub listo")
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea.decode('utf-8', 'replace').strip()
+            verbo = comando[:4].upper()
+
+            if verbo == 'EHLO':
+                self._responder("250-smtp-stub")
+                self._responder("250 8BITMIME")
+            elif verbo == 'HELO':
+                self._responder("250 smtp-stub")
+            elif verbo == 'MAIL':
+                remitente, destinatarios = comando.split(':', 1)[1].strip(' <>'), []
+                self._responder("250 OK")
+            elif verbo == 'RCPT':
+                destinatarios.append(comando.split(':', 1)[1].strip(' <>'))
+                self._responder("250 OK")
+            elif verbo == 'DATA':
+                self._responder("354 Fin con <CRLF>.<CRLF>")
+                lineas = []
+                while True:
+                    linea = self.rfile.readline()
+                    if not linea or linea in (b'.\r\n', b'.\n'):
+                        break
+                    lineas.append(linea[1:] if linea.startswith(b'..') else linea)
+                self.server.registrar(remitente, destinatarios, b''.join(lineas))
+                self._responder("250 OK: mensaje recibido")
+            elif verbo == 'RSET':
+                remitente, destinatarios = None, []
+                self._responder("250 OK")
+            elif verbo == 'NOOP':
+                self._responder("250 OK")
+            elif verbo == 'QUIT':
+                self._responder("221 Adiós")
+                return
+            else:
+                self._responder("502 Comando no implementado")
+
+
+class ServidorSMTPStub(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP local que no entrega nada: guarda los mensajes recibidos en memoria.
+    Para desarrollo y pruebas del outbox de correos (apuntar SMTP_HOST/SMTP_PORT aquí).
+
+        stub = ServidorSMTPStub.iniciar(puerto=0)   # puerto libre
+        ... enviar correos a ('127.0.0.1', stub.puerto) ...
+        stub.mensajes  -> [{'de', 'para', 'asunto', 'mensaje'}]
+        stub.detener()
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', puerto: int = 1025):
+        super().__init__((host, puerto), _ManejadorSMTP)
+        self.mensajes = []
+        self._lock = threading.Lock()
+
+    @property
+    def puerto(self) -> int:
+        return self.server_address[1]
+
+    def registrar(self, remitente, destinatarios, contenido: bytes):
+        mensaje = message_from_bytes(contenido, policy=policy.default)
+        with self._lock:
+            self.mensajes.append({
+                'de': remitente,
+                'para': list(destinatarios),
+                'asunto': mensaje.get('Subject'),
+                'mensaje': mensaje
+            })
+        print(f"📨 [smtp-stub] {remitente} -> {', '.join(destinatarios)}: {mensaje.get('Subject')}")
+
+    @classmethod
+    def iniciar(cls, host: str = '127.0.0.1', puerto: int = 1025) -> 'ServidorSMTPStub':
+        """Arrancar el servidor en un hilo daemon"""
+        servidor = cls(host, puerto)
+        threading.Thread(target=servidor.serve_forever, name='smtp-stub', daemon=True).start()
+        return servidor
+
+    def detener(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    # python -m app.utils.smtp_stub [puerto]
+    import sys
+
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    servidor = ServidorSMTPStub('127.0.0.1', puerto)
+    print(f"📭 smtp-stub escuchando en 127.0.0.1:{servidor.puerto}")
+    servidor.serve_forever()
@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Cachés y generaciones compartidas en un SQLite temporal, no en el directorio de trabajo
+os.environ.setdefault('CACHE_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='sporthub-tests-'), 'cache.db'))
+
+from app.utils.database import db
+
+
+@pytest.fixture
+def aplicacion(tmp_path):
+    """
+    App Flask mínima sobre una BD de pruebas con todas las tablas creadas.
+    Por defecto un SQLite temporal; TEST_DATABASE_URL permite probar contra MySQL.
+    """
+    url = os.getenv('TEST_DATABASE_URL', f"sqlite:///{tmp_path / 'sporthub_test.db'}")
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=url,
+        SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 30}} if url.startswith('sqlite') else {}
+    )
+    db.init_app(flask_app)
+
+    with flask_app.app_context():
+        # Registrar todos los modelos en los metadatos antes de crear las tablas
+        import app.models.users.user_model  # noqa: F401
+        import app.models.posts.post_model  # noqa: F401
+        import app.models.social.friendship_model  # noqa: F401
+        import app.models.posts.timeline_model  # noqa: F401
+        import app.models.canchas.cancha  # noqa: F401
+        import app.models.canchas.imagen  # noqa: F401
+        import app.models.canchas.regla_cancha  # noqa: F401
+        import app.models.canchas.amenidad_cancha  # noqa: F401
+        import app.models.canchas.horario_cancha  # noqa: F401
+        import app.models.canchas.dia_festivo  # noqa: F401
+        import app.models.reservas.reserva  # noqa: F401
+        import app.models.email.correo_saliente_model  # noqa: F401
+
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def crear_usuario(aplicacion):
+    """Fábrica de usuarios: crear_usuario('ana') -> User guardado"""
+    from app.models.users.user_model import User
+
+    def _crear(nombre: str) -> 'User':
+        usuario = User(
+            email=f"{nombre}@sporthub.test",
+            password='x',
+            role='user',
+            name_user=nombre,
+            slug=nombre
+        )
+        db.session.add(usuario)
+        db.session.commit()
+        return usuario
+
+    return _crear
@@ -0,0 +1,61 @@
+import threading
+import pytest
+from sqlalchemy import create_engine
+from app.services.auth import codigos_verificacion
+from app.services.auth.codigos_verificacion import AlmacenCodigosSQL
+
+EMAIL = 'jugador@example.com'
+MAX_INTENTOS = 3
+VERIFICACIONES_PARALELAS = 30
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'codigos.db'}", connect_args={'timeout': 30})
+    almacen = AlmacenCodigosSQL(engine, ttl_segundos=600, max_intentos=MAX_INTENTOS)
+    yield almacen
+    engine.dispose()
+
+
+def test_verificaciones_concurrentes_no_superan_el_maximo(almacen, monkeypatch):
+    """Muchos códigos erróneos a la vez: solo MAX_INTENTOS llegan a compararse y el código queda invalidado"""
+    comparaciones = []
+    comparar_real = codigos_verificacion.hmac.compare_digest
+
+    def _comparar(a, b):
+        comparaciones.append(1)
+        return comparar_real(a, b)
+
+    monkeypatch.setattr(codigos_verificacion.hmac, 'compare_digest', _comparar)
+    almacen.guardar(EMAIL, '123456')
+    barrera = threading.Barrier(VERIFICACIONES_PARALELAS)
+    resultados = []
+
+    def _verificar(i):
+        barrera.wait()
+        resultados.append(almacen.verificar(EMAIL, f'{i:06d}'))
+
+    hilos = [threading.Thread(target=_verificar, args=(i,)) for i in range(VERIFICACIONES_PARALELAS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert resultados == [False] * VERIFICACIONES_PARALELAS
+    assert len(comparaciones) == MAX_INTENTOS
+    assert not almacen.verificar(EMAIL, '123456')
+
+
+def test_codigo_correcto_sin_consumir_no_gasta_intentos(almacen):
+    almacen.guardar(EMAIL, '123456')
+    for _ in range(MAX_INTENTOS + 1):
+        assert almacen.verificar(EMAIL, '123456', consumir=False)
+    assert almacen.verificar(EMAIL, '123456')
+    assert not almacen.verificar(EMAIL, '123456')
+
+
+def test_fallos_agotan_el_codigo(almacen):
+    almacen.guardar(EMAIL, '123456')
+    for _ in range(MAX_INTENTOS):
+        assert not almacen.verificar(EMAIL, '000000')
+    assert not almacen.verificar(EMAIL, '123456')
@@ -0,0 +1,118 @@
+from datetime import datetime
+import pytest
+from app.utils.database import db
+from app.utils.query_counter import contar_consultas
+from app.models.social.friendship_model import Friendship
+from app.models.posts.post_model import Post, PostComentario, PostLike
+from app.services.posts.post_service import PostService
+from app.services.posts.contadores_service import ContadoresPostService
+
+# Consultas fijas por endpoint: no deben crecer con el número de posts, autores o comentarios
+CONSULTAS_FEED = 1          # posts JOIN users
+CONSULTAS_MIS_POSTS = 2     # posts + autores (selectinload)
+CONSULTAS_MIS_LIKES = 2     # posts JOIN post_likes + autores
+CONSULTAS_TIMELINE = 3      # entradas + posts por PK + autores
+CONSULTAS_DETALLE = 2       # post + autor
+CONSULTAS_COMENTARIOS = 3   # post + comentarios + autores
+
+
+@pytest.fixture
+def red_social(aplicacion, crear_usuario):
+    """Un lector con cinco amigos; cada amigo publica tres posts con comentarios y likes de otros autores"""
+    lector = crear_usuario('lector')
+    amigos = [crear_usuario(f"amigo{i}") for i in range(5)]
+    for amigo in amigos:
+        db.session.add(Friendship(sender_id=lector.id, receiver_id=amigo.id, status='accepted'))
+    db.session.commit()
+
+    post_ids = []
+    for amigo in amigos:
+        for i in range(3):
+            post_ids.append(PostService.crear_post(amigo.id, {'tipo_post': 'texto', 'contenido': f"post {i}"})['post']['id'])
+
+    for post_id in post_ids:
+        for autor in amigos:
+            PostService.agregar_comentario(post_id, autor.id, {'contenido': 'comentario'})
+        PostService.toggle_like_post(post_id, lector.id)
+
+    datos = {'lector_id': lector.id, 'amigo_id': amigos[0].id, 'post_ids': post_ids}
+    db.session.expunge_all()
+    return datos
+
+
+def _consultas(funcion, *args, **kwargs) -> int:
+    """Consultas que lanza una llamada con la sesión vacía (sin objetos ya cargados)"""
+    db.session.expunge_all()
+    with contar_consultas(db.engine) as contador:
+        funcion(*args, **kwargs)
+    return contador.total
+
+
+@pytest.mark.parametrize('por_pagina', [2, 10])
+def test_feed_consultas_fijas(red_social, por_pagina):
+    assert _consultas(PostService.obtener_posts_cursor, por_pagina=por_pagina) == CONSULTAS_FEED
+
+
+@pytest.mark.parametrize('por_pagina', [2, 10])
+def test_mis_posts_consultas_fijas(red_social, por_pagina):
+    consultas = _consultas(PostService.obtener_mis_posts_cursor, red_social['amigo_id'], por_pagina=por_pagina)
+    assert consultas == CONSULTAS_MIS_POSTS
+
+
+@pytest.mark.parametrize('por_pagina', [2, 10])
+def test_mis_likes_consultas_fijas(red_social, por_pagina):
+    consultas = _consultas(PostService.obtener_mis_likes_posts_cursor, red_social['lector_id'], por_pagina=por_pagina)
+    assert consultas == CONSULTAS_MIS_LIKES
+
+
+@pytest.mark.parametrize('por_pagina', [2, 10])
+def test_timeline_consultas_fijas(red_social, por_pagina):
+    respuesta = PostService.obtener_timeline(red_social['lector_id'], por_pagina=por_pagina)
+    assert respuesta['count'] == por_pagina
+
+    consultas = _consultas(PostService.obtener_timeline, red_social['lector_id'], por_pagina=por_pagina)
+    assert consultas == CONSULTAS_TIMELINE
+
+
+def test_detalle_post_consultas_fijas(red_social):
+    assert _consultas(PostService.obtener_post_por_id, red_social['post_ids'][0]) == CONSULTAS_DETALLE
+
+
+def test_comentarios_consultas_fijas(red_social):
+    post_id = red_social['post_ids'][0]
+    assert PostComentario.query.filter_by(post_id=post_id).count() == 5
+
+    db.session.expunge_all()
+    with contar_consultas(db.engine) as contador:
+        respuesta = PostService.obtener_comentarios(post_id)
+    contador.afirmar_maximo(CONSULTAS_COMENTARIOS)
+    assert len({comentario['usuario_id'] for comentario in respuesta['comentarios']}) == 5
+
+
+def test_contadores_sin_consultas_por_post(red_social):
+    """Los totales salen de las columnas desnormalizadas, no de COUNT por post"""
+    assert PostLike.query.count() == len(red_social['post_ids'])
+    db.session.expunge_all()
+    with contar_consultas(db.engine) as contador:
+        respuesta = PostService.obtener_posts_cursor(por_pagina=10)
+    assert all(post['total_comentarios'] == 5 and post['total_likes'] == 1 for post in respuesta['data'])
+    assert contador.total == CONSULTAS_FEED
+
+
+def test_contadores_no_cambian_updated_at(red_social):
+    """Likes, comentarios y la reconciliación ajustan contadores sin marcar posts ni comentarios como editados"""
+    antes = datetime(2020, 1, 1)
+    Post.query.update({Post.updated_at: antes}, synchronize_session=False)
+    PostComentario.query.update({PostComentario.updated_at: antes}, synchronize_session=False)
+    db.session.commit()
+
+    post_id = red_social['post_ids'][0]
+    comentario_id = PostService.agregar_comentario(post_id, red_social['amigo_id'], {'contenido': 'otro'})['comentario']['id']
+    PostService.toggle_like_post(post_id, red_social['amigo_id'])
+    PostService.toggle_like_comentario(comentario_id, red_social['lector_id'])
+    ContadoresPostService.reconciliar_contadores()
+
+    db.session.expire_all()
+    assert db.session.get(Post, post_id).likes_count == 2
+    assert {post.updated_at for post in Post.query.all()} == {antes}
+    assert {comentario.updated_at for comentario in PostComentario.query.filter(PostComentario.id != comentario_id)} == {antes}
@@ -0,0 +1,58 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from app.services.imagenes import imagen_service
+from app.services.imagenes.imagen_service import ImagenService
+
+PENDIENTE = {'ruta_original': '/tmp/original.jpg', 'ruta_webp': '/tmp/original.webp'}
+
+
+class _PoolFalso:
+    """ProcessPoolExecutor de pruebas: los primeros `rotos` pools rechazan el submit como si un worker hubiera muerto"""
+    creados = []
+    rotos = 0
+
+    def __init__(self, **kwargs):
+        self.roto = len(_PoolFalso.creados) < _PoolFalso.rotos
+        self.cerrado = False
+        _PoolFalso.creados.append(self)
+
+    def submit(self, funcion, *args):
+        if self.roto:
+            raise BrokenProcessPool('worker muerto')
+        futuro = Future()
+        futuro.set_result({'ancho': 1, 'alto': 1, 'placeholder': ''})
+        return futuro
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.cerrado = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    _PoolFalso.creados = []
+    monkeypatch.setattr(imagen_service, 'ProcessPoolExecutor', _PoolFalso)
+    monkeypatch.setattr(ImagenService, '_pool', None)
+    return _PoolFalso
+
+
+def test_pool_roto_se_recrea(aplicacion, pools):
+    pools.rotos = 1
+    resultados = []
+
+    ImagenService.encolar_conversion(PENDIENTE, resultados.append)
+
+    assert len(pools.creados) == 2
+    assert pools.creados[0].cerrado
+    assert ImagenService._pool is pools.creados[1]
+    assert resultados == [{'ancho': 1, 'alto': 1, 'placeholder': ''}]
+
+
+def test_pool_irrecuperable_marca_error_sin_lanzar(aplicacion, pools):
+    pools.rotos = 2
+    resultados = []
+
+    ImagenService.encolar_conversion(PENDIENTE, resultados.append)
+
+    assert resultados == [None]
+    assert len(pools.creados) == 2
@@ -0,0 +1,56 @@
+import threading
+import pytest
+from app.utils.rate_limit import LimitadorVentana, LimitadorVentanaSQLite
+
+MAX_FALLOS = 5
+INTENTOS_PARALELOS = 50
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def limitador(request, tmp_path):
+    if request.param == 'sqlite':
+        return LimitadorVentanaSQLite(str(tmp_path / 'limites.db'), 'limite_pruebas', MAX_FALLOS, 60)
+    return LimitadorVentana(MAX_FALLOS, 60)
+
+
+def test_reservas_concurrentes_respetan_el_maximo(limitador):
+    """Intentos simultáneos contra el mismo email: solo MAX_FALLOS pasan aunque ninguno haya terminado"""
+    barrera = threading.Barrier(INTENTOS_PARALELOS)
+    resultados = []
+    resultados_lock = threading.Lock()
+
+    def _intentar():
+        barrera.wait()
+        espera, ficha = limitador.reservar('ana@example.com')
+        with resultados_lock:
+            resultados.append((espera, ficha))
+
+    hilos = [threading.Thread(target=_intentar) for _ in range(INTENTOS_PARALELOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    admitidos = [ficha for espera, ficha in resultados if not espera]
+    assert len(admitidos) == MAX_FALLOS
+    assert all(ficha is not None for ficha in admitidos)
+    assert all(espera > 0 for espera, ficha in resultados if ficha is None)
+    assert limitador.reintentar_en('ana@example.com') > 0
+
+
+def test_liberar_devuelve_el_hueco(limitador):
+    fichas = [limitador.reservar('ana@example.com')[1] for _ in range(MAX_FALLOS)]
+    assert limitador.reservar('ana@example.com')[1] is None
+
+    limitador.liberar('ana@example.com', fichas[-1])
+    espera, ficha = limitador.reservar('ana@example.com')
+    assert espera == 0 and ficha is not None
+
+
+def test_limpiar_reinicia_la_clave(limitador):
+    for _ in range(MAX_FALLOS):
+        limitador.reservar('ana@example.com')
+    assert limitador.reservar('luis@example.com')[0] == 0
+
+    limitador.limpiar('ana@example.com')
+    assert limitador.reintentar_en('ana@example.com') == 0
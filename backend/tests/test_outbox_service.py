@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+import pytest
+from app.core.config import settings
+from app.utils.database import db
+from app.utils.smtp_stub import ServidorSMTPStub
+from app.models.email.correo_saliente_model import CorreoSaliente
+from app.services.email.outbox_service import OutboxService, TIPO_VERIFICACION
+
+EMAIL = 'jugador@example.com'
+
+
+@pytest.fixture
+def stub():
+    servidor = ServidorSMTPStub.iniciar(puerto=0)
+    yield servidor
+    servidor.detener()
+
+
+@pytest.fixture(autouse=True)
+def smtp(monkeypatch, stub):
+    """El EmailService real envía por SMTP al stub local"""
+    monkeypatch.setattr(settings, 'SMTP_HOST', '127.0.0.1')
+    monkeypatch.setattr(settings, 'SMTP_PORT', stub.puerto)
+    monkeypatch.setattr(settings, 'SMTP_USER', '')
+    monkeypatch.setattr(settings, 'SMTP_TLS', False)
+    monkeypatch.setattr(settings, 'SMTP_TIMEOUT', 5)
+
+
+def _correos():
+    db.session.expire_all()
+    return CorreoSaliente.query.order_by(CorreoSaliente.id).all()
+
+
+def test_procesar_lote_envia_y_borra_los_datos(aplicacion, stub):
+    OutboxService.encolar_verificacion(EMAIL, 'Jugador', '123456')
+
+    resultado = OutboxService.procesar_lote()
+
+    assert resultado == {'enviados': 1, 'reintentos': 0, 'fallidos': 0, 'procesados': 1}
+    assert len(stub.mensajes) == 1
+    assert stub.mensajes[0]['para'] == [EMAIL]
+    assert stub.mensajes[0]['asunto'] == 'Código de verificación de Sporthub'
+    assert '123456' in stub.mensajes[0]['mensaje'].get_content()
+
+    [correo] = _correos()
+    assert correo.estado == 'enviado'
+    assert correo.enviado_at is not None
+    assert correo.datos == {}
+
+
+def test_servidor_caido_reintenta_con_backoff(aplicacion, stub):
+    OutboxService.encolar_verificacion(EMAIL, 'Jugador', '123456')
+    stub.detener()
+
+    resultado = OutboxService.procesar_lote()
+
+    assert resultado['reintentos'] == 1
+    [correo] = _correos()
+    assert correo.estado == 'pendiente'
+    assert correo.intentos == 1
+    assert correo.ultimo_error
+    assert correo.proximo_intento > datetime.now() + OutboxService._backoff(1) - timedelta(seconds=5)
+    assert correo.datos['verification_code'] == '123456'
+
+    # Aún en backoff: no se vuelve a intentar
+    assert OutboxService.procesar_lote()['procesados'] == 0
+
+
+def test_ultimo_intento_fallido_borra_los_datos(aplicacion, stub, monkeypatch):
+    monkeypatch.setattr(settings, 'OUTBOX_MAX_INTENTOS', 1)
+    OutboxService.encolar_verificacion(EMAIL, 'Jugador', '123456')
+    stub.detener()
+
+    assert OutboxService.procesar_lote()['fallidos'] == 1
+    [correo] = _correos()
+    assert correo.estado == 'fallido'
+    assert correo.datos == {}
+
+
+def test_reenviar_codigo_reemplaza_el_pendiente(aplicacion, stub):
+    OutboxService.encolar_verificacion(EMAIL, 'Jugador', '111111')
+    OutboxService.encolar_verificacion(EMAIL, 'Jugador', '222222')
+
+    [pendiente] = _correos()
+    assert pendiente.datos['verification_code'] == '222222'
+
+    OutboxService.procesar_lote()
+    assert len(stub.mensajes) == 1
+    assert '222222' in stub.mensajes[0]['mensaje'].get_content()
+
+
+def test_procesar_lote_respeta_el_tamano(aplicacion, stub):
+    for i in range(3):
+        OutboxService.encolar_verificacion(f'jugador{i}@example.com', 'Jugador', f'00000{i}')
+
+    assert OutboxService.procesar_lote(tamano_lote=2)['enviados'] == 2
+    assert OutboxService.procesar_lote(tamano_lote=2)['enviados'] == 1
+    assert [correo.estado for correo in _correos()] == ['enviado'] * 3
+
+
+def test_purgar_terminados(aplicacion):
+    antiguo = datetime.now() - timedelta(days=settings.OUTBOX_RETENCION_DIAS + 1)
+    db.session.add_all([
+        CorreoSaliente(tipo=TIPO_VERIFICACION, destinatario=EMAIL, datos={}, estado='enviado', created_at=antiguo),
+        CorreoSaliente(tipo=TIPO_VERIFICACION, destinatario=EMAIL, datos={}, estado='fallido', created_at=antiguo),
+        CorreoSaliente(tipo=TIPO_VERIFICACION, destinatario=EMAIL, datos={}, estado='enviado'),
+        CorreoSaliente(tipo=TIPO_VERIFICACION, destinatario=EMAIL, datos={'x': 1}, estado='pendiente', created_at=antiguo),
+    ])
+    db.session.commit()
+
+    assert OutboxService.purgar_terminados() == 2
+    assert sorted(correo.estado for correo in _correos()) == ['enviado', 'pendiente']
@@ -0,0 +1,174 @@
+import threading
+from datetime import date, datetime, time, timedelta
+import pytest
+from jose import jwt
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.core.principal import claims_principal
+from app.utils.database import db
+from app.models.canchas.cancha import Cancha
+from app.models.canchas.horario_cancha import HorarioCancha
+from app.models.reservas.reserva import Reserva
+from app.services.reservas.disponibilidad_service import DisponibilidadService
+from app.services.reservas.horario_compilado import DIAS_SEMANA
+from app.services.reservas.reserva_service import ReservaService, MAX_REINTENTOS_RESERVA
+
+RESERVAS_PARALELAS = 200
+FECHA = date.today() + timedelta(days=7)
+HORA = time(18, 0)
+
+
+@pytest.fixture
+def cancha(aplicacion):
+    """Cancha con horario de 08:00 a 22:00 cada hora el día de FECHA"""
+    cancha = Cancha(
+        nombre='Central', tipo='futbol', subtipo='5', direccion='Calle 1', latitud=40.4, longitud=-3.7,
+        direccion_completa='Calle 1, Madrid', superficie='sintetico', capacidad=10, precio_hora=30,
+        descripcion='Cancha de pruebas'
+    )
+    cancha.horarios.append(HorarioCancha(
+        dia_semana=DIAS_SEMANA[FECHA.weekday()], hora_inicio=time(8, 0), hora_fin=time(22, 0), intervalo_minutos=60
+    ))
+    db.session.add(cancha)
+    db.session.commit()
+    return cancha.id
+
+
+@pytest.fixture
+def tokens(crear_usuario):
+    """Fábrica de cookies liga_token como las emite el login"""
+    def _token(usuario) -> str:
+        payload = {'id': usuario.id, **claims_principal(usuario), 'exp': int((datetime.now() + timedelta(hours=1)).timestamp())}
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+    return _token
+
+
+def _crear(aplicacion, token, cancha_id, hora=HORA):
+    with aplicacion.test_request_context(headers={'Cookie': f"liga_token={token}"}):
+        try:
+            return ReservaService.crear_reserva({
+                'cancha_id': cancha_id, 'fecha': FECHA.isoformat(), 'hora': hora.strftime('%H:%M')
+            })
+        finally:
+            db.session.remove()
+
+
+def _reservas_del_slot(cancha_id) -> int:
+    return db.session.query(Reserva).filter_by(cancha_id=cancha_id, fecha=FECHA, hora=HORA, slot_activo=True).count()
+
+
+def _libre(cancha_id) -> bool:
+    return HORA.strftime('%H:%M') in [hueco['hora'] for hueco in DisponibilidadService.horarios_libres(cancha_id, FECHA)]
+
+
+def test_reservas_paralelas_mismo_horario(aplicacion, cancha, crear_usuario, tokens):
+    """Cientos de crear_reserva simultáneos del mismo horario: una se guarda y el resto son conflictos limpios"""
+    cookies = [tokens(crear_usuario(f"jugador{i}")) for i in range(RESERVAS_PARALELAS)]
+    assert _libre(cancha)  # deja la disponibilidad cacheada: la reserva debe invalidarla
+
+    barrera = threading.Barrier(RESERVAS_PARALELAS)
+    resultados = []
+    resultados_lock = threading.Lock()
+
+    def _reservar(token):
+        barrera.wait()
+        try:
+            _crear(aplicacion, token, cancha)
+            resultado = 'creada'
+        except ValueError:
+            resultado = 'conflicto'
+        except Exception as e:
+            resultado = f"error: {e!r}"
+        with resultados_lock:
+            resultados.append(resultado)
+
+    hilos = [threading.Thread(target=_reservar, args=(token,)) for token in cookies]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    errores = [resultado for resultado in resultados if resultado.startswith('error')]
+    assert errores == []
+    assert resultados.count('creada') == 1
+    assert resultados.count('conflicto') == RESERVAS_PARALELAS - 1
+    assert _reservas_del_slot(cancha) == 1
+    assert not _libre(cancha)
+
+
+def test_reserva_cancelada_libera_el_horario(aplicacion, cancha, crear_usuario, tokens):
+    ana, luis = tokens(crear_usuario('ana')), tokens(crear_usuario('luis'))
+    reserva_id = _crear(aplicacion, ana, cancha).id
+    with pytest.raises(ValueError):
+        _crear(aplicacion, luis, cancha)
+
+    with aplicacion.test_request_context(headers={'Cookie': f"liga_token={ana}"}):
+        ReservaService.cancelar_reserva(reserva_id)
+    assert _libre(cancha)
+
+    _crear(aplicacion, luis, cancha)
+    assert _reservas_del_slot(cancha) == 1
+    assert db.session.query(Reserva).filter_by(cancha_id=cancha, fecha=FECHA, hora=HORA).count() == 2
+
+
+def test_disponibilidad_cacheada_sigue_a_las_reservas_confirmadas(aplicacion, cancha, crear_usuario):
+    """Sin invalidación explícita (p.ej. la reserva la hizo otro worker): la generación del día la detecta tras el commit"""
+    usuario_id = crear_usuario('ana').id
+    assert _libre(cancha)
+
+    reserva = Reserva(cancha_id=cancha, user_id=usuario_id, fecha=FECHA, hora=HORA, estado='confirmada', slot_activo=True)
+    db.session.add(reserva)
+    db.session.flush()
+    assert _libre(cancha)  # aún sin confirmar: la caché no cambia
+    db.session.commit()
+    assert not _libre(cancha)
+
+    reserva.estado = 'cancelada'
+    reserva.slot_activo = None
+    db.session.commit()
+    assert _libre(cancha)
+
+
+def test_hora_fuera_del_horario(aplicacion, cancha, crear_usuario, tokens):
+    with pytest.raises(ValueError):
+        _crear(aplicacion, tokens(crear_usuario('ana')), cancha, hora=time(18, 30))
+    assert db.session.query(Reserva).count() == 0
+
+
+def _commit_con_errores(monkeypatch, codigos):
+    """Hacer fallar los primeros commits con los códigos de MySQL indicados"""
+    commit_real = db.session.commit
+    pendientes = list(codigos)
+
+    def _commit():
+        if pendientes:
+            codigo = pendientes.pop(0)
+            raise OperationalError('INSERT INTO reservas', {}, Exception(codigo, 'simulado'))
+        return commit_real()
+
+    monkeypatch.setattr(db.session, 'commit', _commit)
+    return pendientes
+
+
+def test_deadlock_se_reintenta(aplicacion, cancha, crear_usuario, monkeypatch):
+    usuario_id = crear_usuario('ana').id
+    pendientes = _commit_con_errores(monkeypatch, [1213, 1205])
+    ReservaService._insertar_reserva(cancha, usuario_id, FECHA, HORA)
+    assert pendientes == []
+    assert _reservas_del_slot(cancha) == 1
+
+
+def test_deadlock_persistente_se_propaga(aplicacion, cancha, crear_usuario, monkeypatch):
+    usuario_id = crear_usuario('ana').id
+    _commit_con_errores(monkeypatch, [1213] * MAX_REINTENTOS_RESERVA)
+    with pytest.raises(OperationalError):
+        ReservaService._insertar_reserva(cancha, usuario_id, FECHA, HORA)
+    assert _reservas_del_slot(cancha) == 0
+
+
+def test_error_no_reintentable_se_propaga(aplicacion, cancha, crear_usuario, monkeypatch):
+    usuario_id = crear_usuario('ana').id
+    pendientes = _commit_con_errores(monkeypatch, [1045, 1213])
+    with pytest.raises(OperationalError):
+        ReservaService._insertar_reserva(cancha, usuario_id, FECHA, HORA)
+    assert pendientes == [1213]
@@ -0,0 +1,42 @@
+from datetime import date, time, timedelta
+import pytest
+from app.utils.database import db
+from app.utils.cursor_utils import codificar_cursor
+from app.models.canchas.cancha import Cancha
+from app.models.reservas.reserva import Reserva
+from app.services.reservas.reserva_service import ReservaService
+
+
+@pytest.fixture
+def reservas(aplicacion, crear_usuario):
+    """Cinco reservas pasadas de un usuario, una por día"""
+    usuario_id = crear_usuario('ana').id
+    cancha = Cancha(
+        nombre='Central', tipo='futbol', subtipo='5', direccion='Calle 1', latitud=40.4, longitud=-3.7,
+        direccion_completa='Calle 1, Madrid', superficie='sintetico', capacidad=10, precio_hora=30,
+        descripcion='Cancha de pruebas'
+    )
+    db.session.add(cancha)
+    db.session.flush()
+    for dias in range(1, 6):
+        db.session.add(Reserva(
+            cancha_id=cancha.id, user_id=usuario_id, fecha=date.today() - timedelta(days=dias),
+            hora=time(18, 0), estado='finalizado'
+        ))
+    db.session.commit()
+    return usuario_id
+
+
+def test_paginacion_recorre_todas_las_reservas(reservas):
+    pagina = ReservaService.listar_reservas_usuario(reservas, por_pagina=2)
+    ids = [reserva['id'] for reserva in pagina['data']]
+    while pagina['next_cursor']:
+        pagina = ReservaService.listar_reservas_usuario(reservas, cursor=pagina['next_cursor'], por_pagina=2)
+        ids += [reserva['id'] for reserva in pagina['data']]
+    assert len(ids) == len(set(ids)) == 5
+
+
+@pytest.mark.parametrize('cursor', [codificar_cursor(None, 3), 'no-es-un-cursor'])
+def test_cursor_invalido(reservas, cursor):
+    with pytest.raises(ValueError, match='Cursor de paginación inválido'):
+        ReservaService.listar_reservas_usuario(reservas, cursor=cursor)